@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Measures the peak resident memory of :func:`nussl.Repet.make_audio_signals` with the metadata-only
+:func:`nussl.AudioSignal.make_copy_without_data` and with the old ``copy.deepcopy`` based copies.
+
+Each case runs in its own process, because the peak RSS reported by the OS never goes down.
+
+Usage:
+    python benchmarks/benchmark_copy.py [duration in seconds]
+"""
+
+from __future__ import division, print_function
+
+import copy
+import multiprocessing
+import os
+import resource
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import nussl
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 2 ** 20 if sys.platform == 'darwin' else 2 ** 10
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _deepcopy_without_data(self):
+    new_signal = copy.deepcopy(self)
+    new_signal.audio_data = None
+    new_signal.stft_data = None
+    return new_signal
+
+
+def _run(duration, use_deepcopy, queue):
+    if use_deepcopy:
+        nussl.AudioSignal.make_copy_without_data = _deepcopy_without_data
+
+    sr = nussl.DEFAULT_SAMPLE_RATE
+    signal = nussl.AudioSignal(audio_data_array=np.random.rand(2, int(duration * sr)) * 2 - 1,
+                               sample_rate=sr)
+    repet = nussl.Repet(signal)
+    repet.run()
+
+    before = _peak_rss_mb()
+    repet.make_audio_signals()
+    queue.put((before, _peak_rss_mb()))
+
+
+def main(duration=300):
+    print('Repet.make_audio_signals on {} s of stereo audio'.format(duration))
+
+    for name, use_deepcopy in [('copy.deepcopy', True), ('make_copy_without_data', False)]:
+        queue = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_run, args=(duration, use_deepcopy, queue))
+        process.start()
+        before, after = queue.get()
+        process.join()
+
+        print('{:>24}: peak RSS {:8.1f} MB ({:+8.1f} MB)'.format(name, after, after - before))
+
+if __name__ == '__main__':
+    main(*[float(a) for a in sys.argv[1:2]])
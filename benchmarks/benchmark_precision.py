@@ -0,0 +1,54 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compares memory, speed and accuracy of :class:`nussl.AudioSignal` STFT/iSTFT round trips in
+single (``float32`` / ``complex64``) and double (``float64`` / ``complex128``) precision.
+
+Usage:
+    python benchmarks/benchmark_precision.py [duration in seconds] [n_repeats]
+"""
+
+from __future__ import division, print_function
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import nussl
+
+
+def _best_time(func, n_repeats):
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=n_repeats, number=1))
+
+
+def main(duration=600, n_repeats=3):
+    sr = nussl.DEFAULT_SAMPLE_RATE
+    audio_data = np.random.rand(2, int(duration * sr)) * 2 - 1
+    stft_params = nussl.stft_utils.StftParams(sr, window_length=2048, hop_length=1024)
+
+    print('{} s of stereo audio at {} Hz, window {}, hop {}'.format(duration, sr,
+                                                                   stft_params.window_length,
+                                                                   stft_params.hop_length))
+
+    for dtype in [nussl.FLOAT64, nussl.FLOAT32]:
+        signal = nussl.AudioSignal(audio_data_array=audio_data, sample_rate=sr,
+                                   stft_params=stft_params, dtype=dtype)
+        signal.stft()
+        reconstructed = signal.istft(overwrite=False)
+
+        print('{}:'.format(dtype))
+        print('    audio_data: {:8.1f} MB'.format(signal.audio_data.nbytes / 2 ** 20))
+        print('     stft_data: {:8.1f} MB ({})'.format(signal.stft_data.nbytes / 2 ** 20,
+                                                       signal.stft_data.dtype))
+        print('   max abs err: {:8.3g}'.format(np.max(np.abs(reconstructed - audio_data))))
+        print('          stft: {:8.3f} s'.format(_best_time(signal.stft, n_repeats)))
+        print('         istft: {:8.3f} s'.format(
+            _best_time(lambda: signal.istft(overwrite=False), n_repeats)))
+
+if __name__ == '__main__':
+    main(*[float(a) for a in sys.argv[1:2]] + [int(a) for a in sys.argv[2:3]])
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compares the resampling backends of :func:`nussl.AudioSignal.resample` on common conversions:
+throughput (seconds of stereo audio resampled per second) and aliasing (level of a tone above
+the new Nyquist frequency that should have been filtered out, and error on a tone that should
+have passed through).
+
+Usage:
+    python benchmarks/benchmark_resample.py [duration in seconds] [n_repeats]
+"""
+
+from __future__ import division, print_function
+
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import nussl
+
+CONVERSIONS = [(48000, 44100), (44100, 16000), (44100, 22050)]
+
+
+def _best_time(func, n_repeats):
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=n_repeats, number=1))
+
+
+def _db(value):
+    return 20 * np.log10(max(value, 1e-12))
+
+
+def main(duration=30, n_repeats=3):
+    for sample_rate, new_sample_rate in CONVERSIONS:
+        t = np.arange(int(duration * sample_rate)) / sample_rate
+        passed_freq = 1000.0
+        aliased_freq = 0.5 * (new_sample_rate / 2 + sample_rate / 2)  # between the two nyquists
+        audio_data = np.vstack([np.sin(2 * np.pi * passed_freq * t),
+                                np.sin(2 * np.pi * aliased_freq * t)])
+
+        print('{} Hz -> {} Hz, {} s of stereo audio'.format(sample_rate, new_sample_rate, duration))
+        print('{:>10} {:>7} {:>12} {:>14} {:>12}'.format('backend', 'quality', 'x realtime',
+                                                         'passband (dB)', 'alias (dB)'))
+
+        for backend in nussl.ALL_RESAMPLE_BACKENDS:
+            qualities = [nussl.RESAMPLE_QUALITY_DEFAULT] if backend == nussl.RESAMPLE_FFT \
+                else [nussl.RESAMPLE_QUALITY_LOW, nussl.RESAMPLE_QUALITY_MEDIUM,
+                      nussl.RESAMPLE_QUALITY_HIGH]
+
+            for quality in qualities:
+                def run():
+                    return nussl.resample_utils.resample(audio_data, sample_rate, new_sample_rate,
+                                                         backend, quality)
+
+                seconds = _best_time(run, n_repeats)
+                resampled = run()
+
+                # leave out the edges, where every filter rings
+                edge = new_sample_rate // 10
+                new_t = np.arange(resampled.shape[-1]) / new_sample_rate
+                expected = np.sin(2 * np.pi * passed_freq * new_t)
+                passband_error = np.std((resampled[0] - expected)[edge:-edge])
+                alias_level = np.std(resampled[1, edge:-edge]) * np.sqrt(2)
+
+                print('{:>10} {:>7} {:>12.1f} {:>14.1f} {:>12.1f}'.format(
+                    backend, quality, duration / seconds, _db(passband_error), _db(alias_level)))
+        print()
+
+if __name__ == '__main__':
+    main(*[float(a) for a in sys.argv[1:2]] + [int(a) for a in sys.argv[2:3]])
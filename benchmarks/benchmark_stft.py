@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmarks the vectorized :func:`nussl.stft_utils.e_stft` and :func:`nussl.stft_utils.e_istft`
+against the per-hop loops they replaced.
+
+Usage:
+    python benchmarks/benchmark_stft.py [duration in seconds] [n_repeats]
+"""
+
+from __future__ import division, print_function
+
+import os
+import sys
+import timeit
+
+import numpy as np
+import scipy.fftpack as scifft
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import nussl
+from nussl.core import stft_utils
+
+
+def e_stft_loop(signal, window_length, hop_length, window_type, n_fft_bins=None,
+                remove_reflection=True):
+    """
+    The original implementation of :func:`nussl.stft_utils.e_stft`: one fft per hop.
+    """
+    if n_fft_bins is None:
+        n_fft_bins = window_length
+
+    window = stft_utils.make_window(window_type, window_length)
+    signal, num_blocks = stft_utils._add_zero_padding(signal, window_length, hop_length)
+    stft_bins = n_fft_bins // 2 + 1 if remove_reflection else n_fft_bins
+
+    stft = np.zeros((num_blocks, stft_bins), dtype=complex)
+    for hop in range(num_blocks):
+        start = hop * hop_length
+        end = start + window_length
+        windowed_signal = np.multiply(signal[start:end], window)
+        fft = scifft.fft(windowed_signal, n=n_fft_bins)
+        stft[hop, ] = fft[:stft_bins]
+
+    return stft.T
+
+
+def e_istft_loop(stft, window_length, hop_length, window_type):
+    """
+    The original implementation of :func:`nussl.stft_utils.e_istft`: one inverse fft per hop.
+    """
+    n_hops = stft.shape[1]
+    overlap = window_length - hop_length
+    signal_length = (n_hops * hop_length) + overlap
+    signal = np.zeros(signal_length)
+
+    norm_window = np.zeros(signal_length)
+    window = stft_utils.make_window(window_type, window_length)
+    stft = stft_utils._add_reflection(stft)
+
+    for n in range(n_hops):
+        start = n * hop_length
+        end = start + window_length
+        signal[start:end] += np.real(scifft.ifft(stft[:, n]))[:window_length]
+        norm_window[start:end] = norm_window[start:end] + window
+
+    norm_window[norm_window == 0.0] = nussl.EPSILON
+    signal_norm = signal / norm_window
+
+    ovp_hop_ratio = int(np.ceil(overlap / hop_length))
+    return signal_norm[ovp_hop_ratio * hop_length:signal_length - overlap]
+
+
+def _best_time(func, n_repeats, *args):
+    timer = timeit.Timer(lambda: func(*args))
+    return min(timer.repeat(repeat=n_repeats, number=1))
+
+
+def main(duration=300, n_repeats=3):
+    sr = nussl.DEFAULT_SAMPLE_RATE
+    signal = np.random.rand(int(duration * sr)) * 2 - 1
+    window_length, hop_length, window_type = 2048, 1024, nussl.WINDOW_HANN
+
+    params = (window_length, hop_length, window_type)
+
+    loop_stft = e_stft_loop(signal, *params)
+    vectorized_stft = stft_utils.e_stft(signal, *params)
+    print('{} s of audio at {} Hz, window {}, hop {}'.format(duration, sr, window_length,
+                                                            hop_length))
+    print('stft bit-identical output: {}'.format(np.array_equal(loop_stft, vectorized_stft)))
+    print('istft max abs difference: {:.3g}'.format(
+        np.max(np.abs(e_istft_loop(loop_stft, *params) -
+                      stft_utils.e_istft(loop_stft, *params)))))
+
+    for name, func in [('loop', e_stft_loop), ('vectorized', stft_utils.e_stft)]:
+        print('{:>18}: {:.3f} s'.format('stft ' + name, _best_time(func, n_repeats, signal, *params)))
+
+    for name, func in [('loop', e_istft_loop), ('vectorized', stft_utils.e_istft)]:
+        print('{:>18}: {:.3f} s'.format('istft ' + name,
+                                        _best_time(func, n_repeats, loop_stft, *params)))
+
+if __name__ == '__main__':
+    main(*[float(a) for a in sys.argv[1:2]] + [int(a) for a in sys.argv[2:3]])
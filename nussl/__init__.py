@@ -25,13 +25,14 @@ class ImportErrorClass(object):
 
 from .core.constants import *
 from .core.audio_signal import AudioSignal
-from .core import utils, efz_utils, stft_utils, datasets
+from .core.audio_signal_batch import AudioSignalBatch, RaggedAudioSignalBatch
+from .core import utils, efz_utils, stft_utils, resample_utils, datasets
 from .evaluation import *
 from .separation import *
 from .transformers import *
 import core.constants
 
-__all__ = ['core', 'utils', 'stft_utils', 'transformers', 'separation', 'evaluation']
+__all__ = ['core', 'utils', 'stft_utils', 'resample_utils', 'transformers', 'separation', 'evaluation']
 
 
 __version__ = '0.1.6'
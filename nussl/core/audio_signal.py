@@ -98,10 +98,16 @@ See Also:
 
 from __future__ import division
 
+import binascii
+import contextlib
 import copy
+import errno
 import json
+import multiprocessing.pool
 import numbers
 import os.path
+import stat
+import struct
 import warnings
 
 import audioread
@@ -111,6 +117,7 @@ import numpy as np
 import scipy.io.wavfile as wav
 
 import constants
+import resample_utils
 import stft_utils
 import utils
 
@@ -132,6 +139,9 @@ class AudioSignal(object):
         duration (float): Length of the signal to read from the file (in seconds). Defaults to full
             length of the signal.
         sample_rate (int): Sampling rate of this :class:`AudioSignal` object.
+        dtype (str): Precision of this :class:`AudioSignal` object, either
+            :attr:`constants.FLOAT32` or :attr:`constants.FLOAT64`. Defaults to
+            :attr:`constants.DEFAULT_DTYPE`. See :attr:`dtype`.
 
     Attributes:
         audio_data (:obj:`np.ndarray`):
@@ -152,15 +162,30 @@ class AudioSignal(object):
         stft_params (:obj:`StftParams`): Container for all settings for doing a STFT. Has same
             lifespan as :class:`AudioSignal` object.
         label (str): A label for this :class:`AudioSignal` object.
+        cache_full_stft (bool): If ``True``, :func:`stft` calculates the STFT of the whole signal
+            once and makes the STFT of the active region out of it, only calculating the hops at
+            the edges of the active region. This speeds up moving the active region through the
+            signal in steps that are multiples of the STFT hop length. The STFT it returns is
+            read-only. ``False`` by default.
   
     """
 
     def __init__(self, path_to_input_file=None, audio_data_array=None, stft=None, label=None,
-                 sample_rate=None, stft_params=None, offset=0, duration=None):
+                 sample_rate=None, stft_params=None, offset=0, duration=None, dtype=None):
 
         self.path_to_input_file = path_to_input_file
+        self._dtype = np.dtype(constants.DEFAULT_DTYPE if dtype is None else dtype).name
+        if self._dtype not in (constants.FLOAT32, constants.FLOAT64):
+            raise AudioSignalException('dtype must be {} or {}, got {}!'.format(constants.FLOAT32,
+                                                                               constants.FLOAT64,
+                                                                               self._dtype))
         self._audio_data = None
+        self._audio_data_scale = None
         self._stft_data = None
+        self._stft_version = 0
+        self._spectrogram_cache = {}
+        self._full_stft_cache = None
+        self._converted_audio_cache = None
         self._sample_rate = None
         self._active_start = None
         self._active_end = None
@@ -193,6 +218,7 @@ class AudioSignal(object):
         self.stft_params = stft_utils.StftParams(self.sample_rate) \
             if stft_params is None else stft_params
         self.use_librosa_stft = constants.USE_LIBROSA_STFT
+        self.cache_full_stft = False
 
     def __str__(self):
         return self.__class__.__name__
@@ -209,6 +235,13 @@ class AudioSignal(object):
     _STFT_LEN = 1
     _STFT_CHAN = 2
 
+    # Bookkeeping attributes that are not part of the signal, so they are not compared or saved
+    _CACHE_ATTRIBUTES = ('_stft_version', '_spectrogram_cache', '_full_stft_cache',
+                         '_converted_audio_cache')
+
+    # Attributes holding (possibly very large) signal arrays, skipped by :func:`make_copy_without_data`
+    _DATA_ATTRIBUTES = ('_audio_data', '_audio_data_scale', '_stft_data')
+
     @property
     def signal_length(self):
         """
@@ -220,9 +253,9 @@ class AudioSignal(object):
         See Also:
             :func:`set_active_region_to_default` for information about active regions.
         """
-        if self.audio_data is None:
+        if self._audio_data is None:
             return None
-        return self.audio_data.shape[constants.LEN_INDEX]
+        return self._active_audio_data.shape[constants.LEN_INDEX]
 
     @property
     def entire_signal_length(self):
@@ -234,7 +267,7 @@ class AudioSignal(object):
         See Also:
             :func:`set_active_region_to_default` for information about active regions.
         """
-        if self.audio_data is None:
+        if self._audio_data is None:
             return None
         return self._audio_data.shape[constants.LEN_INDEX]
 
@@ -263,7 +296,7 @@ class AudioSignal(object):
         See Also:
             :func:`set_active_region_to_default` for information about active regions.
         """
-        if self.audio_data is None:
+        if self._audio_data is None:
             return None
         return self.entire_signal_length / self.sample_rate
 
@@ -282,8 +315,8 @@ class AudioSignal(object):
             * :func:`is_stereo`
         """
         # TODO: what about a mismatch between audio_data and stft_data??
-        if self.audio_data is not None:
-            return self.audio_data.shape[constants.CHAN_INDEX]
+        if self._audio_data is not None:
+            return self._audio_data.shape[constants.CHAN_INDEX]
         if self.stft_data is not None:
             return self.stft_data.shape[constants.STFT_CHAN_INDEX]
         return None
@@ -318,6 +351,33 @@ class AudioSignal(object):
         """
         return self.num_channels == 2
 
+    @property
+    def dtype(self):
+        """
+        PROPERTY
+
+        (str) Precision of this :class:`AudioSignal` object, :attr:`constants.FLOAT32` or
+        :attr:`constants.FLOAT64`. Floating point :attr:`audio_data` is stored with this dtype and
+        complex :attr:`stft_data` with the matching complex dtype (``complex64`` for ``float32``,
+        ``complex128`` for ``float64``). Data set with another precision is converted.
+
+        Single precision halves the memory of :attr:`audio_data` and :attr:`stft_data`. An
+        STFT/iSTFT round trip of audio in ``[-1, 1]`` is then accurate to about ``1e-6``, instead
+        of about ``1e-15`` with double precision.
+
+        The library-wide default is :attr:`constants.DEFAULT_DTYPE`.
+        """
+        return self._dtype
+
+    @property
+    def complex_dtype(self):
+        """
+        PROPERTY
+
+        (str) Complex dtype of :attr:`stft_data` that goes with :attr:`dtype`.
+        """
+        return np.result_type(self._dtype, np.complex64).name
+
     @property
     def audio_data(self):
         """
@@ -362,6 +422,10 @@ class AudioSignal(object):
             see :func:`set_active_region_to_default`. When setting this attribute, the active
             region are reset to default.
 
+            * If the audio was memory mapped from a WAV file by :func:`load_audio_from_file`,
+            :attr:`audio_data` is read-only. To change it in place, load it into memory first
+            with ``signal.audio_data = np.array(signal.audio_data)``.
+
             * :attr:`audio_data` and :attr:`stft_data` are not automatically synchronized, meaning
             that if one of them is changed, those changes are not instantly reflected in the other.
             To propagate changes, either call :func:`stft` or :func:`istft`.
@@ -383,6 +447,35 @@ class AudioSignal(object):
         if self._audio_data is None:
             return None
 
+        if self._audio_data_scale is None:
+            return self._active_audio_data
+
+        # audio_data is memory mapped from a file: convert the active region once and keep it
+        # until the region or the data changes
+        region = (self._active_start, self._active_end)
+        if self._converted_audio_cache is None or self._converted_audio_cache[0] != region:
+            converted = self._convert_mapped_audio(self._active_audio_data)
+            self._converted_audio_cache = (region, converted)
+
+        return self._converted_audio_cache[1]
+
+    def _convert_mapped_audio(self, audio_data):
+        """
+        Converts memory mapped samples (or a slice of them) to floats with :attr:`dtype`. The result
+        is read-only either way, so changes to it can't be silently lost.
+        """
+        audio_data = audio_data.astype(self._dtype, copy=False)
+        if self._audio_data_scale != 1.0:
+            audio_data /= self._audio_data_scale
+        audio_data.flags.writeable = False
+        return audio_data
+
+    @property
+    def _active_audio_data(self):
+        """
+        (:obj:`np.ndarray`): View of the active region of :attr:`audio_data` as it is stored,
+        without converting memory mapped data to floats.
+        """
         start = 0
         end = self._audio_data.shape[constants.LEN_INDEX]
 
@@ -397,6 +490,9 @@ class AudioSignal(object):
     @audio_data.setter
     def audio_data(self, value):
 
+        self._audio_data_scale = None
+        self.audio_data_changed()
+
         if value is None:
             self._audio_data = None
             return
@@ -417,6 +513,9 @@ class AudioSignal(object):
         if value.ndim < 2:
             value = np.expand_dims(value, axis=constants.CHAN_INDEX)
 
+        if np.issubdtype(value.dtype, np.floating):
+            value = value.astype(self._dtype, copy=False)
+
         self._audio_data = value
 
         self.set_active_region_to_default()
@@ -450,6 +549,10 @@ class AudioSignal(object):
             * :attr:`stft_data` will expand a two dimensional array so that it has the expected
             shape `(n_frequency_bins, n_hops, n_channels)`.
 
+            * :attr:`magnitude_spectrogram_data` and :attr:`power_spectrogram_data` are cached
+            until :attr:`stft_data` is set again. If you change :attr:`stft_data` in place, call
+            :func:`stft_data_changed` so they get recalculated.
+
         Raises:
         :class:`AudioSignalException` if set with an :obj:`np.ndarray` with one dimension or
         more than three dimensions.
@@ -468,6 +571,7 @@ class AudioSignal(object):
 
         if value is None:
             self._stft_data = None
+            self.stft_data_changed()
             return
 
         elif not isinstance(value, np.ndarray):
@@ -485,8 +589,54 @@ class AudioSignal(object):
         if not np.iscomplexobj(value):
             warnings.warn('Initializing STFT with data that is non-complex. '
                           'This might lead to weird results!')
+        else:
+            value = value.astype(self.complex_dtype, copy=False)
 
         self._stft_data = value
+        self.stft_data_changed()
+
+    def audio_data_changed(self):
+        """
+        Tells this :class:`AudioSignal` object that :attr:`audio_data` has changed, dropping the
+        STFT of the whole signal that :func:`stft` keeps when :attr:`cache_full_stft` is ``True``
+        and the floats converted from memory mapped samples. Setting :attr:`audio_data` does this
+        already, call it after changing :attr:`audio_data` in place.
+        """
+        self._full_stft_cache = None
+        self._converted_audio_cache = None
+
+    @property
+    def stft_version(self):
+        """
+        PROPERTY
+
+        (int): Counter that goes up every time :attr:`stft_data` is set or
+        :func:`stft_data_changed` is called. Arrays derived from :attr:`stft_data` are valid for
+        as long as this doesn't change.
+        """
+        return self._stft_version
+
+    def stft_data_changed(self):
+        """
+        Tells this :class:`AudioSignal` object that :attr:`stft_data` has changed, dropping the
+        cached :attr:`magnitude_spectrogram_data` and :attr:`power_spectrogram_data` and
+        incrementing :attr:`stft_version`. Setting :attr:`stft_data` does this already, call it
+        after changing :attr:`stft_data` in place.
+        """
+        self._stft_version += 1
+        self._spectrogram_cache = {}
+
+    def _get_cached_spectrogram(self, name, calculate):
+        """
+        Returns the array derived from :attr:`stft_data` cached under :param:`name`, calling
+        :param:`calculate` to make it if it's not cached. Cached arrays are read-only.
+        """
+        if name not in self._spectrogram_cache:
+            spectrogram = calculate()
+            spectrogram.flags.writeable = False
+            self._spectrogram_cache[name] = spectrogram
+
+        return self._spectrogram_cache[name]
 
     @property
     def file_name(self):
@@ -650,6 +800,9 @@ class AudioSignal(object):
         (:obj:`np.ndarray`): Returns a real valued :obj:`np.ndarray` with power
         spectrogram data. The power spectrogram is defined as (STFT)^2, where ^2 is
         element-wise squaring of entries of the STFT. Same shape as :attr:`stft_data`.
+
+        This is calculated once and cached (read-only) until :attr:`stft_data` changes, see
+        :func:`stft_data_changed`.
         
         Raises:
             :class:`AudioSignalException`: if :attr:`stft_data` is ``None``. Run :func:`stft`
@@ -665,7 +818,8 @@ class AudioSignal(object):
         if self.stft_data is None:
             raise AudioSignalException('Cannot calculate power_spectrogram_data '
                                        'because self.stft_data is None')
-        return np.abs(self.stft_data) ** 2
+        return self._get_cached_spectrogram('power',
+                                            lambda: np.square(self.magnitude_spectrogram_data))
 
     @property
     def magnitude_spectrogram_data(self):
@@ -676,6 +830,9 @@ class AudioSignal(object):
         
         The power spectrogram is defined as Abs(STFT), the element-wise absolute value of every
         item in the STFT. Same shape as :attr:`stft_data`.
+
+        This is calculated once and cached (read-only) until :attr:`stft_data` changes, see
+        :func:`stft_data_changed`.
         
         Raises:
             AudioSignalException: if :attr:`stft_data` is ``None``. Run :func:`stft` before
@@ -691,7 +848,7 @@ class AudioSignal(object):
         if self.stft_data is None:
             raise AudioSignalException('Cannot calculate magnitude_spectrogram_data '
                                        'because self.stft_data is None')
-        return np.abs(self.stft_data)
+        return self._get_cached_spectrogram('magnitude', lambda: np.abs(self.stft_data))
 
     @property
     def has_data(self):
@@ -731,7 +888,7 @@ class AudioSignal(object):
             Returns `False` if :attr:`audio_data` is empty. Else, returns `True`.
 
         """
-        return self.audio_data is not None and self.audio_data.size != 0
+        return self._audio_data is not None and self._active_audio_data.size != 0
 
     ##################################################
     #                     I/O
@@ -752,6 +909,17 @@ class AudioSignal(object):
         in :attr:`audio_data` (unlike with the active region, which has the entire audio data stored
         in memory but only allows access to a subset of the audio).
 
+        WAV and RF64 files with 16 or 32-bit integer or 32 or 64-bit float samples are not decoded.
+        Only their header is read and their samples are memory mapped, with :param:`offset` and
+        :param:`duration` turned into a byte range of the file. Samples are read from disc and
+        converted to floats the first time :attr:`audio_data` is accessed (and again if the active
+        region changes), only for the active region, so opening a long file is fast and memory use
+        is proportional to the region that is used. :func:`get_channel` only converts one channel
+        if :attr:`audio_data` has not been converted. :attr:`audio_data` is read-only until it is
+        set, e.g. with
+        ``signal.audio_data = np.array(signal.audio_data)``. Any other file is decoded with
+        *librosa*.
+
         See Also:
             * :func:`load_audio_from_array` to read audio data from a :obj:`np.ndarray`.
 
@@ -771,8 +939,13 @@ class AudioSignal(object):
         if duration is not None:
             assert duration >= 0, 'Parameter `duration` must be >= 0!'
 
-        with audioread.audio_open(os.path.realpath(input_file_path)) as input_file:
-            file_length = input_file.duration
+        wav_header = _read_wav_header(os.path.realpath(input_file_path))
+
+        if wav_header is not None:
+            file_length = wav_header['n_frames'] / wav_header['sample_rate']
+        else:
+            with audioread.audio_open(os.path.realpath(input_file_path)) as input_file:
+                file_length = input_file.duration
 
         if offset > file_length:
             raise AudioSignalException('offset is longer than signal!')
@@ -782,17 +955,21 @@ class AudioSignal(object):
                           ' Reading until end of signal...',
                           UserWarning)
 
-        audio_input, self._sample_rate = librosa.load(input_file_path,
-                                                      sr=None,
-                                                      offset=offset,
-                                                      duration=duration,
-                                                      mono=False)
+        if wav_header is not None:
+            self._load_wav_memmap(input_file_path, wav_header, offset, duration)
+        else:
+            audio_input, self._sample_rate = librosa.load(input_file_path,
+                                                          sr=None,
+                                                          offset=offset,
+                                                          duration=duration,
+                                                          mono=False,
+                                                          dtype=self._dtype)
 
-        # Change from fixed point to floating point
-        if not np.issubdtype(audio_input.dtype, np.floating):
-            audio_input = audio_input.astype('float') / (np.iinfo(audio_input.dtype).max + 1.0)
+            # Change from fixed point to floating point
+            if not np.issubdtype(audio_input.dtype, np.floating):
+                audio_input = audio_input.astype(self._dtype) / (np.iinfo(audio_input.dtype).max + 1.0)
 
-        self.audio_data = audio_input
+            self.audio_data = audio_input
 
         if new_sample_rate is not None and new_sample_rate != self._sample_rate:
             warnings.warn('Input sample rate is different than the sample rate'
@@ -803,6 +980,38 @@ class AudioSignal(object):
         self.path_to_input_file = input_file_path
         self.set_active_region_to_default()
 
+    def _load_wav_memmap(self, input_file_path, wav_header, offset, duration):
+        """
+        Memory maps the samples of a WAV file, from :param:`offset` for :param:`duration` seconds,
+        into :attr:`audio_data`. :param:`wav_header` comes from :func:`_read_wav_header`.
+        """
+        sample_rate = wav_header['sample_rate']
+        n_channels = wav_header['n_channels']
+        sample_dtype = wav_header['dtype']
+
+        start = min(int(round(offset * sample_rate)), wav_header['n_frames'])
+        n_frames = wav_header['n_frames'] - start
+        if duration is not None:
+            n_frames = min(n_frames, int(round(duration * sample_rate)))
+
+        if n_frames > 0:
+            byte_offset = wav_header['data_offset'] + start * n_channels * sample_dtype.itemsize
+            audio_input = np.memmap(input_file_path, dtype=sample_dtype, mode='r',
+                                    offset=byte_offset, shape=(n_frames, n_channels))
+        else:
+            audio_input = np.zeros((0, n_channels), dtype=sample_dtype)
+
+        # samples are interleaved on disc, so (n_channels, n_samples) is a transposed view
+        self._audio_data = audio_input.T
+        if np.issubdtype(sample_dtype, np.integer):
+            self._audio_data_scale = np.iinfo(sample_dtype).max + 1.0
+        else:
+            self._audio_data_scale = 1.0
+
+        self._sample_rate = sample_rate
+        self.audio_data_changed()
+        self.set_active_region_to_default()
+
     def load_audio_from_array(self, signal, sample_rate=constants.DEFAULT_SAMPLE_RATE):
         """
         Loads an audio signal from a :obj:`np.ndarray`. :param:`sample_rate` is the sample
@@ -830,7 +1039,7 @@ class AudioSignal(object):
             if np.max(signal) > np.iinfo(np.dtype('int16')).max:
                 raise AudioSignalException('Please convert your array to 16-bit audio.')
 
-            signal = signal.astype('float') / (np.iinfo(np.dtype('int16')).max + 1.0)
+            signal = signal.astype(self._dtype) / (np.iinfo(np.dtype('int16')).max + 1.0)
 
         self.audio_data = signal
         self._sample_rate = sample_rate if sample_rate is not None \
@@ -838,41 +1047,89 @@ class AudioSignal(object):
 
         self.set_active_region_to_default()
 
-    def write_audio_to_file(self, output_file_path, sample_rate=None, verbose=False):
+    def write_audio_to_file(self, output_file_path, sample_rate=None, verbose=False,
+                            normalize=True, bit_depth=constants.DEFAULT_BIT_DEPTH,
+                            use_float=False):
         """
-        Outputs the audio signal data in :attr:`audio_data` to a file at :param:`output_file_path`
-        with sample rate of :param:`sample_rate`.
+        Outputs the audio signal data in :attr:`audio_data` to a WAV file at
+        :param:`output_file_path` with sample rate of :param:`sample_rate`.
+
+        The file is written a chunk of samples at a time, converting each chunk into a reused
+        buffer, so no full-size copies of :attr:`audio_data` are made and :attr:`audio_data` is
+        never changed. Files too big for WAV are written as RF64. The file is written under a
+        temporary name and then moved to :param:`output_file_path`, so a file can be overwritten
+        by a signal that is memory mapped from it.
 
         Parameters:
             output_file_path (str): Filename where output file will be saved.
             sample_rate (int): The sample rate to write the file at. Default is
                 :attr:`sample_rate`.
             verbose (bool): Print out a message if writing the file was successful.
+            normalize (bool): If ``True`` (default) and the peak of :attr:`audio_data` is above
+                1.0, the output is scaled so that its peak is 1.0 (like :func:`peak_normalize`,
+                but :attr:`audio_data` is left alone). If ``False``, integer output is clipped.
+            bit_depth (int): Bits per sample of integer output, 16 (default), 24 or 32.
+            use_float (bool): If ``True``, writes 32-bit float samples instead of integers and
+                ignores :param:`bit_depth`.
+
+        See Also:
+            :func:`write_audio_files` to write many :class:`AudioSignal` objects at once.
+
         """
-        if self.audio_data is None:
+        if self._audio_data is None:
             raise AudioSignalException("Cannot write audio file because there is no audio data.")
 
-        try:
-            self.peak_normalize()
+        if not use_float and bit_depth not in _WAV_WRITE_INT_DTYPES:
+            raise AudioSignalException('Cannot write a file with bit depth = {}, must be one of '
+                                       '{}!'.format(bit_depth, sorted(_WAV_WRITE_INT_DTYPES)))
 
+        try:
             if sample_rate is None:
                 sample_rate = self.sample_rate
 
-            audio_output = np.copy(self.audio_data)
-
-            # TODO: better fix
-            # convert to fixed point again
-            if not np.issubdtype(audio_output.dtype, np.int):
-                audio_output = np.multiply(audio_output,
-                                           2 ** (constants.DEFAULT_BIT_DEPTH - 1)).astype('int16')
-
-            wav.write(output_file_path, sample_rate, audio_output.T)
+            _write_wav(output_file_path, self.audio_data, int(sample_rate), normalize,
+                       bit_depth, use_float)
         except Exception as e:
             print("Cannot write to file, {file}.".format(file=output_file_path))
             raise e
         if verbose:
             print("Successfully wrote {file}.".format(file=output_file_path))
 
+    @staticmethod
+    def write_audio_files(audio_signals, output_file_paths, num_threads=4, **kwargs):
+        """
+        Writes many :class:`AudioSignal` objects to WAV files at once, from a pool of
+        :param:`num_threads` threads. Converting samples and writing to disk release the GIL, so
+        writing overlaps with other work and with the other files.
+
+        Args:
+            audio_signals (list): :class:`AudioSignal` objects to write.
+            output_file_paths (list): Path to write each :class:`AudioSignal` object to.
+            num_threads (int): Number of files that are written at the same time.
+            **kwargs: Passed on to :func:`write_audio_to_file`, e.g., ``normalize=False`` or
+                ``bit_depth=24``.
+
+        Example:
+            >>> background, foreground = repet.make_audio_signals()
+            >>> nussl.AudioSignal.write_audio_files([background, foreground],
+            ...                                     ['background.wav', 'foreground.wav'])
+
+        """
+        if len(audio_signals) != len(output_file_paths):
+            raise AudioSignalException('Got {} AudioSignal objects but {} '
+                                       'paths!'.format(len(audio_signals), len(output_file_paths)))
+
+        def write(signal_and_path):
+            signal, path = signal_and_path
+            signal.write_audio_to_file(path, **kwargs)
+
+        pool = multiprocessing.pool.ThreadPool(max(1, min(num_threads, len(audio_signals))))
+        try:
+            pool.map(write, zip(audio_signals, output_file_paths))
+        finally:
+            pool.close()
+            pool.join()
+
     ##################################################
     #                Active Region
     ##################################################
@@ -933,40 +1190,60 @@ class AudioSignal(object):
 
     def next_window_generator(self, window_size, hop_size, convert_to_samples=False):
         """
-        Not Implemented
-        
-        Raises:
-            NotImplemented
-            
+        Generator that steps the active region through the whole signal, one window at a time.
+        For every window the active region is set to ``[start, end)`` and ``(start, end)`` is
+        yielded, so :attr:`audio_data` is that window inside the loop. The last window is cut
+        short if the signal does not fill it. Once the generator is done (or closed), the active
+        region is set back to what it was before.
+
+        This pairs with :func:`stft_utils.e_stft_stream` to do an STFT a block at a time:
+
+        .. code-block:: python
+            :linenos:
+
+            blocks = (signal.audio_data for _ in signal.next_window_generator(2 ** 16, 2 ** 16))
+            for stft_block in nussl.stft_utils.e_stft_stream(blocks, 2048, 1024, nussl.WINDOW_HANN):
+                process(stft_block)
+
         Args:
-            window_size:
-            hop_size:
-            convert_to_samples:
+            window_size (int): Number of samples in each window.
+            hop_size (int): Number of samples between the starts of adjacent windows.
+            convert_to_samples (bool): If ``True``, :param:`window_size` and :param:`hop_size` are
+                in seconds and get converted to samples.
 
-        Returns:
+        Yields:
+            (tuple) ``(start, end)`` sample indices of the current window.
 
         """
-        raise NotImplemented
-        # start = self._active_start
-        # end = self.signal_length
-        # if convert_to_samples:
-        #     start /= self.sample_rate
-        #     end = self.signal_duration
-        # old_start = self._active_start
-        # self.set_active_region_to_default()
-        #
-        # while old_start + window_size < self.signal_length:
-        #     start = old_start + hop_size
-        #     end = start + window_size
-        #     self.set_active_region(start, end)
-        #     yield start, end
+        if convert_to_samples:
+            window_size = int(window_size * self.sample_rate)
+            hop_size = int(hop_size * self.sample_rate)
+
+        if window_size <= 0 or hop_size <= 0:
+            raise AudioSignalException('window_size and hop_size must be positive!')
+
+        old_start, old_end = self._active_start, self._active_end
+        self.set_active_region_to_default()
+        signal_length = self.signal_length
+
+        try:
+            for start in range(0, max(signal_length - window_size, 0) + hop_size, hop_size):
+                end = min(start + window_size, signal_length)
+                self.set_active_region(start, end)
+                yield start, end
+
+                if end == signal_length:
+                    break
+        finally:
+            self.set_active_region(old_start, old_end)
 
     ##################################################
     #               STFT Utilities
     ##################################################
 
     def stft(self, window_length=None, hop_length=None, window_type=None, n_fft_bins=None,
-             remove_reflection=True, overwrite=True, use_librosa=constants.USE_LIBROSA_STFT):
+             remove_reflection=True, overwrite=True, use_librosa=constants.USE_LIBROSA_STFT,
+             workers=None):
         """
         Computes the Short Time Fourier Transform (STFT) of :attr:`audio_data`.
         The results of the STFT calculation can be accessed from :attr:`stft_data`
@@ -975,6 +1252,11 @@ class AudioSignal(object):
         Warning:
             If overwrite=True (default) this will overwrite any data in :attr:`stft_data`!
 
+        Notes:
+            If :attr:`cache_full_stft` is ``True`` (and *librosa* is not used), the STFT of the
+            whole signal is calculated once and reused for every active region, see
+            :func:`stft_utils.e_stft_region`.
+
         Args:
             window_length (int): Amount of time (in samples) to do an FFT on
             hop_length (int): Amount of time (in samples) to skip ahead for the new FFT
@@ -983,13 +1265,15 @@ class AudioSignal(object):
             remove_reflection (bool): Should remove reflection above Nyquist
             overwrite (bool): Overwrite :attr:`stft_data` with current calculation
             use_librosa (bool): Use *librosa's* stft function
+            workers (int): Number of threads to spread the FFTs of all channels across (needs
+                scipy >= 1.4, ignored with *librosa*). Defaults to 1.
 
         Returns:
             (:obj:`np.ndarray`) Calculated, complex-valued STFT from :attr:`audio_data`, 3D numpy
             array with shape `(n_frequency_bins, n_hops, n_channels)`.
 
         """
-        if self.audio_data is None or self.audio_data.size == 0:
+        if not self.has_audio_data:
             raise AudioSignalException("No time domain signal (self.audio_data) to make STFT from!")
 
         window_length = self.stft_params.window_length if window_length is None \
@@ -999,7 +1283,7 @@ class AudioSignal(object):
         n_fft_bins = self.stft_params.n_fft_bins if n_fft_bins is None else int(n_fft_bins)
 
         calculated_stft = self._do_stft(window_length, hop_length, window_type,
-                                        n_fft_bins, remove_reflection, use_librosa)
+                                        n_fft_bins, remove_reflection, use_librosa, workers)
 
         if overwrite:
             self.stft_data = calculated_stft
@@ -1007,23 +1291,59 @@ class AudioSignal(object):
         return calculated_stft
 
     def _do_stft(self, window_length, hop_length, window_type, n_fft_bins, remove_reflection,
-                 use_librosa):
-        if self.audio_data is None or self.audio_data.size == 0:
+                 use_librosa, workers=None):
+        if not self.has_audio_data:
             raise AudioSignalException('Cannot do stft without signal!')
 
-        stfts = []
+        if not use_librosa and self.cache_full_stft:
+            return self._do_cached_stft(window_length, hop_length, window_type, n_fft_bins,
+                                        remove_reflection, workers)
 
-        stft_func = stft_utils.librosa_stft_wrapper if use_librosa else stft_utils.e_stft
+        if not use_librosa:
+            # e_stft does all channels at once and returns (n_fft_bins, n_hops, n_channels)
+            return stft_utils.e_stft(signal=self.audio_data, window_length=window_length,
+                                     hop_length=hop_length, window_type=window_type,
+                                     n_fft_bins=n_fft_bins, remove_reflection=remove_reflection,
+                                     workers=workers)
+
+        stfts = []
 
         for chan in self.get_channels():
-            stfts.append(stft_func(signal=chan, window_length=window_length,
-                                   hop_length=hop_length, window_type=window_type,
-                                   n_fft_bins=n_fft_bins, remove_reflection=remove_reflection))
+            stfts.append(stft_utils.librosa_stft_wrapper(signal=chan, window_length=window_length,
+                                                         hop_length=hop_length,
+                                                         window_type=window_type,
+                                                         n_fft_bins=n_fft_bins,
+                                                         remove_reflection=remove_reflection))
 
         return np.array(stfts).transpose((1, 2, 0))
 
+    def _do_cached_stft(self, window_length, hop_length, window_type, n_fft_bins,
+                        remove_reflection, workers=None):
+        key = (window_length, hop_length, window_type, n_fft_bins, remove_reflection)
+
+        if self._full_stft_cache is None or self._full_stft_cache[0] != key:
+            active_start, active_end = self._active_start, self._active_end
+            self.set_active_region_to_default()
+            try:
+                full_stft = stft_utils.e_stft(self.audio_data, window_length, hop_length,
+                                              window_type, n_fft_bins, remove_reflection,
+                                              workers=workers)
+            finally:
+                self.set_active_region(active_start, active_end)
+
+            full_stft.flags.writeable = False
+            self._full_stft_cache = (key, full_stft)
+
+        full_stft = self._full_stft_cache[1]
+        if self.active_region_is_default:
+            return full_stft
+
+        return stft_utils.e_stft_region(self.audio_data, self._active_start, full_stft,
+                                        window_length, hop_length, window_type, n_fft_bins,
+                                        remove_reflection, workers)
+
     def istft(self, window_length=None, hop_length=None, window_type=None, overwrite=True,
-              use_librosa=constants.USE_LIBROSA_STFT, truncate_to_length=None):
+              use_librosa=constants.USE_LIBROSA_STFT, truncate_to_length=None, workers=None):
         """ Computes and returns the inverse Short Time Fourier Transform (iSTFT).
 
         The results of the iSTFT calculation can be accessed from :attr:`audio_data`
@@ -1039,6 +1359,8 @@ class AudioSignal(object):
             overwrite (bool): Overwrite :attr:`stft_data` with current calculation
             use_librosa (bool): Use *librosa's* stft function
             truncate_to_length (int): truncate resultant signal to specified length. Default `None`.
+            workers (int): Number of threads to spread the inverse FFTs of all channels across
+                (needs scipy >= 1.4, ignored with *librosa*). Defaults to 1.
 
         Returns:
             (:obj:`np.ndarray`) Calculated, real-valued iSTFT from :attr:`stft_data`, 2D numpy array
@@ -1054,7 +1376,8 @@ class AudioSignal(object):
         # TODO: bubble up center
         window_type = self.stft_params.window_type if window_type is None else window_type
 
-        calculated_signal = self._do_istft(window_length, hop_length, window_type, use_librosa)
+        calculated_signal = self._do_istft(window_length, hop_length, window_type, use_librosa,
+                                           workers)
 
         # Make sure it's shaped correctly
         calculated_signal = np.expand_dims(calculated_signal, -1) \
@@ -1068,22 +1391,28 @@ class AudioSignal(object):
         if truncate_to_length is not None and truncate_to_length > 0:
             calculated_signal = calculated_signal[:, :truncate_to_length]
 
-        if overwrite or self.audio_data is None:
+        if overwrite or self._audio_data is None:
             self.audio_data = calculated_signal
 
         return calculated_signal
 
-    def _do_istft(self, window_length, hop_length, window_type, use_librosa):
+    def _do_istft(self, window_length, hop_length, window_type, use_librosa, workers=None):
         if self.stft_data.size == 0:
             raise AudioSignalException('Cannot do inverse STFT without self.stft_data!')
 
-        signals = []
+        if not use_librosa:
+            # e_istft does all channels at once and returns (n_channels, n_samples)
+            return stft_utils.e_istft(stft=self.stft_data, window_length=window_length,
+                                      hop_length=hop_length, window_type=window_type,
+                                      workers=workers)
 
-        istft_func = stft_utils.librosa_istft_wrapper if use_librosa else stft_utils.e_istft
+        signals = []
 
         for stft in self.get_stft_channels():
-            calculated_signal = istft_func(stft=stft, window_length=window_length,
-                                           hop_length=hop_length, window_type=window_type)
+            calculated_signal = stft_utils.librosa_istft_wrapper(stft=stft,
+                                                                 window_length=window_length,
+                                                                 hop_length=hop_length,
+                                                                 window_type=window_type)
 
             signals.append(calculated_signal)
 
@@ -1120,7 +1449,9 @@ class AudioSignal(object):
                                        'mask: {}, self.stft_data: {}'.format(mask.shape,
                                                                              self.stft_data.shape))
 
-        masked_stft = self.stft_data * mask.mask
+        # works through the STFT a block at a time, in this signal's precision, so packed or quantized masks are
+        # only unpacked one block at a time and a float64 mask doesn't upcast complex64 data
+        masked_stft = mask_base.apply_masks(self.stft_data, [mask])[0]
 
         if overwrite:
             self.stft_data = masked_stft
@@ -1146,7 +1477,7 @@ class AudioSignal(object):
 
         """
 
-        if self.audio_data is None:
+        if self._audio_data is None:
             raise AudioSignalException('Cannot plot with no audio data!')
 
         if channel > self.num_channels - 1:
@@ -1343,7 +1674,7 @@ class AudioSignal(object):
         max_val = 1.0
         max_signal = np.max(np.abs(self.audio_data))
         if max_signal > max_val:
-            normalized = self.audio_data.astype('float') / max_signal
+            normalized = self.audio_data.astype(self._dtype) / max_signal
             if overwrite:
                 self.audio_data = normalized
             return normalized
@@ -1434,11 +1765,38 @@ class AudioSignal(object):
         if not self.active_region_is_default and verbose:
             warnings.warn('Making a copy when active region is not default!')
 
-        new_signal = copy.deepcopy(self)
+        new_signal = self.make_copy_without_data()
         new_signal.audio_data = np.zeros_like(self.audio_data)
         new_signal.stft_data = np.zeros_like(self.stft_data)
         return new_signal
 
+    def make_copy_without_data(self):
+        """ Makes a structural copy of this :class:`AudioSignal` object: all of the metadata
+        (sample rate, :attr:`stft_params`, label, path, active region, dtype) is copied, but
+        :attr:`audio_data` and :attr:`stft_data` are ``None`` and the spectrogram cache is empty.
+
+        Unlike ``copy.deepcopy(self)``, the data arrays are never duplicated, so this is cheap
+        even for very long signals. :func:`make_copy_with_audio_data`,
+        :func:`make_copy_with_stft_data` and :func:`make_empty_copy` are built on top of it.
+
+        Returns:
+            (:class:`AudioSignal`): A copy of this :class:`AudioSignal` object without any data.
+
+        """
+        skipped = self._DATA_ATTRIBUTES + self._CACHE_ATTRIBUTES
+        metadata = {k: v for k, v in self.__dict__.items() if k not in skipped}
+
+        new_signal = self.__class__.__new__(self.__class__)
+        new_signal.__dict__.update(copy.deepcopy(metadata))
+        new_signal._audio_data = None
+        new_signal._audio_data_scale = None
+        new_signal._stft_data = None
+        new_signal._stft_version = 0
+        new_signal._spectrogram_cache = {}
+        new_signal._full_stft_cache = None
+        new_signal._converted_audio_cache = None
+        return new_signal
+
     def make_copy_with_audio_data(self, audio_data, verbose=True):
         """ Makes a copy of this `AudioSignal` object with :attr:`audio_data` initialized to
         the input :param:`audio_data` numpy array. The :attr:`stft_data` of the new `AudioSignal`
@@ -1457,12 +1815,11 @@ class AudioSignal(object):
             if not self.active_region_is_default:
                 warnings.warn('Making a copy when active region is not default.')
 
-            if audio_data.shape != self.audio_data.shape:
+            if audio_data.shape != self._active_audio_data.shape:
                 warnings.warn('Shape of new audio_data does not match current audio_data.')
 
-        new_signal = copy.deepcopy(self)
+        new_signal = self.make_copy_without_data()
         new_signal.audio_data = audio_data
-        new_signal.stft_data = None
         return new_signal
 
     def make_copy_with_stft_data(self, stft_data, verbose=True):
@@ -1486,9 +1843,8 @@ class AudioSignal(object):
             if stft_data.shape != self.stft_data.shape:
                 warnings.warn('Shape of new stft_data does not match current stft_data.')
 
-        new_signal = copy.deepcopy(self)
+        new_signal = self.make_copy_without_data()
         new_signal.stft_data = stft_data
-        new_signal.audio_data = None
         return new_signal
 
     def to_json(self):
@@ -1509,6 +1865,8 @@ class AudioSignal(object):
             raise TypeError
 
         d = copy.copy(o.__dict__)
+        for k in AudioSignal._CACHE_ATTRIBUTES:
+            d.pop(k, None)
         for k, v in d.items():
             if isinstance(v, np.ndarray):
                 d[k] = utils.json_ready_numpy_array(v)
@@ -1564,6 +1922,59 @@ class AudioSignal(object):
         else:
             return json_dict
 
+    def to_bytes(self):
+        """ Converts this :class:`AudioSignal` object to nussl's binary format: the JSON from
+        :func:`to_json` with :attr:`audio_data`, :attr:`stft_data` and every other array stored as
+        raw bytes instead of base64 text. See :func:`utils.to_binary`.
+
+        See Also:
+            :func:`from_bytes`, :func:`save`
+
+        Returns:
+            (bytes): Binary representation of the current :class:`AudioSignal` object.
+
+        """
+        return utils.to_binary(self)
+
+    @staticmethod
+    def from_bytes(data):
+        """ Creates a new :class:`AudioSignal` object from the output of :func:`to_bytes`.
+
+        Args:
+            data (bytes): Binary representation of an :class:`AudioSignal` object.
+
+        Returns:
+            (:class:`AudioSignal`): New :class:`AudioSignal` object. Its arrays are read-only views
+            into :param:`data`.
+
+        """
+        return utils.from_binary(data, AudioSignal.from_json)
+
+    def save(self, file_path):
+        """ Writes this :class:`AudioSignal` object to :param:`file_path` in the binary format of
+        :func:`to_bytes`. Use :func:`load` to read it back.
+
+        Args:
+            file_path (str): Path of the file to write.
+
+        """
+        utils.write_binary(self, file_path)
+
+    @staticmethod
+    def load(file_path, memory_map=True):
+        """ Reads an :class:`AudioSignal` object written by :func:`save`.
+
+        Args:
+            file_path (str): Path of the file to read.
+            memory_map (bool): If ``True`` (default), the arrays are copy-on-write memory maps of
+                the file, so large signals are only read from disk as they are used.
+
+        Returns:
+            (:class:`AudioSignal`): The :class:`AudioSignal` object that was saved.
+
+        """
+        return utils.read_binary(file_path, AudioSignal.from_json, memory_map)
+
     def rms(self):
         """ Calculates the root-mean-square of :attr:`audio_data`.
         
@@ -1594,6 +2005,7 @@ class AudioSignal(object):
                 signal.stft()
                 idx = signal.get_closest_frequency_bin(1200)  # 1200 Hz
                 signal.stft_data[idx:, :, :] = 0.0  # eliminate everything above idx
+                signal.stft_data_changed()  # stft_data was changed in place
 
 
         """
@@ -1618,7 +2030,7 @@ class AudioSignal(object):
         self.audio_data = self.audio_data * value
         return self
 
-    def resample(self, new_sample_rate):
+    def resample(self, new_sample_rate, backend=None, quality=None):
         """
         Resample the data in :attr:`audio_data` to the new sample rate provided by
         :param:`new_sample_rate`. If the :param:`new_sample_rate` is the same as :attr:`sample_rate`
@@ -1626,6 +2038,13 @@ class AudioSignal(object):
 
         Args:
             new_sample_rate (int): The new sample rate of :attr:`audio_data`.
+            backend (str): Resampling engine, one of :attr:`constants.ALL_RESAMPLE_BACKENDS`.
+                Defaults to :attr:`constants.RESAMPLE_DEFAULT` (*librosa*).
+                :attr:`constants.RESAMPLE_POLYPHASE` is much faster for common conversions like
+                48 kHz -> 44.1 kHz. See :func:`resample_utils.resample`.
+            quality (str): :attr:`constants.RESAMPLE_QUALITY_LOW`,
+                :attr:`constants.RESAMPLE_QUALITY_MEDIUM` or :attr:`constants.RESAMPLE_QUALITY_HIGH`
+                (default), trading speed for less aliasing.
 
         """
 
@@ -1633,13 +2052,14 @@ class AudioSignal(object):
             warnings.warn('Cannot resample to the same sample rate.')
             return
 
-        resampled_signal = []
-
-        for channel in self.get_channels():
-            resampled_channel = librosa.resample(channel, self.sample_rate, new_sample_rate)
-            resampled_signal.append(resampled_channel)
+        try:
+            # all channels are resampled in one call
+            resampled_signal = resample_utils.resample(self.audio_data, self.sample_rate,
+                                                       new_sample_rate, backend, quality)
+        except ValueError as e:
+            raise AudioSignalException(str(e))
 
-        self.audio_data = np.array(resampled_signal)
+        self.audio_data = resampled_signal
         self._sample_rate = new_sample_rate
 
     ##################################################
@@ -1678,6 +2098,13 @@ class AudioSignal(object):
         """
         self._verify_get_channel(n)
 
+        region = (self._active_start, self._active_end)
+        if self._audio_data_scale is not None and (self._converted_audio_cache is None or
+                                                   self._converted_audio_cache[0] != region):
+            # only convert the memory mapped samples of this channel
+            channel = utils._get_axis(self._active_audio_data, constants.CHAN_INDEX, n)
+            return self._convert_mapped_audio(channel)
+
         return utils._get_axis(self.audio_data, constants.CHAN_INDEX, n)
 
     def get_channels(self):
@@ -1767,8 +2194,8 @@ class AudioSignal(object):
         """
         self._verify_get_channel(n)
 
-        # np.array helps with duck typing
-        return utils._get_axis(np.array(self.power_spectrogram_data), constants.STFT_CHAN_INDEX, n)
+        # np.asarray helps with duck typing, without copying the cached spectrogram
+        return utils._get_axis(np.asarray(self.power_spectrogram_data), constants.STFT_CHAN_INDEX, n)
 
     def get_magnitude_spectrogram_channel(self, n):
         """ Returns the n-th channel from ``self.magnitude_spectrogram_data``.
@@ -1784,8 +2211,8 @@ class AudioSignal(object):
         """
         self._verify_get_channel(n)
 
-        # np.array helps with duck typing
-        return utils._get_axis(np.array(self.magnitude_spectrogram_data),
+        # np.asarray helps with duck typing, without copying the cached spectrogram
+        return utils._get_axis(np.asarray(self.magnitude_spectrogram_data),
                                constants.STFT_CHAN_INDEX, n)
 
     def to_mono(self, overwrite=False, keep_dims=False):
@@ -1894,6 +2321,8 @@ class AudioSignal(object):
 
     def __eq__(self, other):
         for k, v in self.__dict__.items():
+            if k in self._CACHE_ATTRIBUTES:
+                continue
             if isinstance(v, np.ndarray):
                 if not np.array_equal(v, other.__dict__[k]):
                     return False
@@ -1905,6 +2334,221 @@ class AudioSignal(object):
         return not self == other
 
 
+_WAVE_FORMAT_PCM = 0x0001
+_WAVE_FORMAT_IEEE_FLOAT = 0x0003
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# sample formats that can be memory mapped as they are, keyed by (format tag, bits per sample)
+_WAV_MEMMAP_DTYPES = {
+    (_WAVE_FORMAT_PCM, 16): np.dtype('<i2'),
+    (_WAVE_FORMAT_PCM, 32): np.dtype('<i4'),
+    (_WAVE_FORMAT_IEEE_FLOAT, 32): np.dtype('<f4'),
+    (_WAVE_FORMAT_IEEE_FLOAT, 64): np.dtype('<f8'),
+}
+
+
+def _read_wav_header(file_path):
+    """
+    Reads the header of a WAV (RIFF) or RF64 file, without reading any samples.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        (dict) with keys ``'sample_rate'``, ``'n_channels'``, ``'dtype'`` (:obj:`np.dtype` of a
+        sample on disc), ``'data_offset'`` (byte offset of the first sample) and ``'n_frames'``.
+        ``None`` if the file is not a WAV file or its samples can't be memory mapped as they are
+        (e.g., 8 or 24-bit or compressed samples).
+
+    """
+    with open(file_path, 'rb') as wav_file:
+        header = wav_file.read(12)
+        if len(header) < 12 or header[:4] not in (b'RIFF', b'RF64') or header[8:12] != b'WAVE':
+            return None
+
+        file_size = os.fstat(wav_file.fileno()).st_size
+        fmt_chunk = None
+        data_size_64 = None
+
+        try:
+            while True:
+                chunk_header = wav_file.read(8)
+                if len(chunk_header) < 8:
+                    return None
+
+                chunk_id = chunk_header[:4]
+                chunk_size = struct.unpack('<I', chunk_header[4:])[0]
+                chunk_start = wav_file.tell()
+
+                if chunk_id == b'data':
+                    break
+                elif chunk_id == b'fmt ':
+                    fmt_chunk = wav_file.read(chunk_size)
+                elif chunk_id == b'ds64':
+                    # RF64 keeps the real (64-bit) size of the data chunk here
+                    data_size_64 = struct.unpack('<Q', wav_file.read(chunk_size)[8:16])[0]
+
+                wav_file.seek(chunk_start + chunk_size + chunk_size % 2)  # chunks are word aligned
+
+            if fmt_chunk is None:
+                return None
+
+            format_tag, n_channels, sample_rate, _, block_align, bits_per_sample = \
+                struct.unpack('<HHIIHH', fmt_chunk[:16])
+            if format_tag == _WAVE_FORMAT_EXTENSIBLE and len(fmt_chunk) >= 26:
+                format_tag = struct.unpack('<H', fmt_chunk[24:26])[0]  # first bytes of the GUID
+        except struct.error:
+            return None
+
+    sample_dtype = _WAV_MEMMAP_DTYPES.get((format_tag, bits_per_sample))
+    if sample_dtype is None or n_channels == 0 or block_align != n_channels * sample_dtype.itemsize:
+        return None
+
+    if chunk_size == 0xFFFFFFFF and data_size_64 is not None:
+        chunk_size = data_size_64
+
+    # don't trust the header past the end of the file
+    n_frames = min(chunk_size, file_size - chunk_start) // block_align
+
+    return {'sample_rate': sample_rate, 'n_channels': n_channels, 'dtype': sample_dtype,
+            'data_offset': chunk_start, 'n_frames': n_frames}
+
+
+# integer sample formats write_audio_to_file can write, keyed by bits per sample. 24-bit samples are
+# converted as int32 and then packed down to their 3 low bytes
+_WAV_WRITE_INT_DTYPES = {16: np.dtype('<i2'), 24: np.dtype('<i4'), 32: np.dtype('<i4')}
+_WAV_WRITE_CHUNK = 2 ** 16  # samples per channel that are converted and written at a time
+
+
+def _wav_header(n_frames, n_channels, sample_rate, bits_per_sample, format_tag):
+    """
+    Makes the header of a WAV file, up to and including the header of the data chunk. If the data
+    is too big for a WAV file, makes an RF64 header instead, which keeps the sizes in a ds64 chunk.
+    """
+    block_align = n_channels * bits_per_sample // 8
+    data_size = n_frames * block_align
+    fmt_chunk = struct.pack('<4sIHHIIHH', b'fmt ', 16, format_tag, n_channels, sample_rate,
+                            sample_rate * block_align, block_align, bits_per_sample)
+    riff_size = 4 + len(fmt_chunk) + 8 + data_size + data_size % 2
+
+    if riff_size <= 0xFFFFFFFF:
+        return struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE') + fmt_chunk + \
+            struct.pack('<4sI', b'data', data_size)
+
+    ds64_chunk = struct.pack('<4sIQQQI', b'ds64', 28, riff_size + 36, data_size, n_frames, 0)
+    return struct.pack('<4sI4s', b'RF64', 0xFFFFFFFF, b'WAVE') + ds64_chunk + fmt_chunk + \
+        struct.pack('<4sI', b'data', 0xFFFFFFFF)
+
+
+@contextlib.contextmanager
+def _replacing_file(file_path):
+    """
+    Opens a new temporary file next to :param:`file_path` for writing in binary mode. When the
+    ``with`` block finishes without an error, the temporary file replaces :param:`file_path`
+    (keeping its permissions if it exists); otherwise it is deleted and :param:`file_path` is
+    left untouched.
+    """
+    file_path = os.path.realpath(file_path)
+    directory, name = os.path.split(file_path)
+
+    while True:
+        suffix = binascii.hexlify(os.urandom(4)).decode()
+        temp_path = os.path.join(directory, '.{}.{}.tmp'.format(name, suffix))
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+        try:
+            temp_fd = os.open(temp_path, flags, 0o666)
+            break
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+    try:
+        with os.fdopen(temp_fd, 'wb') as temp_file:
+            yield temp_file
+
+        if os.path.exists(file_path):
+            os.chmod(temp_path, stat.S_IMODE(os.stat(file_path).st_mode))
+        _replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def _replace(source_path, destination_path):
+    """ ``os.replace``, which python 2 does not have. """
+    if hasattr(os, 'replace'):
+        os.replace(source_path, destination_path)
+        return
+
+    if os.name == 'nt' and os.path.exists(destination_path):
+        os.remove(destination_path)  # os.rename() does not overwrite on windows
+    os.rename(source_path, destination_path)
+
+
+def _write_wav(file_path, audio_data, sample_rate, normalize, bit_depth, use_float):
+    """
+    Writes :param:`audio_data` (shape ``(n_channels, n_samples)``) to a WAV file, converting a
+    chunk of samples at a time into buffers that are reused for every chunk.
+    """
+    n_channels, n_frames = audio_data.shape
+
+    # integer audio_data is taken to be full scale PCM
+    scale = 1.0
+    if np.issubdtype(audio_data.dtype, np.integer):
+        scale /= np.iinfo(audio_data.dtype).max + 1.0
+
+    if normalize:
+        peak = 0.0
+        for start in range(0, n_frames, _WAV_WRITE_CHUNK):
+            chunk = audio_data[:, start:start + _WAV_WRITE_CHUNK]
+            peak = max(peak, float(chunk.max()), -float(chunk.min()))
+        peak *= scale
+        if peak > 1.0:
+            scale /= peak
+
+    if use_float:
+        format_tag, bits_per_sample, out_dtype = _WAVE_FORMAT_IEEE_FLOAT, 32, np.dtype('<f4')
+    else:
+        format_tag, bits_per_sample = _WAVE_FORMAT_PCM, bit_depth
+        out_dtype = _WAV_WRITE_INT_DTYPES[bit_depth]
+        full_scale = 2.0 ** (bit_depth - 1)
+        scale *= full_scale
+
+    # (n_samples, n_channels) buffers, so every row is one interleaved frame on disc. float32 holds
+    # every 16 and 24-bit value exactly, 32-bit values need float64
+    float_dtype = np.float64 if bits_per_sample == 32 and not use_float else \
+        np.result_type(audio_data.dtype, np.float32)
+    float_buffer = np.empty((min(n_frames, _WAV_WRITE_CHUNK), n_channels), dtype=float_dtype)
+    out_buffer = float_buffer if use_float and float_buffer.dtype == out_dtype else \
+        np.empty(float_buffer.shape, dtype=out_dtype)
+
+    # audio_data may be memory mapped from file_path itself, so the new file is written next to
+    # it and then moved over it. The mapped file stays readable until it is unmapped.
+    with _replacing_file(file_path) as wav_file:
+        wav_file.write(_wav_header(n_frames, n_channels, sample_rate, bits_per_sample, format_tag))
+
+        for start in range(0, n_frames, _WAV_WRITE_CHUNK):
+            chunk = audio_data[:, start:start + _WAV_WRITE_CHUNK]
+            n_samples = chunk.shape[-1]
+            converted, out = float_buffer[:n_samples], out_buffer[:n_samples]
+
+            np.multiply(chunk.T, scale, out=converted, casting='unsafe')
+            if not use_float:
+                np.clip(converted, -full_scale, full_scale - 1, out=converted)
+            np.copyto(out, converted, casting='unsafe')
+
+            if bit_depth == 24 and not use_float:
+                # keep the 3 low (little endian) bytes of every int32
+                out = out.view(np.uint8).reshape(n_samples, n_channels, 4)[:, :, :3]
+                np.ascontiguousarray(out).tofile(wav_file)
+            else:
+                out.tofile(wav_file)
+
+        if (n_frames * n_channels * bits_per_sample // 8) % 2:
+            wav_file.write(b'\0')  # chunks are word aligned
+
+
 class AudioSignalException(Exception):
     """
     Exception class for :class:`AudioSignal`.
@@ -0,0 +1,1205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+:class:`AudioSignalBatch` holds many equal-length signals with the same sample rate and number of
+channels in one contiguous 3D `numpy` array with shape `(batch_size, n_channels, n_samples)`.
+
+Keeping thousands of short clips in separate :class:`AudioSignal` objects means thousands of small
+arrays, :class:`StftParams` objects and Python-level loops. An :class:`AudioSignalBatch` does the
+STFT, iSTFT, masking and the usual level operations on the whole batch with one vectorized call,
+and only makes :class:`AudioSignal` objects on demand. Those are views: they share memory with
+the batch instead of copying it.
+
+ .. code-block:: python
+    :linenos:
+
+    import nussl
+
+    signals = [nussl.AudioSignal(path) for path in paths]  # all the same length
+    batch = nussl.AudioSignalBatch.from_signals(signals)
+
+    batch.stft()                      # (batch_size, n_bins, n_hops, n_channels)
+    masked = batch.apply_mask(masks)  # one mask per item, or one array for the whole batch
+    masked.istft()
+
+    first = masked[0]                 # AudioSignal sharing memory with masked.audio_data
+
+Clips of different lengths go in a :class:`RaggedAudioSignalBatch` instead, which stores them back
+to back in one flat buffer and transforms them in buckets of similar length.
+"""
+
+from __future__ import division
+
+import numpy as np
+
+import constants
+import stft_utils
+from audio_signal import AudioSignal, AudioSignalException
+
+__all__ = ['AudioSignalBatch', 'RaggedAudioSignalBatch']
+
+
+class AudioSignalBatch(object):
+    """
+    Container for a batch of audio signals that all have the same length, sample rate and number
+    of channels.
+
+    Parameters:
+        audio_data_array (:obj:`np.ndarray`): 3D array with shape
+            `(batch_size, n_channels, n_samples)`, or 2D with shape `(batch_size, n_samples)` for
+            a batch of mono signals. Stored as one C-contiguous array of :attr:`dtype`.
+        stft (:obj:`np.ndarray`): 4D complex array with shape
+            `(batch_size, n_frequency_bins, n_hops, n_channels)`. Cannot be given together with
+            :param:`audio_data_array`.
+        sample_rate (int): Sample rate of every signal in the batch. Defaults to
+            :attr:`constants.DEFAULT_SAMPLE_RATE`.
+        stft_params (:obj:`StftParams`): STFT settings shared by the whole batch.
+        dtype (str): ``'float32'`` or ``'float64'`` (default), see :attr:`AudioSignal.dtype`.
+
+    Attributes:
+        stft_params (:obj:`StftParams`): STFT settings for the whole batch. The :class:`AudioSignal`
+            views returned by :func:`get_signal` share this object.
+
+    """
+
+    def __init__(self, audio_data_array=None, stft=None, sample_rate=None, stft_params=None,
+                 dtype=None):
+        self._dtype = np.dtype(constants.DEFAULT_DTYPE if dtype is None else dtype).name
+        if self._dtype not in (constants.FLOAT32, constants.FLOAT64):
+            raise AudioSignalException('dtype must be {} or {}, got {}!'.format(constants.FLOAT32,
+                                                                               constants.FLOAT64,
+                                                                               self._dtype))
+
+        if audio_data_array is not None and stft is not None:
+            raise AudioSignalException('Can only initialize AudioSignalBatch object with one of '
+                                       '{audio, stft}!')
+
+        self._audio_data = None
+        self._stft_data = None
+        self.sample_rate = constants.DEFAULT_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.stft_params = stft_utils.StftParams(self.sample_rate) \
+            if stft_params is None else stft_params
+
+        if audio_data_array is not None:
+            self.audio_data = audio_data_array
+
+        if stft is not None:
+            self.stft_data = stft
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __len__(self):
+        return self.batch_size
+
+    def __getitem__(self, index):
+        return self.get_signal(index)
+
+    def __iter__(self):
+        for i in range(self.batch_size):
+            yield self.get_signal(i)
+
+    @staticmethod
+    def from_signals(audio_signals, stft_params=None):
+        """
+        Stacks the active regions of a list of :class:`AudioSignal` objects into a new
+        :class:`AudioSignalBatch`. The signals are copied once, straight into the batch array.
+
+        Args:
+            audio_signals (list): :class:`AudioSignal` objects, all with the same sample rate,
+                number of channels and :attr:`AudioSignal.signal_length`.
+            stft_params (:obj:`StftParams`): STFT settings of the batch. Defaults to the
+                :attr:`AudioSignal.stft_params` of the first signal.
+
+        Returns:
+            (:class:`AudioSignalBatch`): A new batch holding a copy of every signal.
+
+        Raises:
+            AudioSignalException: If :param:`audio_signals` is empty, a signal has no audio data,
+                or the signals do not agree on sample rate, number of channels or length.
+
+        """
+        if len(audio_signals) == 0:
+            raise AudioSignalException('Cannot make an AudioSignalBatch without any signals!')
+
+        first = audio_signals[0]
+        if not first.has_audio_data:
+            raise AudioSignalException('Cannot make an AudioSignalBatch from signals without '
+                                       'audio data!')
+
+        shape = (first.num_channels, first.signal_length)
+        for i, signal in enumerate(audio_signals):
+            if not signal.has_audio_data:
+                raise AudioSignalException('Signal {} has no audio data!'.format(i))
+
+            if signal.sample_rate != first.sample_rate:
+                raise AudioSignalException('Signal {} has sample rate {}, expected {}!'.format(
+                    i, signal.sample_rate, first.sample_rate))
+
+            if (signal.num_channels, signal.signal_length) != shape:
+                raise AudioSignalException('Signal {} has shape {}, expected {}!'.format(
+                    i, (signal.num_channels, signal.signal_length), shape))
+
+        audio_data = np.empty((len(audio_signals),) + shape, dtype=first.dtype)
+        for i, signal in enumerate(audio_signals):
+            audio_data[i] = signal.audio_data
+
+        stft_params = first.stft_params if stft_params is None else stft_params
+        return AudioSignalBatch(audio_data_array=audio_data, sample_rate=first.sample_rate,
+                                stft_params=stft_params, dtype=first.dtype)
+
+    ##################################################
+    #                 Properties
+    ##################################################
+
+    @property
+    def audio_data(self):
+        """
+        (:obj:`np.ndarray`): Time-series data of the whole batch, a C-contiguous array with shape
+        `(batch_size, n_channels, n_samples)`. ``None`` if there is none.
+        """
+        return self._audio_data
+
+    @audio_data.setter
+    def audio_data(self, value):
+        if value is None:
+            self._audio_data = None
+            return
+
+        if not isinstance(value, np.ndarray):
+            raise AudioSignalException('Type of self.audio_data must be of type np.ndarray!')
+
+        if value.ndim == 2:
+            value = np.expand_dims(value, axis=1)
+
+        if value.ndim != 3:
+            raise AudioSignalException('self.audio_data must have shape (batch_size, n_channels, '
+                                       'n_samples), got {}!'.format(value.shape))
+
+        if not np.isfinite(value).all():
+            raise AudioSignalException('Not all values of audio_data are finite!')
+
+        self._audio_data = np.ascontiguousarray(value, dtype=self._dtype)
+
+    @property
+    def stft_data(self):
+        """
+        (:obj:`np.ndarray`): Complex STFT data of the whole batch, with shape
+        `(batch_size, n_frequency_bins, n_hops, n_channels)`. ``None`` if there is none.
+        """
+        return self._stft_data
+
+    @stft_data.setter
+    def stft_data(self, value):
+        if value is None:
+            self._stft_data = None
+            return
+
+        if not isinstance(value, np.ndarray):
+            raise AudioSignalException('Type of self.stft_data must be of type np.ndarray!')
+
+        if value.ndim == 3:
+            value = np.expand_dims(value, axis=-1)
+
+        if value.ndim != 4:
+            raise AudioSignalException('self.stft_data must have shape (batch_size, n_bins, '
+                                       'n_hops, n_channels), got {}!'.format(value.shape))
+
+        self._stft_data = value.astype(self.complex_dtype, copy=False)
+
+    @property
+    def dtype(self):
+        """
+        (str): Floating point dtype of :attr:`audio_data`, ``'float32'`` or ``'float64'``.
+        """
+        return self._dtype
+
+    @property
+    def complex_dtype(self):
+        """
+        (str): Complex dtype of :attr:`stft_data` that goes with :attr:`dtype`.
+        """
+        return np.result_type(self._dtype, np.complex64).name
+
+    @property
+    def has_audio_data(self):
+        """
+        (bool): ``True`` if :attr:`audio_data` is not ``None`` and not empty.
+        """
+        return self._audio_data is not None and self._audio_data.size != 0
+
+    @property
+    def has_stft_data(self):
+        """
+        (bool): ``True`` if :attr:`stft_data` is not ``None`` and not empty.
+        """
+        return self._stft_data is not None and self._stft_data.size != 0
+
+    @property
+    def batch_size(self):
+        """
+        (int): Number of signals in the batch.
+        """
+        if self.has_audio_data:
+            return self._audio_data.shape[0]
+        if self.has_stft_data:
+            return self._stft_data.shape[0]
+        return 0
+
+    @property
+    def num_channels(self):
+        """
+        (int): Number of channels of every signal in the batch.
+        """
+        if self.has_audio_data:
+            return self._audio_data.shape[1]
+        if self.has_stft_data:
+            return self._stft_data.shape[-1]
+        return None
+
+    @property
+    def signal_length(self):
+        """
+        (int): Number of samples of every signal in the batch, ``None`` without :attr:`audio_data`.
+        """
+        return self._audio_data.shape[-1] if self.has_audio_data else None
+
+    ##################################################
+    #                 Per item views
+    ##################################################
+
+    def get_signal(self, index):
+        """
+        Makes an :class:`AudioSignal` for one item of the batch. Its :attr:`AudioSignal.audio_data`
+        and :attr:`AudioSignal.stft_data` are views into :attr:`audio_data` and :attr:`stft_data`,
+        so nothing is copied, and writing to them in place writes to the batch.
+        ``batch[index]`` does the same.
+
+        Args:
+            index (int): Index of the item in the batch.
+
+        Returns:
+            (:class:`AudioSignal`): View of item :param:`index`.
+
+        """
+        if not -self.batch_size <= index < self.batch_size:
+            raise AudioSignalException('Index {} is out of range for a batch of {}!'.format(
+                index, self.batch_size))
+
+        signal = AudioSignal(sample_rate=self.sample_rate, stft_params=self.stft_params,
+                             dtype=self._dtype)
+
+        if self.has_audio_data:
+            signal.audio_data = self._audio_data[index]
+
+        if self.has_stft_data:
+            signal.stft_data = self._stft_data[index]
+
+        return signal
+
+    ##################################################
+    #                 STFT Utilities
+    ##################################################
+
+    def stft(self, window_length=None, hop_length=None, window_type=None, n_fft_bins=None,
+             remove_reflection=True, overwrite=True, workers=None):
+        """
+        Computes the STFT of every channel of every signal in :attr:`audio_data` with a single
+        call to :func:`stft_utils.e_stft`. Arguments default to :attr:`stft_params`, see
+        :func:`AudioSignal.stft`.
+
+        Args:
+            window_length (int): Amount of time (in samples) to do an FFT on
+            hop_length (int): Amount of time (in samples) to skip ahead for the new FFT
+            window_type (str): Type of scaling to apply to the window.
+            n_fft_bins (int): Number of FFT bins per each hop
+            remove_reflection (bool): Should remove reflection above Nyquist
+            overwrite (bool): Overwrite :attr:`stft_data` with current calculation
+            workers (int): Number of threads to spread the FFTs across (needs scipy >= 1.4).
+
+        Returns:
+            (:obj:`np.ndarray`) Complex-valued STFT with shape
+            `(batch_size, n_frequency_bins, n_hops, n_channels)`.
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No time domain signal (self.audio_data) to make STFT from!')
+
+        window_length = self.stft_params.window_length if window_length is None \
+            else int(window_length)
+        hop_length = self.stft_params.hop_length if hop_length is None else int(hop_length)
+        window_type = self.stft_params.window_type if window_type is None else window_type
+        n_fft_bins = self.stft_params.n_fft_bins if n_fft_bins is None else int(n_fft_bins)
+
+        batch_size, n_channels, n_samples = self._audio_data.shape
+
+        # every channel of every item is one row for e_stft, which returns (n_bins, n_hops, rows)
+        stft = stft_utils.e_stft(self._audio_data.reshape(batch_size * n_channels, n_samples),
+                                 window_length, hop_length, window_type, n_fft_bins,
+                                 remove_reflection, workers=workers)
+        stft = stft.reshape(stft.shape[:2] + (batch_size, n_channels)).transpose((2, 0, 1, 3))
+
+        if overwrite:
+            self.stft_data = stft
+
+        return stft
+
+    def istft(self, window_length=None, hop_length=None, window_type=None, overwrite=True,
+              truncate_to_length=None, workers=None):
+        """
+        Computes the inverse STFT of every channel of every signal in :attr:`stft_data` with a
+        single call to :func:`stft_utils.e_istft`. Arguments default to :attr:`stft_params`, see
+        :func:`AudioSignal.istft`.
+
+        Args:
+            window_length (int): Amount of time (in samples) to do an FFT on
+            hop_length (int): Amount of time (in samples) to skip ahead for the new FFT
+            window_type (str): Type of scaling to apply to the window.
+            overwrite (bool): Overwrite :attr:`audio_data` with current calculation
+            truncate_to_length (int): truncate resultant signals to specified length. Defaults to
+                :attr:`signal_length` if there is :attr:`audio_data`.
+            workers (int): Number of threads to spread the inverse FFTs across (needs scipy >= 1.4).
+
+        Returns:
+            (:obj:`np.ndarray`) Real-valued signals with shape `(batch_size, n_channels, n_samples)`.
+
+        """
+        if not self.has_stft_data:
+            raise AudioSignalException('Cannot do inverse STFT without self.stft_data!')
+
+        window_length = self.stft_params.window_length if window_length is None \
+            else int(window_length)
+        hop_length = self.stft_params.hop_length if hop_length is None else int(hop_length)
+        window_type = self.stft_params.window_type if window_type is None else window_type
+
+        batch_size, n_bins, n_hops, n_channels = self._stft_data.shape
+
+        # no copy is made if stft_data came from stft()
+        stft = self._stft_data.transpose((1, 2, 0, 3)).reshape(n_bins, n_hops,
+                                                               batch_size * n_channels)
+        signals = stft_utils.e_istft(stft, window_length, hop_length, window_type, workers=workers)
+        signals = signals.reshape(batch_size, n_channels, -1)
+
+        if truncate_to_length is None:
+            truncate_to_length = self.signal_length
+
+        if truncate_to_length is not None and truncate_to_length > 0:
+            signals = signals[..., :truncate_to_length]
+
+        if overwrite or self._audio_data is None:
+            self.audio_data = signals
+
+        return signals
+
+    def apply_mask(self, mask, overwrite=False):
+        """
+        Applies masks to :attr:`stft_data` and returns a new :class:`AudioSignalBatch` with the
+        masked STFT.
+
+        Args:
+            mask: Either a list of :ref:`mask_base`-derived objects, one per item in the batch, or a
+                numpy array with the shape of :attr:`stft_data` (or any shape that broadcasts to it,
+                e.g. `(n_frequency_bins, n_hops, n_channels)` to use the same mask for every item).
+            overwrite (bool): If ``True``, this will alter :attr:`stft_data` in self. If ``False``,
+                this function will create a new :class:`AudioSignalBatch` object with the masks
+                applied.
+
+        Returns:
+            A new :class:`AudioSignalBatch` object with the masks applied to the STFT,
+            iff :param:`overwrite` is False.
+
+        """
+        # Lazy load to prevent a circular reference upon initialization
+        from ..separation.masks import mask_base
+
+        if not self.has_stft_data:
+            raise AudioSignalException('There is no STFT data to apply a mask to!')
+
+        if isinstance(mask, (list, tuple)):
+            if len(mask) != self.batch_size:
+                raise AudioSignalException('Got {} masks for a batch of {}!'.format(
+                    len(mask), self.batch_size))
+
+            for m in mask:
+                if not isinstance(m, mask_base.MaskBase):
+                    raise AudioSignalException('mask is {} but is expected to be a '
+                                               'MaskBase-derived object!'.format(type(m)))
+
+                if m.shape != self._stft_data.shape[1:]:
+                    raise AudioSignalException('Input mask and items in self.stft_data are not the '
+                                               'same shape! mask: {}, item: {}'
+                                               .format(m.shape, self._stft_data.shape[1:]))
+
+            # each item goes through apply_masks, so packed, quantized and profile masks are only
+            # expanded a block at a time, and the result is written straight into the output
+            masked_stft = self._stft_data if overwrite else np.empty_like(self._stft_data)
+            for i, m in enumerate(mask):
+                mask_base.apply_masks(self._stft_data[i], [m], out=masked_stft[i:i + 1])
+
+            if overwrite:
+                return
+
+            return self.make_copy_with_stft_data(masked_stft)
+
+        elif isinstance(mask, mask_base.MaskBase):
+            mask = mask.mask
+
+        if not isinstance(mask, np.ndarray):
+            raise AudioSignalException('mask is {} but is expected to be a list of MaskBase-derived '
+                                       'objects or a numpy array!'.format(type(mask)))
+
+        try:
+            shape = np.broadcast(self._stft_data, mask).shape
+        except ValueError:
+            shape = None
+
+        if shape != self._stft_data.shape:
+            raise AudioSignalException('Input mask and self.stft_data are not the same shape! '
+                                       'mask: {}, self.stft_data: {}'.format(mask.shape,
+                                                                             self._stft_data.shape))
+
+        if overwrite:
+            # multiply in this batch's precision, so a float64 mask doesn't upcast complex64 data
+            np.multiply(self._stft_data, mask, out=self._stft_data, casting='unsafe')
+            return
+
+        masked_stft = np.multiply(self._stft_data, mask, dtype=self._stft_data.dtype)
+        return self.make_copy_with_stft_data(masked_stft)
+
+    def make_copy_with_stft_data(self, stft_data):
+        """
+        Makes a new :class:`AudioSignalBatch` with the same sample rate, :attr:`stft_params` and
+        :attr:`dtype` as this one, holding :param:`stft_data` and no :attr:`audio_data`.
+
+        Args:
+            stft_data (:obj:`np.ndarray`): STFT data with shape
+                `(batch_size, n_frequency_bins, n_hops, n_channels)`.
+
+        Returns:
+            (:class:`AudioSignalBatch`): The new batch.
+
+        """
+        return AudioSignalBatch(stft=stft_data, sample_rate=self.sample_rate,
+                                stft_params=self.stft_params, dtype=self._dtype)
+
+    ##################################################
+    #                  Operations
+    ##################################################
+
+    def rms(self):
+        """
+        Calculates the root-mean-square of every signal in :attr:`audio_data`, over all of its
+        channels, like :func:`AudioSignal.rms`.
+
+        Returns:
+            (:obj:`np.ndarray`): 1D array with one root-mean-square value per item.
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No audio data to calculate the rms of!')
+
+        return np.sqrt(np.mean(np.square(self._audio_data), axis=(1, 2)))
+
+    def peak_normalize(self, overwrite=True):
+        """
+        Normalizes ``abs(audio_data)`` of every signal whose peak is above 1.0 to 1.0, like
+        :func:`AudioSignal.peak_normalize` does for one signal. Signals that already peak at or
+        below 1.0 are left alone.
+
+        Args:
+            overwrite (bool): If ``True``, :attr:`audio_data` is normalized in place.
+
+        Returns:
+            (:obj:`np.ndarray`): Normalized copy of :attr:`audio_data` (or :attr:`audio_data`
+            itself with ``overwrite=True``).
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No audio data to normalize!')
+
+        peaks = np.max(np.abs(self._audio_data), axis=(1, 2), keepdims=True)
+        scale = np.maximum(peaks, 1.0).astype(self._dtype)
+
+        if overwrite:
+            self._audio_data /= scale
+            return self._audio_data
+
+        return self._audio_data / scale
+
+    def to_mono(self, overwrite=False, keep_dims=False):
+        """
+        Converts every signal in :attr:`audio_data` to mono by averaging its channels.
+
+        Args:
+            overwrite (bool): If `True` this function will overwrite :attr:`audio_data`.
+            keep_dims (bool): If `False` this function will return a 2D array with shape
+                `(batch_size, n_samples)`, else will return an array with shape
+                `(batch_size, 1, n_samples)`.
+
+        Warning:
+            If ``overwrite=True`` this will overwrite any data in :attr:`audio_data`!
+
+        Returns:
+            (:obj:`np.ndarray`): Mono-ed version of :attr:`audio_data`.
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No audio data to convert to mono!')
+
+        mono = np.mean(self._audio_data, axis=1, keepdims=keep_dims)
+
+        if overwrite:
+            self.audio_data = mono
+        return mono
+
+
+class RaggedAudioSignalBatch(object):
+    """
+    Container for a batch of audio signals with the same sample rate and number of channels but
+    different lengths, e.g. the clips that :mod:`datasets` generators yield.
+
+    The signals are stored back to back in one flat buffer, :attr:`audio_data`, with shape
+    `(n_channels, total_samples)`; item ``i`` is ``audio_data[:, offsets[i]:offsets[i + 1]]``. The
+    STFT is stored the same way in :attr:`stft_data`, with shape
+    `(n_frequency_bins, total_hops, n_channels)` and item ``i`` at
+    ``stft_data[:, hop_offsets[i]:hop_offsets[i + 1]]``.
+
+    :func:`stft` and :func:`istft` group the items into buckets of similar length (see
+    :func:`buckets`) and do one vectorized transform per bucket, with every item zero padded to
+    the longest item in its bucket. Only that padding is wasted, so transforming the whole batch
+    costs about as much as transforming each item on its own, without the per-item overhead.
+    The results are the same as :func:`AudioSignal.stft` and :func:`AudioSignal.istft` give for
+    each item.
+
+    Parameters:
+        audio_data_array (:obj:`np.ndarray`): Flat buffer with shape `(n_channels, total_samples)`,
+            or 1D for a batch of mono signals.
+        offsets (:obj:`np.ndarray`): 1D array of ``batch_size + 1`` increasing ints, the start of
+            every item in the buffer followed by ``total_samples``. Every item needs at least one
+            sample.
+        stft (:obj:`np.ndarray`): Flat complex STFT buffer with shape
+            `(n_frequency_bins, total_hops, n_channels)`. Needs :param:`hop_offsets`.
+        hop_offsets (:obj:`np.ndarray`): Like :param:`offsets`, for the hops in :param:`stft`.
+        sample_rate (int): Sample rate of every signal in the batch. Defaults to
+            :attr:`constants.DEFAULT_SAMPLE_RATE`.
+        stft_params (:obj:`StftParams`): STFT settings shared by the whole batch.
+        dtype (str): ``'float32'`` or ``'float64'`` (default), see :attr:`AudioSignal.dtype`.
+
+    Attributes:
+        stft_params (:obj:`StftParams`): STFT settings for the whole batch. The :class:`AudioSignal`
+            views returned by :func:`get_signal` share this object.
+        max_padding (float): Default for :func:`buckets`, the largest fraction of the longest item
+            in a bucket that the other items in it can be zero padded by. Defaults to 0.1.
+
+    """
+
+    def __init__(self, audio_data_array=None, offsets=None, stft=None, hop_offsets=None,
+                 sample_rate=None, stft_params=None, dtype=None):
+        self._dtype = np.dtype(constants.DEFAULT_DTYPE if dtype is None else dtype).name
+        if self._dtype not in (constants.FLOAT32, constants.FLOAT64):
+            raise AudioSignalException('dtype must be {} or {}, got {}!'.format(constants.FLOAT32,
+                                                                               constants.FLOAT64,
+                                                                               self._dtype))
+
+        if offsets is None:
+            raise AudioSignalException('RaggedAudioSignalBatch needs the sample offsets of every '
+                                       'item!')
+
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if offsets.ndim != 1 or len(offsets) < 2 or offsets[0] != 0 or \
+                np.any(np.diff(offsets) <= 0):
+            raise AudioSignalException('offsets must start at 0 and strictly increase, got '
+                                       '{}!'.format(offsets))
+
+        self._offsets = offsets
+        self._audio_data = None
+        self._stft_data = None
+        self._hop_offsets = None
+        self.sample_rate = constants.DEFAULT_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.stft_params = stft_utils.StftParams(self.sample_rate) \
+            if stft_params is None else stft_params
+        self.max_padding = 0.1
+
+        if audio_data_array is not None:
+            self.audio_data = audio_data_array
+
+        if stft is not None:
+            self.set_stft_data(stft, hop_offsets)
+
+    def __str__(self):
+        return self.__class__.__name__
+
+    def __len__(self):
+        return self.batch_size
+
+    def __getitem__(self, index):
+        return self.get_signal(index)
+
+    def __iter__(self):
+        for i in range(self.batch_size):
+            yield self.get_signal(i)
+
+    @staticmethod
+    def from_signals(audio_signals, stft_params=None):
+        """
+        Concatenates the active regions of a list of :class:`AudioSignal` objects into a new
+        :class:`RaggedAudioSignalBatch`. The signals are copied once, straight into the flat buffer.
+
+        Args:
+            audio_signals (list): :class:`AudioSignal` objects, all with the same sample rate and
+                number of channels.
+            stft_params (:obj:`StftParams`): STFT settings of the batch. Defaults to the
+                :attr:`AudioSignal.stft_params` of the first signal.
+
+        Returns:
+            (:class:`RaggedAudioSignalBatch`): A new batch holding a copy of every signal.
+
+        Raises:
+            AudioSignalException: If :param:`audio_signals` is empty, a signal has no audio data,
+                or the signals do not agree on sample rate or number of channels.
+
+        """
+        if len(audio_signals) == 0:
+            raise AudioSignalException('Cannot make a RaggedAudioSignalBatch without any signals!')
+
+        first = audio_signals[0]
+        for i, signal in enumerate(audio_signals):
+            if not signal.has_audio_data:
+                raise AudioSignalException('Signal {} has no audio data!'.format(i))
+
+            if signal.sample_rate != first.sample_rate:
+                raise AudioSignalException('Signal {} has sample rate {}, expected {}!'.format(
+                    i, signal.sample_rate, first.sample_rate))
+
+            if signal.num_channels != first.num_channels:
+                raise AudioSignalException('Signal {} has {} channels, expected {}!'.format(
+                    i, signal.num_channels, first.num_channels))
+
+        offsets = np.cumsum([0] + [signal.signal_length for signal in audio_signals])
+        audio_data = np.empty((first.num_channels, offsets[-1]), dtype=first.dtype)
+        for i, signal in enumerate(audio_signals):
+            audio_data[:, offsets[i]:offsets[i + 1]] = signal.audio_data
+
+        stft_params = first.stft_params if stft_params is None else stft_params
+        return RaggedAudioSignalBatch(audio_data_array=audio_data, offsets=offsets,
+                                      sample_rate=first.sample_rate, stft_params=stft_params,
+                                      dtype=first.dtype)
+
+    ##################################################
+    #                 Properties
+    ##################################################
+
+    @property
+    def audio_data(self):
+        """
+        (:obj:`np.ndarray`): Flat, C-contiguous buffer with every signal of the batch, with shape
+        `(n_channels, total_samples)`. ``None`` if there is none.
+        """
+        return self._audio_data
+
+    @audio_data.setter
+    def audio_data(self, value):
+        if value is None:
+            self._audio_data = None
+            return
+
+        if not isinstance(value, np.ndarray):
+            raise AudioSignalException('Type of self.audio_data must be of type np.ndarray!')
+
+        if value.ndim == 1:
+            value = np.expand_dims(value, axis=constants.CHAN_INDEX)
+
+        if value.ndim != 2 or value.shape[-1] != self._offsets[-1]:
+            raise AudioSignalException('self.audio_data must have shape (n_channels, {}), got '
+                                       '{}!'.format(self._offsets[-1], value.shape))
+
+        if not np.isfinite(value).all():
+            raise AudioSignalException('Not all values of audio_data are finite!')
+
+        self._audio_data = np.ascontiguousarray(value, dtype=self._dtype)
+
+    @property
+    def stft_data(self):
+        """
+        (:obj:`np.ndarray`): Flat STFT buffer with shape `(n_frequency_bins, total_hops, n_channels)`,
+        see :attr:`hop_offsets`. ``None`` if there is none. Set it with :func:`set_stft_data`.
+        """
+        return self._stft_data
+
+    def set_stft_data(self, stft_data, hop_offsets=None):
+        """
+        Sets :attr:`stft_data` and :attr:`hop_offsets`.
+
+        Args:
+            stft_data (:obj:`np.ndarray`): Complex array with shape
+                `(n_frequency_bins, total_hops, n_channels)`, or ``None``.
+            hop_offsets (:obj:`np.ndarray`): Offsets of every item in :param:`stft_data`, like
+                :attr:`offsets`. Can be left out if it doesn't change.
+
+        """
+        if stft_data is None:
+            self._stft_data = None
+            self._hop_offsets = None
+            return
+
+        if not isinstance(stft_data, np.ndarray):
+            raise AudioSignalException('Type of self.stft_data must be of type np.ndarray!')
+
+        hop_offsets = self._hop_offsets if hop_offsets is None \
+            else np.asarray(hop_offsets, dtype=np.int64)
+        if hop_offsets is None or len(hop_offsets) != len(self._offsets):
+            raise AudioSignalException('Need the hop offsets of all {} items!'.format(
+                self.batch_size))
+
+        if stft_data.ndim == 2:
+            stft_data = np.expand_dims(stft_data, axis=constants.STFT_CHAN_INDEX)
+
+        if stft_data.ndim != 3 or stft_data.shape[constants.STFT_LEN_INDEX] != hop_offsets[-1]:
+            raise AudioSignalException('self.stft_data must have shape (n_bins, {}, n_channels), '
+                                       'got {}!'.format(hop_offsets[-1], stft_data.shape))
+
+        self._stft_data = stft_data.astype(self.complex_dtype, copy=False)
+        self._hop_offsets = hop_offsets
+
+    @property
+    def offsets(self):
+        """
+        (:obj:`np.ndarray`): ``batch_size + 1`` sample offsets, item ``i`` is
+        ``audio_data[:, offsets[i]:offsets[i + 1]]``.
+        """
+        return self._offsets
+
+    @property
+    def hop_offsets(self):
+        """
+        (:obj:`np.ndarray`): ``batch_size + 1`` hop offsets, item ``i`` is
+        ``stft_data[:, hop_offsets[i]:hop_offsets[i + 1]]``. ``None`` without :attr:`stft_data`.
+        """
+        return self._hop_offsets
+
+    @property
+    def lengths(self):
+        """
+        (:obj:`np.ndarray`): Number of samples of every item.
+        """
+        return np.diff(self._offsets)
+
+    @property
+    def dtype(self):
+        """
+        (str): Floating point dtype of :attr:`audio_data`, ``'float32'`` or ``'float64'``.
+        """
+        return self._dtype
+
+    @property
+    def complex_dtype(self):
+        """
+        (str): Complex dtype of :attr:`stft_data` that goes with :attr:`dtype`.
+        """
+        return np.result_type(self._dtype, np.complex64).name
+
+    @property
+    def has_audio_data(self):
+        """
+        (bool): ``True`` if :attr:`audio_data` is not ``None``.
+        """
+        return self._audio_data is not None
+
+    @property
+    def has_stft_data(self):
+        """
+        (bool): ``True`` if :attr:`stft_data` is not ``None``.
+        """
+        return self._stft_data is not None
+
+    @property
+    def batch_size(self):
+        """
+        (int): Number of signals in the batch.
+        """
+        return len(self._offsets) - 1
+
+    @property
+    def num_channels(self):
+        """
+        (int): Number of channels of every signal in the batch.
+        """
+        if self.has_audio_data:
+            return self._audio_data.shape[constants.CHAN_INDEX]
+        if self.has_stft_data:
+            return self._stft_data.shape[constants.STFT_CHAN_INDEX]
+        return None
+
+    ##################################################
+    #                 Per item views
+    ##################################################
+
+    def get_signal(self, index):
+        """
+        Makes an :class:`AudioSignal` for one item of the batch, whose
+        :attr:`AudioSignal.audio_data` and :attr:`AudioSignal.stft_data` are views into the flat
+        buffers. ``batch[index]`` does the same.
+
+        Args:
+            index (int): Index of the item in the batch.
+
+        Returns:
+            (:class:`AudioSignal`): View of item :param:`index`.
+
+        """
+        if not -self.batch_size <= index < self.batch_size:
+            raise AudioSignalException('Index {} is out of range for a batch of {}!'.format(
+                index, self.batch_size))
+
+        index %= self.batch_size
+        signal = AudioSignal(sample_rate=self.sample_rate, stft_params=self.stft_params,
+                             dtype=self._dtype)
+
+        if self.has_audio_data:
+            signal.audio_data = self._audio_data[:, self._offsets[index]:self._offsets[index + 1]]
+
+        if self.has_stft_data:
+            start, end = self._hop_offsets[index], self._hop_offsets[index + 1]
+            signal.stft_data = self._stft_data[:, start:end]
+
+        return signal
+
+    def buckets(self, max_padding=None):
+        """
+        Groups the items of the batch by length. Items are sorted from longest to shortest and a
+        new bucket is started whenever an item would need more than
+        ``max_padding * longest item in the bucket`` samples of zero padding.
+
+        Args:
+            max_padding (float): Largest fraction of the longest item in a bucket that the other
+                items can be padded by. ``0`` only puts items of the same length together.
+                Defaults to :attr:`max_padding`.
+
+        Returns:
+            (list): 1D arrays of item indices, one per bucket, longest items first.
+
+        """
+        max_padding = self.max_padding if max_padding is None else max_padding
+        lengths = self.lengths
+        order = np.argsort(-lengths, kind='mergesort')
+
+        buckets = []
+        start = 0
+        while start < len(order):
+            min_length = (1.0 - max_padding) * lengths[order[start]]
+            end = start + np.searchsorted(-lengths[order[start:]], -min_length, side='right')
+            buckets.append(order[start:end])
+            start = end
+
+        return buckets
+
+    def pad(self, indices=None):
+        """
+        Copies items into a zero padded `(n_items, n_channels, max_length)` array, e.g. for an
+        :class:`AudioSignalBatch`, along with a padding mask that tells the samples apart from the
+        padding.
+
+        Args:
+            indices (list): Indices of the items to copy. Defaults to every item.
+
+        Returns:
+            (tuple) ``(audio_data, valid)``: the padded array and a boolean array with shape
+            `(n_items, max_length)` that is ``True`` where :param:`audio_data` holds a sample.
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No audio data to pad!')
+
+        indices = np.arange(self.batch_size) if indices is None else np.asarray(indices)
+        lengths = self.lengths[indices]
+
+        padded = np.zeros((len(indices), self.num_channels, lengths.max()), dtype=self._dtype)
+        for row, i in enumerate(indices):
+            padded[row, :, :lengths[row]] = self._audio_data[:, self._offsets[i]:self._offsets[i + 1]]
+
+        valid = np.arange(lengths.max()) < lengths[:, np.newaxis]
+        return padded, valid
+
+    ##################################################
+    #                 STFT Utilities
+    ##################################################
+
+    def stft(self, window_length=None, hop_length=None, window_type=None, n_fft_bins=None,
+             remove_reflection=True, overwrite=True, max_padding=None, workers=None):
+        """
+        Computes the STFT of every item with one :func:`stft_utils.e_stft` call per bucket from
+        :func:`buckets`. Item ``i`` of the result is exactly what :func:`AudioSignal.stft` gives for
+        it: with the padding ``e_stft`` puts at the start being the same for every length, the first
+        hops of a zero padded item are the hops of the item itself.
+
+        Args:
+            window_length (int): Amount of time (in samples) to do an FFT on
+            hop_length (int): Amount of time (in samples) to skip ahead for the new FFT
+            window_type (str): Type of scaling to apply to the window.
+            n_fft_bins (int): Number of FFT bins per each hop
+            remove_reflection (bool): Should remove reflection above Nyquist
+            overwrite (bool): Overwrite :attr:`stft_data` and :attr:`hop_offsets`
+            max_padding (float): See :func:`buckets`.
+            workers (int): Number of threads to spread the FFTs across (needs scipy >= 1.4).
+
+        Returns:
+            (tuple) ``(stft_data, hop_offsets)``: flat complex STFT buffer with shape
+            `(n_frequency_bins, total_hops, n_channels)` and the offsets of every item in it.
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No time domain signal (self.audio_data) to make STFT from!')
+
+        window_length = self.stft_params.window_length if window_length is None \
+            else int(window_length)
+        hop_length = self.stft_params.hop_length if hop_length is None else int(hop_length)
+        window_type = self.stft_params.window_type if window_type is None else window_type
+        n_fft_bins = self.stft_params.n_fft_bins if n_fft_bins is None else int(n_fft_bins)
+
+        n_channels = self.num_channels
+        n_hops = np.array([stft_utils._zero_padding_lengths(length, window_length, hop_length)[2]
+                           for length in self.lengths])
+        hop_offsets = np.concatenate([[0], np.cumsum(n_hops)])
+
+        # work in the memory layout e_stft returns, (n_channels, n_hops, n_bins), so items are
+        # copied in contiguous blocks, and hand out the transposed view
+        stft_data = None
+        for bucket in self.buckets(max_padding):
+            padded, _ = self.pad(bucket)
+            stft = stft_utils.e_stft(padded.reshape(-1, padded.shape[-1]), window_length,
+                                     hop_length, window_type, n_fft_bins, remove_reflection,
+                                     workers=workers)
+            stft = stft.T.reshape((len(bucket), n_channels) + stft.shape[1::-1])
+
+            if stft_data is None:
+                stft_data = np.empty((n_channels, hop_offsets[-1], stft.shape[-1]),
+                                     dtype=stft.dtype)
+
+            for row, i in enumerate(bucket):
+                stft_data[:, hop_offsets[i]:hop_offsets[i + 1]] = stft[row, :, :n_hops[i]]
+
+        stft_data = stft_data.T
+
+        if overwrite:
+            self.set_stft_data(stft_data, hop_offsets)
+
+        return stft_data, hop_offsets
+
+    def istft(self, window_length=None, hop_length=None, window_type=None, overwrite=True,
+              max_padding=None, workers=None):
+        """
+        Computes the inverse STFT of every item with one :func:`stft_utils.e_istft_ragged` call per
+        bucket from :func:`buckets`, and truncates every item to its length in :attr:`offsets`, like
+        :func:`AudioSignal.istft` does.
+
+        Args:
+            window_length (int): Amount of time (in samples) to do an FFT on
+            hop_length (int): Amount of time (in samples) to skip ahead for the new FFT
+            window_type (str): Type of scaling to apply to the window.
+            overwrite (bool): Overwrite :attr:`audio_data` with current calculation
+            max_padding (float): See :func:`buckets`.
+            workers (int): Number of threads to spread the inverse FFTs across (needs scipy >= 1.4).
+
+        Returns:
+            (:obj:`np.ndarray`) Flat buffer with shape `(n_channels, total_samples)`.
+
+        """
+        if not self.has_stft_data:
+            raise AudioSignalException('Cannot do inverse STFT without self.stft_data!')
+
+        window_length = self.stft_params.window_length if window_length is None \
+            else int(window_length)
+        hop_length = self.stft_params.hop_length if hop_length is None else int(hop_length)
+        window_type = self.stft_params.window_type if window_type is None else window_type
+
+        n_bins, _, n_channels = self._stft_data.shape
+        n_hops = np.diff(self._hop_offsets)
+        lengths = self.lengths
+
+        # (n_channels, total_hops, n_bins), the memory layout of stft_data if it came from stft()
+        stft_data = self._stft_data.T
+
+        audio_data = np.zeros((n_channels, self._offsets[-1]),
+                              dtype=stft_utils._float_dtype(self._stft_data))
+        for bucket in self.buckets(max_padding):
+            stft = np.zeros((len(bucket), n_channels, n_hops[bucket].max(), n_bins),
+                            dtype=self._stft_data.dtype)
+            for row, i in enumerate(bucket):
+                stft[row, :, :n_hops[i]] = stft_data[:, self._hop_offsets[i]:self._hop_offsets[i + 1]]
+
+            signals, signal_lengths = stft_utils.e_istft_ragged(
+                stft.reshape((-1,) + stft.shape[2:]).T, np.repeat(n_hops[bucket], n_channels),
+                window_length, hop_length, window_type, workers=workers)
+            signals = signals.reshape(len(bucket), n_channels, -1)
+
+            for row, i in enumerate(bucket):
+                length = min(lengths[i], signal_lengths[row * n_channels])
+                start = self._offsets[i]
+                audio_data[:, start:start + length] = signals[row, :, :length]
+
+        if overwrite or self._audio_data is None:
+            self.audio_data = audio_data
+
+        return audio_data
+
+    def apply_mask(self, mask, overwrite=False):
+        """
+        Applies masks to :attr:`stft_data` and returns a new :class:`RaggedAudioSignalBatch` with
+        the masked STFT.
+
+        Args:
+            mask: Either a list of :ref:`mask_base`-derived objects, one per item in the batch with
+                the shape of that item's STFT, or a numpy array with the shape of :attr:`stft_data`.
+            overwrite (bool): If ``True``, this will alter :attr:`stft_data` in self. If ``False``,
+                this function will create a new :class:`RaggedAudioSignalBatch` object with the masks
+                applied.
+
+        Returns:
+            A new :class:`RaggedAudioSignalBatch` object with the masks applied to the STFT,
+            iff :param:`overwrite` is False.
+
+        """
+        # Lazy load to prevent a circular reference upon initialization
+        from ..separation.masks import mask_base
+
+        if not self.has_stft_data:
+            raise AudioSignalException('There is no STFT data to apply a mask to!')
+
+        if isinstance(mask, (list, tuple)):
+            if len(mask) != self.batch_size:
+                raise AudioSignalException('Got {} masks for a batch of {}!'.format(
+                    len(mask), self.batch_size))
+
+            n_hops = np.diff(self._hop_offsets)
+            for i, m in enumerate(mask):
+                if not isinstance(m, mask_base.MaskBase):
+                    raise AudioSignalException('mask is {} but is expected to be a '
+                                               'MaskBase-derived object!'.format(type(m)))
+
+                shape = (self._stft_data.shape[0], n_hops[i], self._stft_data.shape[-1])
+                if m.shape != shape:
+                    raise AudioSignalException('Input mask and item {} of self.stft_data are not '
+                                               'the same shape! mask: {}, item: {}'
+                                               .format(i, m.shape, shape))
+
+            # each mask is applied to its own hops with apply_masks, so packed, quantized and
+            # profile masks are only expanded a block at a time
+            masked_stft = self._stft_data if overwrite else np.empty_like(self._stft_data)
+            for i, m in enumerate(mask):
+                hops = slice(self._hop_offsets[i], self._hop_offsets[i + 1])
+                mask_base.apply_masks(self._stft_data[:, hops], [m],
+                                      out=masked_stft[np.newaxis, :, hops])
+
+            if overwrite:
+                return
+
+            return self.make_copy_with_stft_data(masked_stft)
+
+        if not isinstance(mask, np.ndarray):
+            raise AudioSignalException('mask is {} but is expected to be a list of MaskBase-derived '
+                                       'objects or a numpy array!'.format(type(mask)))
+
+        if mask.shape != self._stft_data.shape:
+            raise AudioSignalException('Input mask and self.stft_data are not the same shape! '
+                                       'mask: {}, self.stft_data: {}'.format(mask.shape,
+                                                                             self._stft_data.shape))
+
+        if overwrite:
+            # multiply in this batch's precision, so a float64 mask doesn't upcast complex64 data
+            np.multiply(self._stft_data, mask, out=self._stft_data, casting='unsafe')
+            return
+
+        masked_stft = np.multiply(self._stft_data, mask, dtype=self._stft_data.dtype)
+        return self.make_copy_with_stft_data(masked_stft)
+
+    def make_copy_with_stft_data(self, stft_data, hop_offsets=None):
+        """
+        Makes a new :class:`RaggedAudioSignalBatch` with the same :attr:`offsets`, sample rate,
+        :attr:`stft_params` and :attr:`dtype` as this one, holding :param:`stft_data` and no
+        :attr:`audio_data`.
+
+        Args:
+            stft_data (:obj:`np.ndarray`): Flat STFT buffer.
+            hop_offsets (:obj:`np.ndarray`): Offsets of every item in :param:`stft_data`. Defaults
+                to :attr:`hop_offsets`.
+
+        Returns:
+            (:class:`RaggedAudioSignalBatch`): The new batch.
+
+        """
+        hop_offsets = self._hop_offsets if hop_offsets is None else hop_offsets
+        new_batch = RaggedAudioSignalBatch(offsets=self._offsets, stft=stft_data,
+                                           hop_offsets=hop_offsets, sample_rate=self.sample_rate,
+                                           stft_params=self.stft_params, dtype=self._dtype)
+        new_batch.max_padding = self.max_padding
+        return new_batch
+
+    ##################################################
+    #                  Operations
+    ##################################################
+
+    def rms(self):
+        """
+        Calculates the root-mean-square of every signal, over all of its channels.
+
+        Returns:
+            (:obj:`np.ndarray`): 1D array with one root-mean-square value per item.
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No audio data to calculate the rms of!')
+
+        energy = np.add.reduceat(np.square(self._audio_data), self._offsets[:-1], axis=-1)
+        return np.sqrt(energy.sum(axis=constants.CHAN_INDEX) / (self.lengths * self.num_channels))
+
+    def peak_normalize(self, overwrite=True):
+        """
+        Normalizes ``abs(audio_data)`` of every signal whose peak is above 1.0 to 1.0. Signals that
+        already peak at or below 1.0 are left alone.
+
+        Args:
+            overwrite (bool): If ``True``, :attr:`audio_data` is normalized in place.
+
+        Returns:
+            (:obj:`np.ndarray`): Normalized copy of :attr:`audio_data` (or :attr:`audio_data`
+            itself with ``overwrite=True``).
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No audio data to normalize!')
+
+        peaks = np.maximum.reduceat(np.abs(self._audio_data), self._offsets[:-1], axis=-1)
+        scale = np.repeat(np.maximum(peaks.max(axis=constants.CHAN_INDEX), 1.0), self.lengths)
+        scale = scale.astype(self._dtype)
+
+        if overwrite:
+            self._audio_data /= scale
+            return self._audio_data
+
+        return self._audio_data / scale
+
+    def to_mono(self, overwrite=False, keep_dims=False):
+        """
+        Converts every signal in :attr:`audio_data` to mono by averaging its channels.
+
+        Args:
+            overwrite (bool): If `True` this function will overwrite :attr:`audio_data`.
+            keep_dims (bool): If `False` this function will return a 1D array,
+                else will return array with shape `(1, total_samples)`.
+
+        Warning:
+            If ``overwrite=True`` this will overwrite any data in :attr:`audio_data`!
+
+        Returns:
+            (:obj:`np.ndarray`): Mono-ed version of :attr:`audio_data`.
+
+        """
+        if not self.has_audio_data:
+            raise AudioSignalException('No audio data to convert to mono!')
+
+        mono = np.mean(self._audio_data, axis=constants.CHAN_INDEX, keepdims=keep_dims)
+
+        if overwrite:
+            self.audio_data = mono
+        return mono
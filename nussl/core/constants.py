@@ -12,7 +12,10 @@ __all__ = ['DEFAULT_SAMPLE_RATE', 'DEFAULT_WIN_LEN_PARAM', 'DEFAULT_BIT_DEPTH',
            'WINDOW_HAMMING', 'WINDOW_RECTANGULAR', 'WINDOW_HANN',
            'WINDOW_BLACKMAN', 'WINDOW_TRIANGULAR', 'WINDOW_DEFAULT',
            'ALL_WINDOWS', 'NUMPY_JSON_KEY', 'LEN_INDEX', 'CHAN_INDEX',
-           'STFT_VERT_INDEX', 'STFT_LEN_INDEX', 'STFT_CHAN_INDEX']
+           'STFT_VERT_INDEX', 'STFT_LEN_INDEX', 'STFT_CHAN_INDEX', 'FLOAT32', 'FLOAT64',
+           'RESAMPLE_LIBROSA', 'RESAMPLE_POLYPHASE', 'RESAMPLE_FFT', 'RESAMPLE_DEFAULT',
+           'ALL_RESAMPLE_BACKENDS', 'RESAMPLE_QUALITY_LOW', 'RESAMPLE_QUALITY_MEDIUM',
+           'RESAMPLE_QUALITY_HIGH', 'RESAMPLE_QUALITY_DEFAULT']
 
 DEFAULT_SAMPLE_RATE = 44100  #: (int): Default sample rate. 44.1 kHz, CD-quality
 DEFAULT_WIN_LEN_PARAM = 0.04  #: (float): Default window length. 40ms
@@ -35,6 +38,19 @@ ALL_WINDOWS = [WINDOW_HAMMING, WINDOW_RECTANGULAR, WINDOW_HANN, WINDOW_BLACKMAN,
 
 NUMPY_JSON_KEY = "py/numpy.ndarray"  #: (str): key used when turning numpy arrays into json
 
+RESAMPLE_LIBROSA = 'librosa'  #: (str): Resample with *librosa*, one channel at a time. 'librosa'
+RESAMPLE_POLYPHASE = 'polyphase'  #: (str): Resample with a polyphase filter. 'polyphase'
+RESAMPLE_FFT = 'fft'  #: (str): Resample by cropping or zero padding the FFT. 'fft'
+RESAMPLE_DEFAULT = RESAMPLE_LIBROSA  #: (str): Default resampling backend, *librosa*.
+ALL_RESAMPLE_BACKENDS = [RESAMPLE_LIBROSA, RESAMPLE_POLYPHASE, RESAMPLE_FFT]
+"""list(str): list of all available resampling backends in *nussl*
+"""
+
+RESAMPLE_QUALITY_LOW = 'low'  #: (str): Fastest, shortest resampling filter. 'low'
+RESAMPLE_QUALITY_MEDIUM = 'medium'  #: (str): Resampling filter between low and high. 'medium'
+RESAMPLE_QUALITY_HIGH = 'high'  #: (str): Slowest, least aliasing resampling filter. 'high'
+RESAMPLE_QUALITY_DEFAULT = RESAMPLE_QUALITY_HIGH  #: (str): Default resampling quality, high.
+
 BINARY_MASK = 'binary'
 """ String alias for setting this object to return :class:`separation.masks.binary_mask.BinaryMask` objects
 """
@@ -79,6 +95,26 @@ NUSSL_EFZ_MODEL_METADATA_URL = urljoin(NUSSL_EFZ_BASE_URL, 'model-metadata.json'
 
 USE_LIBROSA_STFT = False  #: (bool): Whether *nussl* will use librosa's stft function by default
 
+# ############# Precision ############# #
+
+FLOAT32 = 'float32'
+"""
+(str) Single precision. :class:`AudioSignal` objects keep :attr:`audio_data` as ``float32`` and
+:attr:`stft_data` as ``complex64``, halving memory. An STFT/iSTFT round trip of audio in ``[-1, 1]``
+is accurate to about ``1e-6`` (``float32`` has a machine epsilon of ``1.2e-7``).
+"""
+FLOAT64 = 'float64'
+"""
+(str) Double precision. :attr:`audio_data` is ``float64`` and :attr:`stft_data` is ``complex128``.
+An STFT/iSTFT round trip is accurate to about ``1e-15``.
+"""
+DEFAULT_DTYPE = FLOAT64
+"""
+(str) Library-wide precision that new :class:`AudioSignal` objects use when they are not given a
+``dtype``. Set to :attr:`FLOAT32` to run *nussl* in single precision.
+"""
+
+
 
 # ############# MUSDB interface ############### #
 STEM_TARGET_DICT = {'vocals': {'vocals': 1},
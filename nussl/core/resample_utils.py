@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Resampling engines used by :func:`AudioSignal.resample`. Every backend resamples all channels of a
+``(n_channels, n_samples)`` array (or a 1D array) in one call.
+"""
+
+from __future__ import division
+
+import fractions
+
+import librosa
+import numpy as np
+import scipy.signal
+
+import constants
+import stft_utils
+
+__all__ = ['resample', 'resample_filter', 'resample_cache_info', 'clear_resample_cache']
+
+# quality -> (zero crossings of the sinc on each side, kaiser window beta, cutoff as a fraction of
+# the lower nyquist frequency). 'low' is scipy.signal.resample_poly's own default filter.
+_POLYPHASE_PRESETS = {
+    constants.RESAMPLE_QUALITY_LOW: (10, 5.0, 1.0),
+    constants.RESAMPLE_QUALITY_MEDIUM: (24, 8.6, 0.95),
+    constants.RESAMPLE_QUALITY_HIGH: (64, 12.0, 0.97),
+}
+
+_LIBROSA_PRESETS = {
+    constants.RESAMPLE_QUALITY_LOW: 'kaiser_fast',
+    constants.RESAMPLE_QUALITY_MEDIUM: 'kaiser_fast',
+    constants.RESAMPLE_QUALITY_HIGH: 'kaiser_best',
+}
+
+_filter_cache = stft_utils._ArrayCache(maxsize=32)
+
+
+def resample(signal, sample_rate, new_sample_rate, backend=None, quality=None):
+    """
+    Resamples :param:`signal` from :param:`sample_rate` to :param:`new_sample_rate`.
+
+    Backends:
+        * :attr:`constants.RESAMPLE_LIBROSA`: ``librosa.resample``, one channel at a time.
+        * :attr:`constants.RESAMPLE_POLYPHASE`: ``scipy.signal.resample_poly`` with the rational
+          ratio ``new_sample_rate / sample_rate``, using an anti-aliasing filter from
+          :func:`resample_filter` that is designed once per ratio and quality. This is much faster
+          than *librosa* for ratios with small terms, like 48 kHz -> 44.1 kHz (147/160) or
+          44.1 kHz -> 16 kHz (160/441).
+        * :attr:`constants.RESAMPLE_FFT`: ``scipy.signal.resample``, which crops or zero pads the
+          FFT of the whole signal. Fast when the signal length has small prime factors, but it
+          assumes the signal is periodic.
+
+    Args:
+        signal: 1D numpy array, or 2D numpy array with shape (n_channels, n_samples).
+        sample_rate: (int) sample rate of :param:`signal`.
+        new_sample_rate: (int) sample rate to resample to.
+        backend: (str) one of :attr:`constants.ALL_RESAMPLE_BACKENDS`. Defaults to
+            :attr:`constants.RESAMPLE_DEFAULT`.
+        quality: (str) :attr:`constants.RESAMPLE_QUALITY_LOW`, :attr:`constants.RESAMPLE_QUALITY_MEDIUM`
+            or :attr:`constants.RESAMPLE_QUALITY_HIGH`, trading speed for less aliasing. Picks the
+            filter for the polyphase backend and the ``res_type`` for *librosa*; the FFT backend
+            ignores it. Defaults to :attr:`constants.RESAMPLE_QUALITY_DEFAULT`.
+
+    Returns:
+        numpy array with the same number of dimensions as :param:`signal` and
+        ``ceil(n_samples * new_sample_rate / sample_rate)`` samples.
+
+    """
+    backend = constants.RESAMPLE_DEFAULT if backend is None else backend
+    quality = constants.RESAMPLE_QUALITY_DEFAULT if quality is None else quality
+
+    if backend not in constants.ALL_RESAMPLE_BACKENDS:
+        raise ValueError('Unknown resampling backend {}! Must be one of {}'.format(
+            backend, constants.ALL_RESAMPLE_BACKENDS))
+
+    if quality not in _POLYPHASE_PRESETS:
+        raise ValueError('Unknown resampling quality {}! Must be one of {}'.format(
+            quality, sorted(_POLYPHASE_PRESETS.keys())))
+
+    if backend == constants.RESAMPLE_POLYPHASE:
+        up, down = _ratio(sample_rate, new_sample_rate)
+        return scipy.signal.resample_poly(signal, up, down, axis=-1,
+                                          window=resample_filter(sample_rate, new_sample_rate, quality))
+
+    if backend == constants.RESAMPLE_FFT:
+        n_samples = int(np.ceil(signal.shape[-1] * new_sample_rate / sample_rate))
+        return scipy.signal.resample(signal, n_samples, axis=-1)
+
+    res_type = _LIBROSA_PRESETS[quality]
+    if signal.ndim == 1:
+        return librosa.resample(signal, sample_rate, new_sample_rate, res_type=res_type)
+
+    return np.array([librosa.resample(channel, sample_rate, new_sample_rate, res_type=res_type)
+                     for channel in signal])
+
+
+def resample_filter(sample_rate, new_sample_rate, quality=None):
+    """
+    Returns the (cached, read-only) anti-aliasing FIR filter that the polyphase backend of
+    :func:`resample` uses to go from :param:`sample_rate` to :param:`new_sample_rate`. Filters are
+    designed once per reduced ratio and quality, see :func:`resample_cache_info`.
+
+    Args:
+        sample_rate: (int) sample rate to resample from.
+        new_sample_rate: (int) sample rate to resample to.
+        quality: (str) see :func:`resample`.
+
+    Returns:
+        1D numpy array with the filter taps, normalized to unit gain at DC.
+
+    """
+    quality = constants.RESAMPLE_QUALITY_DEFAULT if quality is None else quality
+    up, down = _ratio(sample_rate, new_sample_rate)
+
+    def design():
+        zero_crossings, beta, cutoff = _POLYPHASE_PRESETS[quality]
+        max_rate = max(up, down)
+        half_length = zero_crossings * max_rate
+        return scipy.signal.firwin(2 * half_length + 1, cutoff / max_rate, window=('kaiser', beta))
+
+    return _filter_cache.get((up, down, quality), design)
+
+
+def _ratio(sample_rate, new_sample_rate):
+    ratio = fractions.Fraction(new_sample_rate) / fractions.Fraction(sample_rate)
+    return ratio.numerator, ratio.denominator
+
+
+def resample_cache_info():
+    """
+    Reports how well the cache of polyphase filters from :func:`resample_filter` is doing.
+
+    Returns:
+        :obj:`stft_utils.CacheInfo` named tuple of ``(hits, misses, maxsize, currsize)``.
+
+    """
+    return _filter_cache.info()
+
+
+def clear_resample_cache():
+    """
+    Empties the cache of polyphase filters and resets its hit/miss counters.
+    """
+    _filter_cache.clear()
@@ -3,8 +3,10 @@
 
 from __future__ import division
 
+import collections
 import json
 import os.path
+import threading
 import warnings
 
 import librosa
@@ -13,10 +15,17 @@ import numpy as np
 import scipy.fftpack as scifft
 import scipy.signal
 
+try:
+    # scipy >= 1.4 has real-input transforms that run over whole frame matrices
+    import scipy.fft as scipy_fft
+except ImportError:
+    scipy_fft = None
+
 import constants
 
-__all__ = ['plot_stft', 'e_stft', 'e_istft', 'e_stft_plus', 'librosa_stft_wrapper', 'librosa_istft_wrapper',
-           'make_window', 'StftParams']
+__all__ = ['plot_stft', 'e_stft', 'e_istft', 'e_stft_plus', 'e_stft_stream', 'e_istft_stream',
+           'e_stft_region', 'e_istft_ragged', 'librosa_stft_wrapper', 'librosa_istft_wrapper',
+           'make_window', 'window_cache_info', 'clear_window_cache', 'StftParams']
 
 
 def plot_stft(signal, file_name, title=None, win_length=None, hop_length=None,
@@ -113,9 +122,10 @@ def plot_stft(signal, file_name, title=None, win_length=None, hop_length=None,
 
 
 def e_stft(signal, window_length, hop_length, window_type,
-           n_fft_bins=None, remove_reflection=True, remove_padding=False):
+           n_fft_bins=None, remove_reflection=True, remove_padding=False, workers=None):
     """
-    This function computes a short time fourier transform (STFT) of a 1D numpy array input signal.
+    This function computes a short time fourier transform (STFT) of a 1D numpy array input signal, or of every
+    channel of a 2D numpy array with shape (n_channels, n_samples) in one call.
     This will zero pad the signal by half a hop_length at the beginning to reduce the window
     tapering effect from the first window. It also will zero pad at the end to get an integer number of hops.
 
@@ -124,11 +134,8 @@ def e_stft(signal, window_length, hop_length, window_type,
     inverse STFT function, e_istft(), expects data without the reflection, the onus is on the user to remember
     to set the reconstruct_reflection flag in e_istft() input.
 
-    Additionally, this function assumes a single channeled audio signal and is not guaranteed to work on
-    multichannel audio. If you want to do an STFT on multichannel audio see the AudioSignal object.
-
     Args:
-        signal: 1D numpy array containing audio data. (REAL)
+        signal: 1D numpy array containing audio data, or 2D numpy array with shape (n_channels, n_samples). (REAL)
         window_length: (int) number of samples per window
         hop_length: (int) number of samples between the start of adjacent windows, or "hop"
         window_type: (string) type of window to use. Using WindowType object is recommended.
@@ -138,11 +145,15 @@ def e_stft(signal, window_length, hop_length, window_type,
         If not specified, defaults to True.
         remove_padding: (bool) (Optional) if True, this will remove the extra padding added when doing the STFT.
         Defaults to True.
+        workers: (int) (Optional) number of threads the FFTs of all frames and channels are spread across.
+        Only used with scipy >= 1.4. Defaults to 1.
 
     Returns:
         2D  numpy array with complex STFT data.
-        Data is of shape (num_time_blocks, num_fft_bins). These numbers are determined by length of the input signal,
+        Data is of shape (num_fft_bins, num_time_blocks). These numbers are determined by length of the input signal,
         on internal zero padding (explained at top), and n_fft_bins/remove_reflection input (see example below).
+        If :param:`signal` is 2D, the output is 3D with shape (num_fft_bins, num_time_blocks, n_channels).
+        A float32 :param:`signal` gives complex64 STFT data, anything else gives complex128.
 
     Example:
         
@@ -183,26 +194,12 @@ def e_stft(signal, window_length, hop_length, window_type,
         n_fft_bins = window_length
 
     window_type = constants.WINDOW_DEFAULT if window_type is None else window_type
-    window = make_window(window_type, window_length)
+    window = make_window(window_type, window_length, dtype=_float_dtype(signal))
 
-    orig_signal_length = len(signal)
+    orig_signal_length = signal.shape[-1]
     signal, num_blocks = _add_zero_padding(signal, window_length, hop_length)
-    sig_zero_pad = len(signal)
-    # figure out size of output stft
-    stft_bins = n_fft_bins // 2 + 1 if remove_reflection else n_fft_bins  # only want just over half of each fft
-
-    # this is where we do the stft calculation
-    stft = np.zeros((num_blocks, stft_bins), dtype=complex)
-    for hop in range(num_blocks):
-        start = hop * hop_length
-        end = start + window_length
-        unwindowed_signal = signal[start:end]
-        windowed_signal = np.multiply(unwindowed_signal, window)
-        fft = scifft.fft(windowed_signal, n=n_fft_bins)
-        stft[hop, ] = fft[:stft_bins]
-
-    # reshape the 2d array, so it's (n_fft, n_hops).
-    stft = stft.T
+
+    stft = _stft_frames(signal, window, hop_length, num_blocks, n_fft_bins, remove_reflection, workers)
     stft = _remove_stft_padding(stft, orig_signal_length, window_length, hop_length) if remove_padding else stft
 
     return stft
@@ -237,29 +234,34 @@ def librosa_stft_wrapper(signal, window_length, hop_length, window_type=None, re
     return stft
 
 
-def e_istft(stft, window_length, hop_length, window_type, reconstruct_reflection=True, remove_padding=True):
+def e_istft(stft, window_length, hop_length, window_type, reconstruct_reflection=True, remove_padding=True,
+            workers=None):
     """
     Computes an inverse_mask short time fourier transform (STFT) from a 2D numpy array of complex values. By default
     this function assumes input STFT has no reflection above Nyquist and will rebuild it, but the
     reconstruct_reflection flag overrides that behavior.
 
-    Additionally, this function assumes a single channeled audio signal and is not guaranteed to work on
-    multichannel audio. If you want to do an iSTFT on multichannel audio see the AudioSignal object.
+    A 3D STFT with shape (num_fft_bins, n_hops, n_channels) inverts every channel in one call.
 
     Args:
-        stft: complex valued 2D numpy array containing STFT data
+        stft: complex valued 2D numpy array containing STFT data, or 3D with a trailing channel axis
         window_length: (int) number of samples per window
         hop_length: (int) number of samples between the start of adjacent windows, or "hop"
         window_type: (deprecated)
-        reconstruct_reflection: (bool) (Optional) if True, this will recreate the removed reflection
-        data above the Nyquist. If False, this assumes that the input STFT is complete. Default is True.
+        reconstruct_reflection: (bool) (Optional) if True, this assumes the input STFT has no reflection
+        data above the Nyquist and does a real-output inverse FFT (the reflection is implied, not rebuilt).
+        If False, this assumes that the input STFT is complete. Default is True.
         remove_padding: (bool) (Optional) if True, this function will remove the first and
             last (window_length - hop_length) number of samples. Defaults to False.
         will massage the output so that it is in a format that it expects. remove_reflection is still works in this
         mode. Note: librosa's works differently than nussl's and may produce different output.
+        workers: (int) (Optional) number of threads the inverse FFTs of all frames and channels are spread across.
+        Only used with scipy >= 1.4. Defaults to 1.
 
     Returns:
-        1D numpy array containing an audio signal representing the original signal used to make stft
+        1D numpy array containing an audio signal representing the original signal used to make stft.
+        If :param:`stft` is 3D, this is a 2D array with shape (n_channels, n_samples).
+        A complex64 :param:`stft` gives a float32 signal, anything else gives float64.
 
     Example:
         
@@ -290,22 +292,12 @@ def e_istft(stft, window_length, hop_length, window_type, reconstruct_reflection
     n_hops = stft.shape[1]
     overlap = window_length - hop_length
     signal_length = (n_hops * hop_length) + overlap
-    signal = np.zeros(signal_length)
 
-    norm_window = np.zeros(signal_length)
-    window = make_window(window_type, window_length)
-
-    # Add reflection back
-    stft = _add_reflection(stft) if reconstruct_reflection else stft
+    # inverse fft of every hop at once, frames has shape ([n_channels,] n_hops, window_length)
+    frames = _frames_ifft(stft, reconstruct_reflection, workers)[..., :window_length]
+    signal = _overlap_add(frames, hop_length, signal_length)
 
-    for n in range(n_hops):
-        start = n * hop_length
-        end = start + window_length
-        inv_sig_temp = np.real(scifft.ifft(stft[:, n]))
-        signal[start:end] += inv_sig_temp[:window_length]
-        norm_window[start:end] = norm_window[start:end] + window
-
-    norm_window[norm_window == 0.0] = constants.EPSILON  # Prevent dividing by zero
+    norm_window = _get_window_sum(window_type, window_length, hop_length, n_hops, _float_dtype(stft))
     signal_norm = signal / norm_window
 
     # remove zero-padding
@@ -315,10 +307,10 @@ def e_istft(stft, window_length, hop_length, window_type, reconstruct_reflection
             start = ovp_hop_ratio * hop_length
             end = signal_length - overlap
 
-            signal_norm = signal_norm[start:end]
+            signal_norm = signal_norm[..., start:end]
 
         else:
-            signal_norm = signal_norm[hop_length:]
+            signal_norm = signal_norm[..., hop_length:]
 
     return signal_norm
 
@@ -402,13 +394,273 @@ def e_stft_plus(signal, window_length, hop_length, window_type, sample_rate,
     window_type = constants.WINDOW_DEFAULT if window_type is None else window_type
     window = make_window(window_type, window_length)
     win_dot = np.dot(window, window.T)
-    psd = np.zeros_like(stft, dtype=float)
+    psd = np.zeros_like(stft, dtype=stft.real.dtype)
     for i in range(psd.shape[1]):
         psd[:, i] = (1 / float(sample_rate)) * ((abs(stft[:, i]) ** 2) / float(win_dot))
 
     return stft, psd, frequency_vector, time_vector
 
 
+def e_stft_stream(blocks, window_length, hop_length, window_type, n_fft_bins=None, remove_reflection=True,
+                  workers=None):
+    """
+    Streaming version of :func:`e_stft`. Takes the signal as consecutive blocks of samples, e.g. from a generator or
+    a file reader, and yields the STFT a block of hops at a time. Samples that the next hop still needs are carried
+    over to the next block, so concatenating everything this yields along the hop axis gives exactly what
+    :func:`e_stft` gives for the whole signal. Only about one block plus one window of samples is kept in memory,
+    no matter how long the signal is.
+
+    Args:
+        blocks: iterable of 1D numpy arrays, or of 2D numpy arrays with shape (n_channels, n_samples). Blocks can
+        have any length, but every block must have the same number of channels.
+        window_length: (int) number of samples per window
+        hop_length: (int) number of samples between the start of adjacent windows, or "hop"
+        window_type: (string) type of window to use. Using WindowType object is recommended.
+        n_fft_bins: (int) (Optional) number of fft bins per time window. Defaults to window_length.
+        remove_reflection: (bool) (Optional) if True, this will remove reflected STFT data above the Nyquist point.
+        Defaults to True.
+        workers: (int) (Optional) number of threads the FFTs are spread across. Only used with scipy >= 1.4.
+
+    Yields:
+        complex STFT data of every hop that could be completed with the samples seen so far, with shape
+        (num_fft_bins, n_hops) or (num_fft_bins, n_hops, n_channels). The last hops are yielded once
+        :param:`blocks` is exhausted.
+
+    Example:
+
+    .. code-block:: python
+        :linenos:
+
+        # stft of a long signal, 2**16 samples at a time
+        blocks = (x[i:i + 2 ** 16] for i in range(0, len(x), 2 ** 16))
+        for stft_block in nussl.e_stft_stream(blocks, 2048, 1024, nussl.WINDOW_HANN):
+            process(stft_block)
+
+    """
+    if n_fft_bins is None:
+        n_fft_bins = window_length
+
+    window_type = constants.WINDOW_DEFAULT if window_type is None else window_type
+
+    # the zeros e_stft puts before the signal only depend on the window and hop lengths
+    before = _zero_padding_lengths(0, window_length, hop_length)[0]
+
+    buffer = None  # samples not yet used by every hop that needs them
+    window = None
+    signal_length = 0
+    n_hops_done = 0
+
+    for block in blocks:
+        block = np.asarray(block)
+        if block.shape[-1] == 0:
+            continue
+
+        if buffer is None:
+            window = make_window(window_type, window_length, dtype=_float_dtype(block))
+            leading_axes = [(0, 0)] * (block.ndim - 1)
+            buffer = np.pad(block, leading_axes + [(before, 0)], 'constant', constant_values=(0, 0))
+        else:
+            buffer = np.concatenate((buffer, block), axis=-1)
+
+        signal_length += block.shape[-1]
+
+        if buffer.shape[-1] < window_length:
+            continue
+
+        n_hops = (buffer.shape[-1] - window_length) // hop_length + 1
+        yield _stft_frames(buffer, window, hop_length, n_hops, n_fft_bins, remove_reflection, workers)
+
+        buffer = buffer[..., n_hops * hop_length:]
+        n_hops_done += n_hops
+
+    if buffer is None:
+        return
+
+    # the rest of the hops run over the zero padding at the end of the signal
+    n_hops = _zero_padding_lengths(signal_length, window_length, hop_length)[2] - n_hops_done
+    if n_hops > 0:
+        yield _stft_frames(buffer, window, hop_length, n_hops, n_fft_bins, remove_reflection, workers)
+
+
+def e_istft_stream(stft_blocks, window_length, hop_length, window_type, reconstruct_reflection=True,
+                   remove_padding=True, workers=None):
+    """
+    Streaming version of :func:`e_istft`. Takes STFT data as consecutive blocks of hops, e.g. from
+    :func:`e_stft_stream`, and overlap-adds them into the signal a block at a time. The last
+    (window_length - hop_length) samples of every block still get contributions from the next block's hops,
+    so they are carried over, and only samples that are final are yielded. Concatenating everything this yields
+    gives what :func:`e_istft` gives for the whole STFT (up to rounding).
+
+    Args:
+        stft_blocks: iterable of complex 2D numpy arrays with shape (num_fft_bins, n_hops), or of 3D arrays with
+        a trailing channel axis. Blocks can have any number of hops.
+        window_length: (int) number of samples per window
+        hop_length: (int) number of samples between the start of adjacent windows, or "hop"
+        window_type: (string) type of window used for the STFT
+        reconstruct_reflection: (bool) (Optional) see :func:`e_istft`. Default is True.
+        remove_padding: (bool) (Optional) see :func:`e_istft`. Default is True.
+        workers: (int) (Optional) number of threads the inverse FFTs are spread across. Only used with
+        scipy >= 1.4.
+
+    Yields:
+        real signal blocks with shape (n_samples,), or (n_channels, n_samples) for 3D STFT blocks.
+
+    """
+    overlap = window_length - hop_length
+    if remove_padding:
+        to_skip = int(np.ceil(overlap / hop_length)) * hop_length if overlap >= hop_length else hop_length
+    else:
+        to_skip = 0
+
+    pending = None  # overlap-added samples that the next block's hops still add to
+    pending_norm = None
+
+    for stft in stft_blocks:
+        n_hops = stft.shape[1]
+        if n_hops == 0:
+            continue
+
+        frames = _frames_ifft(stft, reconstruct_reflection, workers)[..., :window_length]
+        signal = _overlap_add(frames, hop_length, (n_hops * hop_length) + overlap)
+        norm_window = _get_window_sum(window_type, window_length, hop_length, n_hops, _float_dtype(stft))
+
+        if pending is not None:
+            signal[..., :overlap] += pending
+            norm_window = norm_window.copy()
+            norm_window[:overlap] += pending_norm
+
+        # everything before the start of the next hop is final
+        done = n_hops * hop_length
+        pending, pending_norm = signal[..., done:], norm_window[done:]
+        signal_norm = signal[..., to_skip:done] / norm_window[to_skip:done]
+        to_skip = max(to_skip - done, 0)
+
+        if signal_norm.shape[-1] > 0:
+            yield signal_norm
+
+    if pending is None or (remove_padding and overlap >= hop_length):
+        return
+
+    signal_norm = pending[..., to_skip:] / pending_norm[to_skip:]
+    if signal_norm.shape[-1] > 0:
+        yield signal_norm
+
+
+def e_stft_region(signal, start, full_stft, window_length, hop_length, window_type, n_fft_bins=None,
+                  remove_reflection=True, workers=None):
+    """
+    Computes the same STFT as :func:`e_stft` does for :param:`signal`, where :param:`signal` is the samples
+    ``[start, start + len(signal))`` of a longer signal whose whole STFT, :param:`full_stft`, was already
+    calculated by :func:`e_stft` with the same parameters. Hops that lie entirely inside the region are the same
+    in both STFTs, so they are copied out of :param:`full_stft` instead of being recalculated. Only the hops that
+    overlap the zero padding at either end of the region are calculated.
+
+    Hops can only be reused if :param:`start` is a multiple of :param:`hop_length`, otherwise the hops of the
+    region don't line up with the hops of the whole signal and the whole region is calculated with :func:`e_stft`.
+
+    Args:
+        signal: 1D numpy array, or 2D numpy array with shape (n_channels, n_samples), with the samples of the region.
+        start: (int) index of the first sample of the region in the whole signal.
+        full_stft: complex numpy array, output of :func:`e_stft` for the whole signal.
+        window_length: (int) number of samples per window
+        hop_length: (int) number of samples between the start of adjacent windows, or "hop"
+        window_type: (string) type of window to use. Using WindowType object is recommended.
+        n_fft_bins: (int) (Optional) number of fft bins per time window. Defaults to window_length.
+        remove_reflection: (bool) (Optional) if True, this will remove reflected STFT data above the Nyquist point.
+        Defaults to True.
+        workers: (int) (Optional) number of threads the FFTs are spread across. Only used with scipy >= 1.4.
+
+    Returns:
+        complex numpy array, same as ``e_stft(signal, window_length, hop_length, window_type, n_fft_bins,
+        remove_reflection)``.
+
+    """
+    if n_fft_bins is None:
+        n_fft_bins = window_length
+
+    window_type = constants.WINDOW_DEFAULT if window_type is None else window_type
+
+    before, _, num_blocks = _zero_padding_lengths(signal.shape[-1], window_length, hop_length)
+
+    # hop k of the region starts at sample start - before + k * hop_length of the whole signal, it's inside the
+    # region (and doesn't see any padding) for first <= k <= last
+    first = -(-before // hop_length)
+    last = (signal.shape[-1] + before - window_length) // hop_length
+    offset = start // hop_length
+
+    if start % hop_length != 0 or last < first or offset + last >= full_stft.shape[1]:
+        return e_stft(signal, window_length, hop_length, window_type, n_fft_bins, remove_reflection,
+                      workers=workers)
+
+    window = make_window(window_type, window_length, dtype=_float_dtype(signal))
+    signal, _ = _add_zero_padding(signal, window_length, hop_length)
+
+    head = _stft_frames(signal, window, hop_length, first, n_fft_bins, remove_reflection, workers)
+    tail = _stft_frames(signal[..., (last + 1) * hop_length:], window, hop_length, num_blocks - last - 1,
+                        n_fft_bins, remove_reflection, workers)
+
+    stft = np.empty((head.shape[0], num_blocks) + head.shape[2:], dtype=head.dtype)
+    stft[:, :first] = head
+    stft[:, first:last + 1] = full_stft[:, offset + first:offset + last + 1]
+    stft[:, last + 1:] = tail
+
+    return stft
+
+
+def e_istft_ragged(stft, n_hops, window_length, hop_length, window_type, reconstruct_reflection=True,
+                   workers=None):
+    """
+    Computes the inverse STFT of several channels that have different numbers of hops in one call. Channel ``i``
+    only uses its first ``n_hops[i]`` hops and comes out exactly as ``e_istft(stft[:, :n_hops[i], i], ...)``
+    would, hops past ``n_hops[i]`` are ignored. Padding every channel to the same number of hops and calling
+    :func:`e_istft` would divide the end of the shorter channels by the window envelope of hops they don't have.
+
+    Args:
+        stft: complex valued 3D numpy array with shape (num_fft_bins, max(n_hops), n_channels)
+        n_hops: 1D array of ints, number of hops of every channel
+        window_length: (int) number of samples per window
+        hop_length: (int) number of samples between the start of adjacent windows, or "hop"
+        window_type: (string) type of window to use. Using WindowType object is recommended.
+        reconstruct_reflection: (bool) (Optional) see :func:`e_istft`. Default is True.
+        workers: (int) (Optional) number of threads the inverse FFTs are spread across. Only used with scipy >= 1.4.
+
+    Returns:
+        (tuple) ``(signals, lengths)``: 2D numpy array with shape (n_channels, max(lengths)) where row ``i`` holds
+        the ``lengths[i]`` samples that :func:`e_istft` (with ``remove_padding=True``) returns for channel ``i``,
+        followed by zeros, and a 1D array of ints with those lengths.
+
+    """
+    n_hops = np.asarray(n_hops, dtype=int)
+    overlap = window_length - hop_length
+
+    frames = _frames_ifft(stft[:, :n_hops.max()], reconstruct_reflection, workers)[..., :window_length]
+    for channel, n in enumerate(n_hops):
+        frames[channel, n:] = 0
+
+    signal_lengths = n_hops * hop_length + overlap
+    signal = _overlap_add(frames, hop_length, signal_lengths.max())
+
+    dtype = _float_dtype(stft)
+    for n in np.unique(n_hops):
+        channels = n_hops == n
+        length = n * hop_length + overlap
+        signal[channels, :length] /= _get_window_sum(window_type, window_length, hop_length, n, dtype)
+
+    # remove zero-padding, the same way e_istft does for every channel
+    if overlap >= hop_length:
+        start = int(np.ceil(overlap / hop_length)) * hop_length
+        ends = signal_lengths - overlap
+    else:
+        start = hop_length
+        ends = signal_lengths
+
+    ends = np.maximum(ends, start)
+    for channel, end in enumerate(ends):
+        signal[channel, end:] = 0
+
+    return signal[:, start:ends.max()], ends - start
+
+
 def _add_zero_padding(signal, window_length, hop_length):
     """
 
@@ -418,28 +670,322 @@ def _add_zero_padding(signal, window_length, hop_length):
         hop_length:
     Returns:
     """
-    original_signal_length = len(signal)
+    before, after, num_blocks = _zero_padding_lengths(signal.shape[-1], window_length, hop_length)
+    leading_axes = [(0, 0)] * (signal.ndim - 1)  # only pad the time axis
+    signal = np.pad(signal, leading_axes + [(before, after)], 'constant', constant_values=(0, 0))
+
+    return signal, num_blocks
+
+
+def _zero_padding_lengths(signal_length, window_length, hop_length):
+    """
+    Works out the zero padding :func:`_add_zero_padding` puts around a signal of length
+    :param:`signal_length`, without needing the signal itself.
+
+    Returns:
+        (tuple) ``(before, after, num_blocks)``: number of zeros before and after the signal and the
+        number of windows that the STFT of the padded signal has.
+
+    """
     overlap = window_length - hop_length
-    num_blocks = np.ceil(len(signal) / hop_length)
+    num_blocks = np.ceil(signal_length / hop_length)
 
     if overlap >= hop_length:  # Hop is less than 50% of window length
         overlap_hop_ratio = np.ceil(overlap / hop_length)
-
         before = int(overlap_hop_ratio * hop_length)
-        after = int((num_blocks * hop_length + overlap) - original_signal_length)
-
-        signal = np.pad(signal, (before, after), 'constant', constant_values=(0, 0))
         extra = overlap
 
     else:
-        after = int((num_blocks * hop_length + overlap) - original_signal_length)
-        signal = np.pad(signal, (hop_length, after), 'constant', constant_values=(0, 0))
+        before = hop_length
         extra = window_length
 
-    num_blocks = int(np.ceil((len(signal) - extra) / hop_length))
+    after = int((num_blocks * hop_length + overlap) - signal_length)
+
+    num_blocks = int(np.ceil((before + signal_length + after - extra) / hop_length))
     num_blocks += 1 if overlap == 0 else 0  # if no overlap, then we need to get another hop at the end
 
-    return signal, num_blocks
+    return before, after, num_blocks
+
+
+def _frame_view(signal, window_length, hop_length, num_blocks):
+    """
+    Returns a read-only, strided view of :param:`signal` with shape ``(num_blocks, window_length)``
+    where row ``i`` is ``signal[i * hop_length:i * hop_length + window_length]``. No data is copied.
+    If :param:`signal` has shape ``(n_channels, n_samples)`` the view has shape
+    ``(n_channels, num_blocks, window_length)``.
+
+    Args:
+        signal: 1D or 2D numpy array, already zero padded by :func:`_add_zero_padding`
+        window_length: (int) number of samples per window
+        hop_length: (int) number of samples between the start of adjacent windows
+        num_blocks: (int) number of windows
+
+    Returns:
+        numpy array view into :param:`signal`
+
+    """
+    needed = (num_blocks - 1) * hop_length + window_length
+    if signal.shape[-1] < needed:
+        pad = [(0, 0)] * (signal.ndim - 1) + [(0, needed - signal.shape[-1])]
+        signal = np.pad(signal, pad, 'constant', constant_values=(0, 0))
+
+    stride = signal.strides[-1]
+    frames = np.lib.stride_tricks.as_strided(signal,
+                                             shape=signal.shape[:-1] + (num_blocks, window_length),
+                                             strides=signal.strides[:-1] + (hop_length * stride, stride))
+    frames.flags.writeable = False
+    return frames
+
+
+def _stft_frames(signal, window, hop_length, num_blocks, n_fft_bins, remove_reflection, workers=None):
+    """
+    Windows and transforms the first :param:`num_blocks` hops of :param:`signal`, zero padding its end if needed.
+
+    Returns:
+        complex numpy array with shape ``(num_bins, num_blocks[, n_channels])``
+
+    """
+    # view every hop of the padded signal as a row of a (num_blocks, window_length) matrix,
+    # window all of them at once and do a single fft over the whole frame matrix
+    frames = _frame_view(signal, len(window), hop_length, num_blocks)
+    windowed_frames = frames * window
+
+    stft = _frames_fft(windowed_frames, n_fft_bins, remove_reflection, workers)
+
+    # view the fft output so it's (n_fft, n_hops) or (n_fft, n_hops, n_channels), no copy is made
+    return stft.T
+
+
+def _frames_fft(frames, n_fft_bins, remove_reflection, workers=None):
+    """
+    Computes the fft of every row of :param:`frames` in one call.
+
+    Args:
+        frames: numpy array of real, windowed frames with shape ``([n_channels,] num_blocks, window_length)``
+        n_fft_bins: (int) number of fft bins per frame
+        remove_reflection: (bool) if True, only returns the ``n_fft_bins // 2 + 1`` bins up to Nyquist
+        workers: (int) number of threads for scipy >= 1.4 to spread the rows across
+
+    Returns:
+        numpy array with complex data of shape ``([n_channels,] num_blocks, num_bins)``
+
+    """
+    if scipy_fft is not None:
+        if remove_reflection:
+            return scipy_fft.rfft(frames, n=n_fft_bins, axis=-1, overwrite_x=True, workers=workers)
+        return scipy_fft.fft(frames, n=n_fft_bins, axis=-1, overwrite_x=True, workers=workers)
+
+    if frames.size == 0:
+        # fftpack can't transform an empty frame matrix (e.g. no hops before a region, see e_stft_region)
+        num_bins = n_fft_bins // 2 + 1 if remove_reflection else n_fft_bins
+        return np.zeros(frames.shape[:-1] + (num_bins,), dtype=np.result_type(frames, np.complex64))
+
+    if not remove_reflection:
+        return scifft.fft(frames, n=n_fft_bins, axis=-1, overwrite_x=True)
+
+    # older scipy: fftpack's real transform packs its output as [y(0), Re(y(1)), Im(y(1)), ...]
+    packed = scifft.rfft(frames, n=n_fft_bins, axis=-1, overwrite_x=True)
+    n_imag = (n_fft_bins - 1) // 2
+
+    stft = np.empty(packed.shape[:-1] + (n_fft_bins // 2 + 1,), dtype=np.result_type(packed, np.complex64))
+    stft.real[..., 0] = packed[..., 0]
+    stft.real[..., 1:] = packed[..., 1::2]
+    stft.imag[..., 0] = 0.0
+    stft.imag[..., 1:n_imag + 1] = packed[..., 2::2]
+    if n_fft_bins % 2 == 0:
+        stft.imag[..., -1] = 0.0  # Nyquist
+
+    return stft
+
+
+def _frames_ifft(stft, reconstruct_reflection, workers=None):
+    """
+    Computes the inverse fft of every column (hop) of :param:`stft` in one call.
+
+    Args:
+        stft: numpy array of complex STFT data with shape ``(num_bins, n_hops[, n_channels])``
+        reconstruct_reflection: (bool) if True, :param:`stft` only has the bins up to Nyquist and
+            a real-output inverse transform of length ``2 * (num_bins - 1)`` is done. The reflection
+            above Nyquist is never built.
+        workers: (int) number of threads for scipy >= 1.4 to spread the columns across
+
+    Returns:
+        numpy array of real frames with shape ``([n_channels,] n_hops, n_fft_bins)``
+
+    """
+    stft = stft.T
+
+    if not reconstruct_reflection:
+        if scipy_fft is not None:
+            return np.real(scipy_fft.ifft(stft, axis=-1, workers=workers))
+        return np.real(scifft.ifft(stft, axis=-1))
+
+    n_fft_bins = 2 * (stft.shape[-1] - 1)
+    if scipy_fft is not None:
+        return scipy_fft.irfft(stft, n=n_fft_bins, axis=-1, workers=workers)
+
+    # older scipy: fftpack's real transform wants its input packed as [y(0), Re(y(1)), Im(y(1)), ...]
+    packed = np.empty(stft.shape[:-1] + (n_fft_bins,), dtype=stft.real.dtype)
+    packed[..., 0] = stft.real[..., 0]
+    packed[..., 1::2] = stft.real[..., 1:]
+    packed[..., 2::2] = stft.imag[..., 1:-1]
+    return scifft.irfft(packed, axis=-1, overwrite_x=True)
+
+
+def _overlap_add(frames, hop_length, signal_length):
+    """
+    Overlap-adds every frame in :param:`frames` into a new signal, frame ``i`` starting at sample
+    ``i * hop_length``.
+
+    Instead of looping over frames, this loops over the ``ceil(frame_length / hop_length)``
+    hop-sized chunks of a frame. Chunk ``k`` of every frame lands in a contiguous, non-overlapping
+    stretch of the output signal, so it is added for all frames at once through a reshaped view.
+    The chunks are added last to first so every sample sums its frames in the same order as a
+    frame-by-frame loop would.
+
+    Args:
+        frames: numpy array with shape ``([n_channels,] n_hops, frame_length)``
+        hop_length: (int) number of samples between the start of adjacent frames
+        signal_length: (int) length of the output signal
+
+    Returns:
+        numpy array with shape ``([n_channels,] signal_length)``
+
+    """
+    leading_shape = frames.shape[:-2]
+    n_hops, frame_length = frames.shape[-2:]
+    n_chunks = int(np.ceil(frame_length / hop_length))
+
+    # row n of the output holds samples [n * hop_length, (n + 1) * hop_length)
+    signal = np.zeros(leading_shape + (n_hops + n_chunks, hop_length), dtype=frames.dtype)
+
+    for k in reversed(range(n_chunks)):
+        chunk = frames[..., k * hop_length:(k + 1) * hop_length]
+        signal[..., k:k + n_hops, :chunk.shape[-1]] += chunk
+
+    return signal.reshape(leading_shape + (-1,))[..., :signal_length]
+
+
+CacheInfo = collections.namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+
+class _ArrayCache(object):
+    """
+    Process-wide, least recently used cache of read-only numpy arrays. Once there are more than
+    :attr:`maxsize` entries, the least recently used one is dropped. Keeps count of hits and misses
+    so the savings can be checked with :func:`window_cache_info`.
+
+    It is safe to use from several threads: the entries and counters are only touched while holding
+    a lock, but :param:`factory` is called outside of it, so two threads missing the same key at once
+    may both make the array (the last one stored wins).
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, factory):
+        """
+        Returns the array stored under :param:`key`, calling :param:`factory` to make (and store)
+        it if it is not cached. Arrays are made read-only before they are stored. If
+        :param:`factory` returns ``None``, nothing is stored.
+        """
+        with self._lock:
+            value = self._entries.pop(key, None)
+            if value is not None:
+                self.hits += 1
+                self._entries[key] = value
+                return value
+
+            self.misses += 1
+
+        value = factory()
+        if value is None:
+            return None
+
+        value.flags.writeable = False
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = value
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+        return value
+
+    def info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+_window_cache = _ArrayCache(maxsize=128)
+_window_sum_cache = _ArrayCache(maxsize=64)
+
+
+def window_cache_info():
+    """
+    Reports how well the window caches used by :func:`make_window`, :func:`e_stft`,
+    :func:`e_istft` and :func:`e_stft_plus` are doing.
+
+    Returns:
+        (dict) with keys ``'window'`` (windows from :func:`make_window`) and ``'window_sum'``
+        (overlap-added normalization envelopes used by :func:`e_istft`). Each value is a
+        :obj:`CacheInfo` named tuple of ``(hits, misses, maxsize, currsize)``.
+
+    Notes:
+        FFT plans are not kept here: ``scipy.fft`` (and ``scipy.fftpack``) already keep their own
+        cache of plans / twiddle factors for recently used transform lengths.
+
+    """
+    return {'window': _window_cache.info(), 'window_sum': _window_sum_cache.info()}
+
+
+def clear_window_cache():
+    """
+    Empties the window caches and resets their hit/miss counters. See :func:`window_cache_info`.
+    """
+    _window_cache.clear()
+    _window_sum_cache.clear()
+
+
+def _get_window_sum(window_type, window_length, hop_length, n_hops, dtype=None):
+    """
+    Returns the overlap-added sum of :param:`n_hops` windows (with zeros replaced by
+    :attr:`constants.EPSILON`) that :func:`e_istft` divides its output by. Envelopes are cached per
+    ``(window_type, window_length, hop_length, n_hops, dtype)``, least recently used envelopes are
+    dropped once there are more than ``_window_sum_cache.maxsize`` of them.
+
+    Returns:
+        1D read-only numpy array of length ``n_hops * hop_length + window_length - hop_length``
+
+    """
+    def _make_window_sum():
+        window = make_window(window_type, window_length, dtype=dtype)
+        signal_length = (n_hops * hop_length) + window_length - hop_length
+        norm_window = _overlap_add(np.broadcast_to(window, (n_hops, window_length)), hop_length,
+                                   signal_length)
+        norm_window[norm_window == 0.0] = constants.EPSILON  # Prevent dividing by zero
+        return norm_window
+
+    key = (window_type, window_length, hop_length, n_hops, np.dtype(np.float64 if dtype is None else dtype).str)
+    return _window_sum_cache.get(key, _make_window_sum)
+
+
+def _float_dtype(array):
+    """
+    Returns the real dtype an STFT or iSTFT of :param:`array` is computed in: ``float32`` if
+    :param:`array` is single precision (``float32`` or ``complex64``), ``float64`` otherwise.
+    """
+    if array.dtype in (np.float32, np.complex64):
+        return np.dtype(np.float32)
+    return np.dtype(np.float64)
 
 
 def _remove_stft_padding(stft, original_signal_length, window_length, hop_length):
@@ -461,35 +1007,52 @@ def _remove_stft_padding(stft, original_signal_length, window_length, hop_length
     return stft_cut
 
 
-def make_window(window_type, length, symmetric=False):
+def make_window(window_type, length, symmetric=False, dtype=None):
     """Returns an :obj:`np.array` populated with samples of a normalized window of type
     :param:`window_type`.
 
+    Windows are cached per ``(window_type, length, symmetric, dtype)``, so asking for the same
+    window again does not recompute it. The returned array is read-only and shared between
+    callers, make a copy before changing it. See :func:`window_cache_info`.
+
     Args:
         window_type (str): Type of window to create, string can be
         length (int): length of window
         symmetric (bool): If ``False``,  generates a periodic window (for use in spectral analysis).
             If ``True``, generates a symmetric window (for use in filter design).
             Does nothing for rectangular window.
+        dtype (:obj:`np.dtype`): data type of the window. Defaults to ``np.float64``.
 
     Returns:
-        window (np.array): np array with a window of type window_type
+        window (np.array): read-only np array with a window of type window_type, or ``None`` if
+            :param:`window_type` is unknown
     """
+    dtype = np.dtype(np.float64 if dtype is None else dtype)
+    length = int(length)
+    key = (window_type, length, bool(symmetric), dtype.str)
+    return _window_cache.get(key, lambda: _make_window(window_type, length, symmetric, dtype))
+
 
+def _make_window(window_type, length, symmetric, dtype):
+    """
+    Computes the window for :func:`make_window`, without caching.
+    """
     # Generate samples of a normalized window
     if window_type == constants.WINDOW_RECTANGULAR:
-        return np.ones(length)
+        window = np.ones(length)
     elif window_type == constants.WINDOW_HANN:
-        return scipy.signal.hann(length, symmetric)
+        window = scipy.signal.hann(length, symmetric)
     elif window_type == constants.WINDOW_BLACKMAN:
-        return scipy.signal.blackman(length, symmetric)
+        window = scipy.signal.blackman(length, symmetric)
     elif window_type == constants.WINDOW_HAMMING:
-        return scipy.signal.hamming(length, symmetric)
+        window = scipy.signal.hamming(length, symmetric)
     elif window_type == constants.WINDOW_TRIANGULAR:
-        return scipy.signal.triang(length, symmetric)
+        window = scipy.signal.triang(length, symmetric)
     else:
         return None
 
+    return window.astype(dtype, copy=False)
+
 
 def _get_window_function(window_type):
     """
@@ -8,9 +8,15 @@ any specific algorithm or that are shared between algorithms.
 from __future__ import division
 import warnings
 import base64
+import contextlib
+import hashlib
+import io
 import json
+import os
 import re
 import collections
+import struct
+import threading
 
 import numpy as np
 import musdb
@@ -19,7 +25,8 @@ import constants
 
 __all__ = ['find_peak_indices', 'find_peak_values',
            'json_ready_numpy_array', 'json_serialize_numpy_array', 'load_numpy_json',
-           'json_numpy_obj_hook',
+           'json_numpy_obj_hook', 'to_binary', 'from_binary', 'write_binary', 'read_binary',
+           'array_directory',
            'add_mismatched_arrays', 'add_mismatched_arrays2D', 'complex_randn',
            '_get_axis',
            'print_all_separation_algorithms',
@@ -198,6 +205,11 @@ def json_ready_numpy_array(array):
 
     """
     if isinstance(array, np.ndarray):
+        store = getattr(_array_store, 'store', None)
+        if store is not None:
+            # an array store is active (see to_binary()), which keeps the data out of the json
+            return {constants.NUMPY_JSON_KEY: store.add(array)}
+
         # noinspection PyTypeChecker
         data_b64 = base64.b64encode(np.ascontiguousarray(array).data)
         return {
@@ -260,9 +272,278 @@ def json_numpy_obj_hook(dct):
     if isinstance(dct, dict) and '__ndarray__' in dct:
         data = base64.b64decode(dct['__ndarray__'])
         return np.frombuffer(data, dct['dtype']).reshape(dct['shape'])
+
+    store = getattr(_array_store, 'store', None)
+    if isinstance(dct, dict) and store is not None and store.has(dct):
+        return store.get(dct)
+
     return dct
 
 
+# Array store used by json_ready_numpy_array() and json_numpy_obj_hook() in this thread, if any
+_array_store = threading.local()
+
+
+@contextlib.contextmanager
+def _using_array_store(store):
+    """
+    Within this context, :func:`json_ready_numpy_array` hands arrays to :param:`store` and puts the
+    reference that it returns in the json, and :func:`json_numpy_obj_hook` looks those references
+    up in :param:`store`. This is how every ``to_json()``/``from_json()`` in nussl, nested or not,
+    can keep its arrays out of the json without knowing about it.
+    """
+    previous = getattr(_array_store, 'store', None)
+    _array_store.store = store
+    try:
+        yield store
+    finally:
+        _array_store.store = previous
+
+
+class _BinaryArrayStore(object):
+    """
+    Array store for the binary format of :func:`to_binary`. When writing, arrays are numbered in the
+    order they are added and their raw bytes go after the json. When reading, every array is a view
+    into :param:`buffer` at its offset.
+    """
+    KEY = '__blob__'
+
+    def __init__(self, buffer=None, offsets=None):
+        self.arrays = []
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def add(self, array):
+        self.arrays.append(np.ascontiguousarray(array))
+        return {self.KEY: len(self.arrays) - 1, 'dtype': str(array.dtype), 'shape': array.shape}
+
+    def has(self, ref):
+        return self.KEY in ref
+
+    def get(self, ref):
+        shape = tuple(ref['shape'])
+        return np.frombuffer(self.buffer, dtype=np.dtype(ref['dtype']), count=int(np.prod(shape)),
+                             offset=self.offsets[ref[self.KEY]]).reshape(shape)
+
+
+class _NpyDirectoryArrayStore(object):
+    """
+    Array store for :func:`array_directory`. Every array is saved as ``<hash>.npy`` in a directory,
+    where the hash is of the array's dtype, shape and data, so identical arrays are only saved once.
+    Arrays are read back as copy-on-write memory maps.
+    """
+    KEY = '__npy__'
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._hashes = {}  # id(array) -> (array, hash), so arrays that are aliased are hashed once
+
+    def add(self, array):
+        if id(array) in self._hashes:
+            digest = self._hashes[id(array)][1]
+        else:
+            data = np.ascontiguousarray(array)
+            content = hashlib.sha1(str(data.dtype).encode('ascii'))
+            content.update(str(data.shape).encode('ascii'))
+            content.update(data.data)
+            digest = content.hexdigest()
+            self._hashes[id(array)] = (array, digest)
+
+            path = self._path(digest)
+            if not os.path.exists(path):
+                np.save(path, data)
+
+        return {self.KEY: digest, 'dtype': str(array.dtype), 'shape': array.shape}
+
+    def has(self, ref):
+        return self.KEY in ref
+
+    def get(self, ref):
+        path = self._path(ref[self.KEY])
+        if int(np.prod(ref['shape'])) == 0:
+            return np.load(path)  # empty files can't be memory mapped
+        return np.load(path, mmap_mode='c')
+
+    def _path(self, digest):
+        return os.path.join(self.directory, digest + '.npy')
+
+
+@contextlib.contextmanager
+def array_directory(directory):
+    """
+    Within this context, ``to_json()`` of every nussl object saves its numpy arrays as ``.npy``
+    files in :param:`directory` and only puts a reference to the file in the json, and
+    ``from_json()`` loads them back from :param:`directory`. Files are named after a hash of the
+    array's contents, so an array that several attributes (or several objects) share, or that is
+    equal to one that is already there, is only saved once. Arrays are loaded as copy-on-write
+    memory maps, so their data is only read from disk when it is used.
+
+    Example:
+
+    .. code-block:: python
+        :linenos:
+
+        with nussl.utils.array_directory('checkpoints/arrays'):
+            json_string = repet.to_json()
+
+        with nussl.utils.array_directory('checkpoints/arrays'):
+            repet = nussl.Repet.from_json(json_string)
+
+    Args:
+        directory: (str) directory for the ``.npy`` files. It is made if it doesn't exist.
+
+    See Also:
+        :func:`SeparationBase.to_json`, which takes an ``array_dir`` argument that does this.
+
+    """
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with _using_array_store(_NpyDirectoryArrayStore(directory)) as store:
+        yield store
+
+
+_BINARY_MAGIC = b'NUSSLBIN'
+_BINARY_VERSION = 1
+_BINARY_HEADER = struct.Struct('<8sIIQ')  # magic, version, number of arrays, json length
+_BINARY_ALIGNMENT = 64  # every array starts on a multiple of this many bytes
+
+
+def _binary_layout(json_string, arrays):
+    """
+    Returns the header (everything up to the first array) of the binary format and the offset of
+    every array from the start of the data.
+    """
+    if not isinstance(json_string, bytes):
+        json_string = json_string.encode('utf-8')
+
+    header_length = _BINARY_HEADER.size + len(json_string) + 8 * len(arrays)
+    offsets = []
+    position = header_length
+    for array in arrays:
+        position = -(-position // _BINARY_ALIGNMENT) * _BINARY_ALIGNMENT
+        offsets.append(position)
+        position += array.nbytes
+
+    header = _BINARY_HEADER.pack(_BINARY_MAGIC, _BINARY_VERSION, len(arrays), len(json_string))
+    header += json_string + struct.pack('<{}Q'.format(len(arrays)), *offsets)
+    return header, offsets
+
+
+def _write_binary(obj, write):
+    store = _BinaryArrayStore()
+    with _using_array_store(store):
+        json_string = obj.to_json()
+
+    header, offsets = _binary_layout(json_string, store.arrays)
+    write(header)
+
+    position = len(header)
+    for array, offset in zip(store.arrays, offsets):
+        write(b'\0' * (offset - position))
+        write(array.data)  # writes the array's memory without copying it first
+        position = offset + array.nbytes
+
+
+def to_binary(obj):
+    """
+    Serializes a nussl object that has a ``to_json()`` method (:class:`AudioSignal`,
+    :class:`SeparationBase` and :class:`MaskBase` objects) to a compact binary format: the same
+    json that ``to_json()`` makes, but with every numpy array stored as raw bytes after the json
+    instead of base64 text inside it.
+
+    Notes:
+        The format is a header with the json and the offset of every array, followed by the raw
+        data of every array, each aligned to 64 bytes so it can be memory mapped in place.
+
+    Args:
+        obj: object with a ``to_json()`` method.
+
+    Returns:
+        (bytes) binary representation of :param:`obj`.
+
+    See Also:
+        :func:`from_binary`, :func:`write_binary`, :func:`read_binary`
+
+    """
+    output = io.BytesIO()
+    _write_binary(obj, output.write)
+    return output.getvalue()
+
+
+def write_binary(obj, file_path):
+    """
+    Writes the binary representation of :param:`obj` (see :func:`to_binary`) to
+    :param:`file_path`, writing the arrays straight to the file.
+
+    Args:
+        obj: object with a ``to_json()`` method.
+        file_path: (str) path of the file to write.
+
+    """
+    with open(file_path, 'wb') as f:
+        _write_binary(obj, f.write)
+
+
+def _read_binary_header(buffer):
+    if len(buffer) < _BINARY_HEADER.size:
+        raise ValueError('Not a nussl binary file!')
+
+    magic, version, n_arrays, json_length = _BINARY_HEADER.unpack_from(buffer, 0)
+    if magic != _BINARY_MAGIC:
+        raise ValueError('Not a nussl binary file!')
+    if version != _BINARY_VERSION:
+        raise ValueError('Unknown nussl binary version {}!'.format(version))
+
+    start = _BINARY_HEADER.size
+    json_string = memoryview(buffer)[start:start + json_length].tobytes().decode('utf-8')
+    offsets = struct.unpack_from('<{}Q'.format(n_arrays), buffer, start + json_length)
+    return json_string, offsets
+
+
+def from_binary(data, from_json):
+    """
+    Recreates an object from its binary representation made by :func:`to_binary`. Arrays are
+    views into :param:`data`, so they are read-only if :param:`data` is ``bytes``.
+
+    Args:
+        data: (bytes) binary representation made by :func:`to_binary`.
+        from_json: function that makes the object from its json, e.g. ``AudioSignal.from_json``.
+
+    Returns:
+        The object that was passed to :func:`to_binary`.
+
+    """
+    json_string, offsets = _read_binary_header(data)
+
+    with _using_array_store(_BinaryArrayStore(data, offsets)):
+        return from_json(json_string)
+
+
+def read_binary(file_path, from_json, memory_map=True):
+    """
+    Recreates an object from a file written by :func:`write_binary`.
+
+    Args:
+        file_path: (str) path of the file to read.
+        from_json: function that makes the object from its json, e.g. ``AudioSignal.from_json``.
+        memory_map: (bool) if ``True`` (default), arrays are copy-on-write memory maps of the
+            file, so their data is only read from disk when it is used. Otherwise the whole file
+            is read into memory.
+
+    Returns:
+        The object that was passed to :func:`write_binary`.
+
+    """
+    if memory_map:
+        data = np.memmap(file_path, dtype=np.uint8, mode='c')
+    else:
+        with open(file_path, 'rb') as f:
+            data = bytearray(f.read())
+
+    return from_binary(data, from_json)
+
+
 def add_mismatched_arrays(array1, array2, truncate=False):
     """
     Will add two 1D numpy arrays of different length. If :param:`truncate` is ``False``, it will
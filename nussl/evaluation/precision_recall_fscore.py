@@ -56,8 +56,6 @@ See Also:
 
 """
 
-import sklearn
-
 import evaluation_base
 from ..separation.masks import binary_mask
 
@@ -101,69 +99,57 @@ class PrecisionRecallFScore(evaluation_base.EvaluationBase):
         return mask_list
 
     @staticmethod
-    def _preprocess(mask1, mask2):
+    def _confusion_counts(true_mask, estimated_mask):
         """
-        Prepares masks for sklearn metric functions. Both ``mask1`` and ``mask2`` must be ``BinaryMask`` objects. 
+        Counts true/false positives/negatives of ``estimated_mask`` against ``true_mask``. Both must be ``BinaryMask``
+        objects. Packed masks are counted without unpacking them.
         Args:
-            mask1 (:obj:`BinaryMask`): BinaryMask
-            mask2 (:obj:`BinaryMask`): BinaryMask
+            true_mask (:obj:`BinaryMask`): BinaryMask
+            estimated_mask (:obj:`BinaryMask`): BinaryMask
 
         Returns:
-            [mask1, mask2] ready to be input to into an sklearn metric.
+            (true_positives, false_positives, false_negatives, true_negatives)
 
         """
-        assert isinstance(mask1, binary_mask.BinaryMask)
-        assert isinstance(mask2, binary_mask.BinaryMask)
-        return mask1.mask.ravel(), mask2.mask.ravel()
+        assert isinstance(true_mask, binary_mask.BinaryMask)
+        assert isinstance(estimated_mask, binary_mask.BinaryMask)
+        return true_mask.confusion_counts(estimated_mask)
 
-    def _precision(self, true_mask, estimated_mask):
-        """
-        Wrapper for sklearn.metrics.precision_score()
-        Args:
-            true_mask: 
-            estimated_mask: 
-
-        Returns:
+    @staticmethod
+    def _divide(numerator, denominator):
+        # like sklearn.metrics, a score with a denominator of 0 is 0
+        return float(numerator) / denominator if denominator else 0.0
 
+    def _precision(self, true_positives, false_positives, false_negatives, true_negatives):
         """
+        Same as sklearn.metrics.precision_score(), from the counts of :func:`_confusion_counts`.
 
-        return sklearn.metrics.precision_score(*self._preprocess(true_mask, estimated_mask))
-
-    def _recall(self, true_mask, estimated_mask):
         """
-        Wrapper for sklearn.metrics.recall_score()
-        Args:
-            true_mask: 
-            estimated_mask: 
-
-        Returns:
+        return self._divide(true_positives, true_positives + false_positives)
 
+    def _recall(self, true_positives, false_positives, false_negatives, true_negatives):
         """
-        return sklearn.metrics.recall_score(*self._preprocess(true_mask, estimated_mask))
+        Same as sklearn.metrics.recall_score(), from the counts of :func:`_confusion_counts`.
 
-    def _f_score(self, true_mask, estimated_mask):
         """
-        Warpper for sklearn.metrics.f1_score()
-        Args:
-            true_mask: 
-            estimated_mask: 
-
-        Returns:
+        return self._divide(true_positives, true_positives + false_negatives)
 
+    def _f_score(self, true_positives, false_positives, false_negatives, true_negatives):
         """
-        return sklearn.metrics.f1_score(*self._preprocess(true_mask, estimated_mask))
+        Same as sklearn.metrics.f1_score(), from the counts of :func:`_confusion_counts`.
 
-    def _accuracy(self, true_mask, estimated_mask):
         """
-        Wrapper for sklearn.metrics.accuracy_score()
-        Args:
-            true_mask: 
-            estimated_mask: 
+        precision = self._precision(true_positives, false_positives, false_negatives, true_negatives)
+        recall = self._recall(true_positives, false_positives, false_negatives, true_negatives)
+        return self._divide(2 * precision * recall, precision + recall)
 
-        Returns:
+    def _accuracy(self, true_positives, false_positives, false_negatives, true_negatives):
+        """
+        Same as sklearn.metrics.accuracy_score(), from the counts of :func:`_confusion_counts`.
 
         """
-        return sklearn.metrics.accuracy_score(*self._preprocess(true_mask, estimated_mask))
+        return self._divide(true_positives + true_negatives,
+                            true_positives + false_positives + false_negatives + true_negatives)
 
     def evaluate(self):
         """
@@ -194,11 +180,13 @@ class PrecisionRecallFScore(evaluation_base.EvaluationBase):
         for i, true_mask in enumerate(self.true_sources_list):
             est_mask = self.estimated_sources_list[i]
 
+            counts = self._confusion_counts(true_mask, est_mask)
+
             label = self.source_labels[i]
-            results = {self.ACCURACY_KEY: self._accuracy(true_mask, est_mask),
-                       self.PRECISION_KEY: self._precision(true_mask, est_mask),
-                       self.RECALL_KEY: self._recall(true_mask, est_mask),
-                       self.FSCORE_KEY: self._f_score(true_mask, est_mask)}
+            results = {self.ACCURACY_KEY: self._accuracy(*counts),
+                       self.PRECISION_KEY: self._precision(*counts),
+                       self.RECALL_KEY: self._recall(*counts),
+                       self.FSCORE_KEY: self._f_score(*counts)}
 
             self.scores[label] = results
 
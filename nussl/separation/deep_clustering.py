@@ -3,7 +3,6 @@
 """
 Deep Clustering Separation Class
 """
-import copy
 import warnings
 
 try:
@@ -136,7 +135,7 @@ class DeepClustering(mask_separation_base.MaskSeparationBase):
     def _compute_spectrograms(self):
         self.stft = self.audio_signal.stft(overwrite=True, remove_reflection=True,
                                            use_librosa=self.use_librosa_stft)
-        magnitude = np.abs(self.stft)
+        magnitude = self.audio_signal.magnitude_spectrogram_data
         self.mel_spectrogram = np.empty((self.audio_signal.num_channels,
                                          self.stft.shape[1], self.num_mels))
 
@@ -256,8 +255,7 @@ class DeepClustering(mask_separation_base.MaskSeparationBase):
         """
             Applies individual mask and returns audio_signal object
         """
-        source = copy.deepcopy(self.audio_signal)
-        source = source.apply_mask(mask)
+        source = self.audio_signal.apply_mask(mask)
         source.stft_params = self.stft_params
         source.istft(overwrite=True, truncate_to_length=self.audio_signal.signal_length)
 
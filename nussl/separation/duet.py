@@ -345,18 +345,18 @@ class Duet(mask_separation_base.MaskSeparationBase):
         best_so_far = np.inf * np.ones_like(self.stft_ch0, dtype=float)
 
         for i in range(0, self.num_sources):
-            mask_array = np.zeros_like(self.stft_ch0, dtype=bool)
             phase = np.exp(-1j * self.frequency_matrix * self.delay_peak[i])
             score = np.abs(self.atn_peak[i] * phase * self.stft_ch0 - self.stft_ch1) ** 2 / (1 + self.atn_peak[i] ** 2)
             mask = (score < best_so_far)
-            mask_array[mask] = True
-            background_mask = masks.BinaryMask(np.array(mask_array))
+
+            # masks are kept bit-packed, the xor and not below work on the packed bytes
+            background_mask = masks.BinaryMask(mask, packed=True)
             self.result_masks.append(background_mask)
-            self.result_masks[0].mask = np.logical_xor(self.result_masks[i].mask, self.result_masks[0].mask)
+            self.result_masks[0] ^= self.result_masks[i]
             best_so_far[mask] = score[mask]
 
         # Compute first mask based on what the other masks left remaining
-        self.result_masks[0].mask = np.logical_not(self.result_masks[0].mask)
+        self.result_masks[0].invert_mask(overwrite=True)
         return self.result_masks
 
     @staticmethod
@@ -72,13 +72,14 @@ class FT2D(mask_separation_base.MaskSeparationBase):
 
         background_stft = np.array(background_stft).transpose((1, 2, 0))
         self.background = AudioSignal(stft=background_stft,
-                                      sample_rate=self.audio_signal.sample_rate)
+                                      sample_rate=self.audio_signal.sample_rate,
+                                      dtype=self.audio_signal.dtype)
         self.background.istft(self.stft_params.window_length, self.stft_params.hop_length,
                               self.stft_params.window_type,
                               overwrite=True, use_librosa=self.use_librosa_stft,
                               truncate_to_length=self.audio_signal.signal_length)
 
-        background_mask = np.array(background_mask).transpose((1, 2, 0)).astype('float')
+        background_mask = np.array(background_mask).transpose((1, 2, 0)).astype(self.audio_signal.dtype)
         background_mask = masks.SoftMask(background_mask)
         if self.mask_type == self.BINARY_MASK:
             background_mask = background_mask.mask_to_binary(self.mask_threshold)
@@ -90,7 +91,8 @@ class FT2D(mask_separation_base.MaskSeparationBase):
     def _compute_spectrograms(self):
         self.stft = self.audio_signal.stft(overwrite=True, remove_reflection=True,
                                            use_librosa=self.use_librosa_stft)
-        self.ft2d = np.stack([np.fft.fft2(np.abs(self.stft[:, :, i]))
+        magnitude_spectrogram = self.audio_signal.magnitude_spectrogram_data
+        self.ft2d = np.stack([np.fft.fft2(magnitude_spectrogram[:, :, i])
                               for i in range(self.audio_signal.num_channels)], axis = -1)
 
     def compute_ft2d_mask(self, ft2d):
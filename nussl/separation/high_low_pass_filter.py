@@ -82,9 +82,11 @@ class HighLowPassFilter(mask_separation_base.MaskSeparationBase):
             self._get_stft()
             closest_freq_bin = self.audio_signal.get_closest_frequency_bin(self.high_pass_cutoff_hz)
 
-            # Make masks
-            self.low_pass_mask = self.ones_mask(self.stft.shape)
-            self.low_pass_mask.mask[closest_freq_bin:, :, :] = 0
+            # Make masks. They are the same at every hop, so only one value per frequency bin is stored
+            n_bins, n_hops, n_channels = self.stft.shape
+            profile = np.zeros((n_bins, n_channels))
+            profile[:closest_freq_bin] = 1
+            self.low_pass_mask = self.profile_mask(profile, n_hops)
 
             self.high_pass_mask = self.low_pass_mask.invert_mask()
 
@@ -6,7 +6,6 @@ import mask_separation_base
 import masks
 from ..core import constants
 import librosa
-import copy
 
 
 class HPSS(mask_separation_base.MaskSeparationBase):
@@ -120,9 +119,9 @@ class HPSS(mask_separation_base.MaskSeparationBase):
             
         """
         self.sources = []
-        for mask in self.masks: 
-            source = copy.deepcopy(self.audio_signal)
-            source = source.apply_mask(mask)
+        # mask the stft for every source in one pass
+        for stft in masks.apply_masks(self.audio_signal.stft_data, self.masks):
+            source = self.audio_signal.make_copy_with_stft_data(stft, verbose=False)
             source.stft_params = self.stft_params
             source.istft(overwrite=True, truncate_to_length=self.audio_signal.signal_length)
             self.sources.append(source)
@@ -205,6 +205,26 @@ class MaskSeparationBase(separation_base.SeparationBase):
         else:
             return masks.SoftMask.ones(shape)
 
+    def profile_mask(self, profile, length):
+        """
+        Creates a new mask with this object's type that has the same values at every time hop, and only stores
+        :param:`profile`. See :class:`separation.masks.profile_mask.BinaryProfileMask`.
+
+        Args:
+            profile (:obj:`np.ndarray`): values of the mask for every frequency bin, with shape ``(num_freq,)``
+                or ``(num_freq, num_chan)``.
+            length (int): number of time hops of the mask.
+
+        Returns:
+            A :class:`separation.masks.profile_mask.BinaryProfileMask` or
+            :class:`separation.masks.profile_mask.SoftProfileMask`.
+
+        """
+        if self.mask_type == self.BINARY_MASK:
+            return masks.BinaryProfileMask(profile, length)
+        else:
+            return masks.SoftProfileMask(profile, length)
+
     def plot(self, output_name, **kwargs):
         """Plots relevant data for mask-based separation algorithm. Base class: Do not call directly!
 
@@ -231,23 +251,15 @@ class MaskSeparationBase(separation_base.SeparationBase):
         raise NotImplementedError('Cannot call base class!')
 
     @classmethod
-    def from_json(cls, json_string):
+    def _json_decoder(cls):
         """
-        Creates a new :class:`SeparationBase` object from the parameters stored in this JSON string.
-
-        Args:
-            json_string (str): A JSON string containing all the data to create a new :class:`SeparationBase`
-                object.
+        Makes the JSON decoder :func:`SeparationBase.from_json` uses for this class, which also decodes masks.
 
         Returns:
-            (:class:`SeparationBase`) A new :class:`SeparationBase` object from the JSON string.
-
-        See Also:
-            :func:`to_json` to make a JSON string to freeze this object.
+            (:class:`MaskSeparationBaseDecoder`) A decoder that makes objects of this class.
 
         """
-        mask_sep_decoder = MaskSeparationBaseDecoder(cls)
-        return mask_sep_decoder.decode(json_string)
+        return MaskSeparationBaseDecoder(cls)
 
 
 class MaskSeparationBaseDecoder(separation_base.SeparationBaseDecoder):
@@ -5,8 +5,9 @@
 init for masks files
 """
 
-from .mask_base import MaskBase
+from .mask_base import MaskBase, apply_masks
 from .binary_mask import BinaryMask
 from .soft_mask import SoftMask
+from .profile_mask import BinaryProfileMask, SoftProfileMask
 
-__all__ = ['MaskBase', 'BinaryMask', 'SoftMask']
+__all__ = ['MaskBase', 'BinaryMask', 'SoftMask', 'BinaryProfileMask', 'SoftProfileMask', 'apply_masks']
@@ -15,6 +15,11 @@ of the mask is float, all values must be within 1e-2 of either 1 or 0. If the ar
 methods of :class:`separation.mask_separation_base.MaskSeparationBase`-derived objects (this is most of the 
 separation methods in `nussl`.
 
+A :class:`BinaryMask` can also be kept bit-packed (``packed=True``, or :func:`BinaryMask.pack`): the mask is stored
+as ``np.packbits`` of the frequency axis, which takes 8 times less memory than a bool array. Logical operators
+(``&``, ``|``, ``^``, :func:`BinaryMask.invert_mask`) and :func:`BinaryMask.count_nonzero` work directly on the packed
+bytes, and :func:`BinaryMask.get_channel` and :func:`BinaryMask.get_block` only unpack the part that is asked for.
+
 See Also:
     * :class:`separation.masks.mask_base.MaskBase`: The base class for BinaryMask and SoftMask
     * :class:`separation.masks.soft_mask.SoftMask`: Similar to BinaryMask, but instead of taking boolean values, 
@@ -71,6 +76,11 @@ Examples:
 import numpy as np
 
 import mask_base
+from ...core import constants
+from ...core import utils
+
+# number of bits that are set in each byte value, for counting packed masks
+_BITS_SET = np.array([bin(i).count('1') for i in range(256)], dtype=np.int64)
 
 
 class BinaryMask(mask_base.MaskBase):
@@ -79,10 +89,177 @@ class BinaryMask(mask_base.MaskBase):
     
     Args:
         input_mask (:obj:`np.ndarray`): 2- or 3-D :obj:`np.array` that represents the mask.
+        validate (bool): If ``False``, :param:`input_mask` must already be a bool array and is not
+            checked. See :class:`separation.masks.mask_base.MaskBase`.
+        packed (bool): If ``True``, the mask is stored bit-packed along the frequency axis. See :func:`pack`.
     """
 
-    def __init__(self, input_mask=None, mask_shape=None):
-        super(BinaryMask, self).__init__(input_mask, mask_shape)
+    def __init__(self, input_mask=None, mask_shape=None, validate=True, packed=False):
+        self._packed = None
+        self._n_bins = None
+        super(BinaryMask, self).__init__(input_mask, mask_shape, validate)
+
+        if packed:
+            self.pack()
+
+    @property
+    def mask(self):
+        """
+        PROPERTY
+
+        The mask as a three dimensional bool :obj:`np.ndarray`. See :attr:`MaskBase.mask`.
+
+        If this mask is packed (see :attr:`is_packed`) this is a new array unpacked from the packed bytes every time,
+        so changes to it have to be assigned back to :attr:`mask` to be kept.
+
+        """
+        if self._packed is None:
+            return self._mask
+        return self._unpack(self._packed, self._n_bins)
+
+    @mask.setter
+    def mask(self, value):
+        self._set_mask(value)
+
+    def _set_mask(self, value, validate=True):
+        super(BinaryMask, self)._set_mask(value, validate)
+
+        # a packed mask stays packed when it's given new data
+        if self._packed is not None:
+            self._packed = None
+            self.pack()
+
+    @property
+    def is_packed(self):
+        """
+        (bool) ``True`` if this mask is stored bit-packed. See :func:`pack`.
+
+        """
+        return self._packed is not None
+
+    @property
+    def packed_mask(self):
+        """
+        (:obj:`np.ndarray`) The packed mask: ``np.packbits(mask, axis=0)``, a uint8 array with shape
+        ``(ceil(num_freq / 8), num_hops, num_chan)``. ``None`` if this mask is not packed.
+
+        """
+        return self._packed
+
+    def pack(self):
+        """
+        Stores this mask bit-packed along the frequency axis, in 8 times less memory than a bool array.
+
+        Returns:
+            This :class:`BinaryMask` object.
+
+        """
+        if self._packed is None:
+            self._n_bins = self._mask.shape[constants.STFT_VERT_INDEX]
+            self._packed = np.packbits(self._mask, axis=constants.STFT_VERT_INDEX)
+            self._mask = None
+        return self
+
+    def unpack(self):
+        """
+        Stores this mask as a bool array again, undoing :func:`pack`.
+
+        Returns:
+            This :class:`BinaryMask` object.
+
+        """
+        if self._packed is not None:
+            self._mask = self._unpack(self._packed, self._n_bins)
+            self._packed = None
+            self._n_bins = None
+        return self
+
+    @classmethod
+    def from_packed(cls, packed_mask, n_bins):
+        """
+        Makes a packed :class:`BinaryMask` from the output of ``np.packbits(mask, axis=0)``, without unpacking it.
+
+        Args:
+            packed_mask (:obj:`np.ndarray`): uint8 array with shape ``(ceil(n_bins / 8), num_hops)`` or
+                ``(ceil(n_bins / 8), num_hops, num_chan)``. The padding bits of the last row must be 0.
+            n_bins (int): number of frequency bins of the unpacked mask.
+
+        Returns:
+            A new packed :class:`BinaryMask`.
+
+        """
+        if packed_mask.dtype != np.uint8:
+            raise ValueError('packed_mask must be a uint8 array, not {}!'.format(packed_mask.dtype))
+
+        if packed_mask.shape[constants.STFT_VERT_INDEX] != -(-n_bins // 8):
+            raise ValueError('packed_mask with shape {} cannot hold {} frequency bins!'.format(packed_mask.shape,
+                                                                                             n_bins))
+
+        # the bytes go through the unvalidated path of __init__ to check and reshape them like a mask
+        mask = cls(packed_mask, validate=False)
+        mask._packed, mask._mask = mask._mask, None
+        mask._n_bins = n_bins
+        return mask
+
+    @staticmethod
+    def _unpack(packed_mask, n_bins, first_bit=0):
+        bits = np.unpackbits(packed_mask, axis=constants.STFT_VERT_INDEX)
+        return bits[first_bit:first_bit + n_bins].view(np.bool_)
+
+    def _clear_padding(self):
+        # bits past the last frequency bin must stay 0, so they don't show up in count_nonzero()
+        n_used = self._n_bins % 8
+        if n_used:
+            self._packed[-1] &= np.uint8((0xFF00 >> n_used) & 0xFF)
+
+    @property
+    def shape(self):
+        """
+        (tuple) Returns the shape of the whole (unpacked) mask. Identical to ``np.ndarray.shape()``.
+
+        """
+        if self._packed is None:
+            return super(BinaryMask, self).shape
+        return (self._n_bins,) + self._packed.shape[1:]
+
+    @property
+    def dtype(self):
+        """
+        (str) Returns the data type of the values of the mask, which is always bool.
+
+        """
+        if self._packed is None:
+            return super(BinaryMask, self).dtype
+        return np.dtype(np.bool_)
+
+    def get_channel(self, n):
+        """
+        Gets mask channel ``n`` and returns it as a 2D :obj:`np.ndarray`. Only this channel is unpacked if the
+        mask is packed. See :func:`MaskBase.get_channel`.
+
+        """
+        if self._packed is None:
+            return super(BinaryMask, self).get_channel(n)
+
+        if n >= self.num_channels or n < 0:
+            raise ValueError('Cannot get channel {0} when this object only has {1} channels! (0-based)'
+                             .format(n, self.num_channels))
+
+        return self._unpack(self._packed[..., n], self._n_bins)
+
+    def get_block(self, start, stop, hops=None, channels=None):
+        """
+        Gets frequency bins ``start`` to ``stop`` of the mask. Only the bytes holding this block are unpacked if
+        the mask is packed. See :func:`MaskBase.get_block`.
+
+        """
+        if self._packed is None:
+            return super(BinaryMask, self).get_block(start, stop, hops, channels)
+
+        _, hops, channels = mask_base._block_index(start, stop, hops, channels)
+        start, stop, _ = slice(start, stop).indices(self._n_bins)
+        packed_block = self._packed[start // 8:-(-stop // 8), hops, channels]
+        return self._unpack(packed_block, max(0, stop - start), start % 8)
 
     @staticmethod
     def _validate_mask(mask_):
@@ -102,6 +279,36 @@ class BinaryMask(mask_base.MaskBase):
 
         return mask_.astype('bool')
 
+    def count_nonzero(self):
+        """
+        Counts the ``True`` values in this mask. Packed masks are counted byte by byte, without unpacking them.
+
+        Returns:
+            (int) The number of ``True`` values in this mask.
+
+        """
+        if self._packed is None:
+            return int(np.count_nonzero(self._mask))
+        return int(np.bincount(self._packed.ravel(), minlength=256).dot(_BITS_SET))
+
+    def confusion_counts(self, estimated_mask):
+        """
+        Compares :param:`estimated_mask` against this mask, taking this mask as the ground truth. Works on the
+        packed bytes if both masks are packed.
+
+        Args:
+            estimated_mask (:obj:`BinaryMask`): estimated mask with the same shape as this mask.
+
+        Returns:
+            (tuple) ``(true_positives, false_positives, false_negatives, true_negatives)`` as ints.
+
+        """
+        true_positives = (self & estimated_mask).count_nonzero()
+        false_positives = estimated_mask.count_nonzero() - true_positives
+        false_negatives = self.count_nonzero() - true_positives
+        true_negatives = int(np.prod(self.shape)) - true_positives - false_positives - false_negatives
+        return true_positives, false_positives, false_negatives, true_negatives
+
     def mask_as_ints(self, channel=None):
         """
         Returns this :class:`BinaryMask` as a numpy array of ints of 0's and 1's.
@@ -115,16 +322,88 @@ class BinaryMask(mask_base.MaskBase):
         else:
             return self.get_channel(channel).astype('int')
 
-    def invert_mask(self):
+    def invert_mask(self, overwrite=False):
         """
         Makes a new :class:`BinaryMask` object with a logical not applied to flip the values in this :class:`BinaryMask`
         object.
 
+        Args:
+            overwrite (bool): If ``True``, the values of :attr:`mask` are flipped in place and this object is returned.
+
         Returns:
-            A new :class:`BinaryMask` object that has all of the boolean values flipped.
+            A new :class:`BinaryMask` object that has all of the boolean values flipped, or this one with
+            ``overwrite=True``.
 
         """
-        return BinaryMask(np.logical_not(self.mask))
+        if self._packed is not None:
+            inverted = self if overwrite else BinaryMask.from_packed(np.empty_like(self._packed), self._n_bins)
+            np.invert(self._packed, out=inverted._packed)
+            inverted._clear_padding()
+            return inverted
+
+        if overwrite:
+            np.logical_not(self._mask, out=self._mask)
+            return self
+
+        return BinaryMask(np.logical_not(self._mask), validate=False)
+
+    def _logical_operation(self, other, operation, overwrite=False):
+        if not isinstance(other, BinaryMask):
+            if not isinstance(other, np.ndarray):
+                raise ValueError('Cannot do logical operation with BinaryMask and {}'.format(type(other)))
+            other = BinaryMask(other)
+
+        if other.shape != self.shape:
+            raise ValueError('Masks are not the same shape! {} and {}'.format(self.shape, other.shape))
+
+        if self._packed is not None:
+            # zero padding bits stay zero under and, or, xor
+            other_packed = other._packed
+            if other_packed is None:
+                other_packed = np.packbits(other._mask, axis=constants.STFT_VERT_INDEX)
+
+            if overwrite:
+                operation(self._packed, other_packed, out=self._packed)
+                return self
+            return BinaryMask.from_packed(operation(self._packed, other_packed), self._n_bins)
+
+        if overwrite:
+            operation(self.mask, other.mask, out=self._in_place_mask())
+            return self
+        return BinaryMask(operation(self.mask, other.mask), validate=False)
+
+    def __and__(self, other):
+        return self._logical_operation(other, np.bitwise_and)
+
+    def __or__(self, other):
+        return self._logical_operation(other, np.bitwise_or)
+
+    def __xor__(self, other):
+        return self._logical_operation(other, np.bitwise_xor)
+
+    def __iand__(self, other):
+        return self._logical_operation(other, np.bitwise_and, overwrite=True)
+
+    def __ior__(self, other):
+        return self._logical_operation(other, np.bitwise_or, overwrite=True)
+
+    def __ixor__(self, other):
+        return self._logical_operation(other, np.bitwise_xor, overwrite=True)
+
+    # A packed mask has no bool array to do augmented arithmetic in, but adding bools is or-ing them.
+
+    def __iadd__(self, other):
+        if self._packed is not None:
+            return self.__ior__(other)
+        return super(BinaryMask, self).__iadd__(other)
+
+    @classmethod
+    def _from_json_dict(cls, json_dict):
+        if json_dict.get('_packed') is None:
+            return super(BinaryMask, cls)._from_json_dict(json_dict)
+
+        packed_mask = utils.json_numpy_obj_hook(json_dict['_packed'][constants.NUMPY_JSON_KEY])
+        return cls.from_packed(packed_mask, json_dict['_n_bins'])
 
     @staticmethod
     def mask_to_binary(mask_, threshold):
@@ -9,9 +9,14 @@ below.
 
 Right now only spectrogram-like masks are supported (note the shape of the :ref:`mask` property), but in future
 releases nussl will support masks for representations with different dimensionality requirements.
+
+The arithmetic operators (``+``, ``-``, ``*``, ``/``) return new numpy arrays. Their augmented versions (``+=``, ``-=``,
+``*=``, ``/=``) work on :attr:`mask` in place, without allocating anything. To apply several masks to the same STFT,
+:func:`apply_masks` makes all of the masked STFTs in one pass over the STFT.
 """
 
 import copy
+import itertools
 import json
 import numbers
 
@@ -20,14 +25,23 @@ import numpy as np
 from ...core import utils
 from ...core import constants
 
+__all__ = ['MaskBase', 'apply_masks']
+
+# apply_masks() works through the STFT in blocks of about this many bytes, so each block is still in
+# the cache when it is multiplied by the next mask
+_APPLY_MASKS_BLOCK_BYTES = 2 ** 18
+
 
 class MaskBase(object):
     """
     Args:
         input_mask (:obj:`np.ndarray`): A 2- or 3-dimensional numpy ``ndarray`` representing a mask.
-        
+        mask_shape (tuple): Shape of an all zero mask to make instead of giving :param:`input_mask`.
+        validate (bool): If ``False``, :param:`input_mask` is trusted to already hold valid values and is not
+            checked by :func:`_validate_mask`. For internal code paths that make masks from other masks.
+
     """
-    def __init__(self, input_mask=None, mask_shape=None):
+    def __init__(self, input_mask=None, mask_shape=None, validate=True):
         self._mask = None
 
         if mask_shape is None and input_mask is None:
@@ -37,7 +51,7 @@ class MaskBase(object):
             raise ValueError('Cannot initialize mask with both mask_shape and input_mask!')
 
         if isinstance(input_mask, np.ndarray):
-            self.mask = input_mask
+            self._set_mask(input_mask, validate)
 
         elif isinstance(mask_shape, tuple):
             self.mask = np.zeros(mask_shape)
@@ -67,6 +81,9 @@ class MaskBase(object):
 
     @mask.setter
     def mask(self, value):
+        self._set_mask(value)
+
+    def _set_mask(self, value, validate=True):
         assert isinstance(value, np.ndarray), 'Type of self.mask must be np.ndarray!'
 
         if value.ndim == 1:
@@ -78,7 +95,7 @@ class MaskBase(object):
         if value.ndim > 3:
             raise ValueError('Cannot support arrays with more than 3 dimensions!')
 
-        self._mask = self._validate_mask(value)
+        self._mask = self._validate_mask(value) if validate else value
 
     def get_channel(self, n):
         """
@@ -107,15 +124,31 @@ class MaskBase(object):
 
         return utils._get_axis(self.mask, constants.STFT_CHAN_INDEX, n)
 
+    def get_block(self, start, stop, hops=None, channels=None):
+        """
+        Gets frequency bins ``start`` up to ``stop`` of the mask, for all hops and channels or only the ones in
+        :param:`hops` and :param:`channels`.
+
+        Args:
+            start (int): first frequency bin (0-based).
+            stop (int): frequency bin to stop at (not included).
+            hops (slice): (Optional) hops to get. Defaults to all of them.
+            channels (slice): (Optional) channels to get. Defaults to all of them.
+
+        Returns:
+            :obj:`np.array` with shape ``(stop - start, num_hops, num_chan)``, fewer hops and channels if
+            :param:`hops` or :param:`channels` are given.
+
+        """
+        return self.mask[_block_index(start, stop, hops, channels)]
+
     @property
     def length(self):
         """
         (int) Number of time hops that this mask represents.
 
         """
-        if self.mask is None:
-            raise AttributeError('Cannot get length of BinaryMask when there is no mask data!')
-        return self.mask.shape[constants.STFT_LEN_INDEX]
+        return self.shape[constants.STFT_LEN_INDEX]
 
     @property
     def height(self):
@@ -123,9 +156,7 @@ class MaskBase(object):
         (int) Number of frequency bins this mask has.
 
         """
-        if self.mask is None:
-            raise AttributeError('Cannot get height of BinaryMask when there is no mask data!')
-        return self.mask.shape[constants.STFT_VERT_INDEX]
+        return self.shape[constants.STFT_VERT_INDEX]
 
     @property
     def num_channels(self):
@@ -133,9 +164,7 @@ class MaskBase(object):
         (int) Number of channels this mask has.
 
         """
-        if self.mask is None:
-            raise AttributeError('Cannot get num_channels of BinaryMask when there is no mask data!')
-        return self.mask.shape[constants.STFT_CHAN_INDEX]
+        return self.shape[constants.STFT_CHAN_INDEX]
 
     @property
     def shape(self):
@@ -192,15 +221,18 @@ class MaskBase(object):
         """
         return cls(np.zeros(shape))
 
-    def invert_mask(self):
+    def invert_mask(self, overwrite=False):
         """
 
+        Args:
+            overwrite (bool): If ``True``, :attr:`mask` is inverted in place and ``self`` is returned.
+
         Returns:
 
         """
         raise NotImplementedError('Cannot call base class! Use BinaryMask or SoftMask!')
 
-    def inverse_mask(self):
+    def inverse_mask(self, overwrite=False):
         """
         Alias for :func:`invert_mask`
 
@@ -210,22 +242,31 @@ class MaskBase(object):
         Returns:
 
         """
-        return self.invert_mask()
+        return self.invert_mask(overwrite)
 
-    def _add(self, other):
+    def _add(self, other, operation=np.add, out=None):
         if isinstance(other, MaskBase):
-            return self.mask + other.mask
-        if isinstance(other, np.ndarray):
-            return self.mask + other
-
-        else:
+            other = other.mask
+        elif not isinstance(other, np.ndarray):
             raise ValueError('Cannot do arithmetic operation with MaskBase and {}'.format(type(other)))
 
-    def _mult(self, value):
+        return self._operate(operation, other, out)
+
+    def _mult(self, value, operation=np.multiply, out=None):
         if not isinstance(value, numbers.Real):
             raise ValueError('Cannot do operation with MaskBase and {}'.format(type(value)))
 
-        return self.mask * value
+        return self._operate(operation, value, out)
+
+    def _operate(self, operation, other, out=None):
+        if out is None:
+            return operation(self.mask, other)
+
+        # in place: only allow results that fit in this mask's dtype (e.g. no bool - bool, or bool * 0.5)
+        try:
+            return operation(self.mask, other, out=out, casting='same_kind')
+        except TypeError as e:
+            raise ValueError('Cannot do this operation in place on a mask of type {}: {}'.format(self.dtype, e))
 
     def to_json(self):
         """
@@ -252,6 +293,16 @@ class MaskBase(object):
 
         return d
 
+    @classmethod
+    def _from_json_dict(cls, json_dict):
+        if json_dict.get('_mask') is None:
+            raise TypeError('JSON string from {} does not have mask!'.format(cls.__name__))
+
+        mask_numpy = utils.json_numpy_obj_hook(json_dict['_mask'][constants.NUMPY_JSON_KEY])
+
+        # the mask was validated before it was saved
+        return cls(input_mask=mask_numpy, validate=False)
+
     @classmethod
     def from_json(cls, json_string):
         """ Creates a new :class:`MaskBase` object from the parameters stored in this JSON string.
@@ -270,32 +321,93 @@ class MaskBase(object):
         mask_decoder = MaskBaseDecoder(cls)
         return mask_decoder.decode(json_string)
 
+    def to_bytes(self):
+        """ Outputs this mask in nussl's binary format: the JSON from :func:`to_json` with :attr:`mask`
+        stored as raw bytes instead of base64 text.
+
+        Returns:
+            (bytes) binary representation of this mask.
+
+        See Also:
+            :func:`from_bytes` to restore it, :func:`utils.to_binary` for the format.
+
+        """
+        return utils.to_binary(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """ Creates a new :class:`MaskBase` object from the output of :func:`to_bytes`.
+
+        Args:
+            data (bytes): binary representation of a :class:`MaskBase` object.
+
+        Returns:
+            (:class:`MaskBase`) A new :class:`MaskBase` object.
+
+        """
+        return utils.from_binary(data, cls.from_json)
+
+    def save(self, file_path):
+        """ Writes this mask to :param:`file_path` in the binary format of :func:`to_bytes`.
+
+        Args:
+            file_path (str): path of the file to write.
+
+        """
+        utils.write_binary(self, file_path)
+
+    @classmethod
+    def load(cls, file_path, memory_map=True):
+        """ Reads a mask written by :func:`save`.
+
+        Args:
+            file_path (str): path of the file to read.
+            memory_map (bool): if ``True`` (default), the mask is a copy-on-write memory map of the file.
+
+        Returns:
+            (:class:`MaskBase`) The mask that was saved.
+
+        """
+        return utils.read_binary(file_path, cls.from_json, memory_map)
+
+    def _in_place_mask(self):
+        # masks that are stored compressed (packed or quantized) have no array to do arithmetic in
+        if self._mask is None:
+            raise ValueError('Cannot do arithmetic in place on a compressed {}!'.format(self.__class__.__name__))
+        return self._mask
+
+    # The augmented operators change self.mask in place and return self. The result is not validated again.
+
     def __add__(self, other):
         return self._add(other)
 
     def __sub__(self, other):
-        return self + (-1 * other)
+        return self._add(other, np.subtract)
 
     def __iadd__(self, other):
-        return self + other
+        self._add(other, out=self._in_place_mask())
+        return self
 
     def __isub__(self, other):
-        return self - other
+        self._add(other, np.subtract, out=self._in_place_mask())
+        return self
 
     def __mul__(self, value):
         return self._mult(value)
 
     def __div__(self, value):
-        return self._mult(1 / float(value))
+        return self._mult(value, np.true_divide)
 
     def __truediv__(self, value):
         return self.__div__(value)
 
     def __imul__(self, value):
-        return self * value
+        self._mult(value, out=self._in_place_mask())
+        return self
 
     def __idiv__(self, value):
-        return self / value
+        self._mult(value, np.true_divide, out=self._in_place_mask())
+        return self
 
     def __itruediv__(self, value):
         return self.__idiv__(value)
@@ -307,6 +419,11 @@ class MaskBase(object):
         return not self.__eq__(other)
 
 
+def _all_subclasses(cls):
+    subclasses = cls.__subclasses__()
+    return subclasses + [c for subclass in subclasses for c in _all_subclasses(subclass)]
+
+
 class MaskBaseDecoder(json.JSONDecoder):
     """ Object to decode a :class:`MaskBase`-derived object from JSON serialization.
     You should never have to instantiate this object by hand.
@@ -333,7 +450,7 @@ class MaskBaseDecoder(json.JSONDecoder):
             class_name = json_dict.pop('__class__')
             module_name = json_dict.pop('__module__')
 
-            mask_modules, mask_names = zip(*[(c.__module__, c.__name__) for c in MaskBase.__subclasses__()])
+            mask_modules, mask_names = zip(*[(c.__module__, c.__name__) for c in _all_subclasses(MaskBase)])
 
             if class_name not in mask_names or module_name not in mask_modules:
                 raise TypeError('Got unknown mask type ({}.{}) from json!'.format(module_name, class_name))
@@ -342,12 +459,92 @@ class MaskBaseDecoder(json.JSONDecoder):
             module = __import__(module_name).separation.masks
             class_ = getattr(module, class_name)
 
-            if '_mask' not in json_dict:
-                raise TypeError('JSON string from {} does not have mask!'.format(class_name))
-
-            mask_json = json_dict.pop('_mask')  # this is the mask numpy array
-            mask_numpy = utils.json_numpy_obj_hook(mask_json[constants.NUMPY_JSON_KEY])
-
-            return class_(input_mask=mask_numpy)
+            return class_._from_json_dict(json_dict)
         else:
             return json_dict
+
+
+def _block_index(start, stop, hops=None, channels=None):
+    """
+    Index of the block that :func:`MaskBase.get_block` gets.
+    """
+    return (slice(start, stop),
+            slice(None) if hops is None else hops,
+            slice(None) if channels is None else channels)
+
+
+def apply_masks(stft, masks, out=None):
+    """
+    Applies every mask in :param:`masks` to :param:`stft` and returns all of the masked STFTs. Gives the same as
+    ``[stft * mask.mask for mask in masks]``, but the STFT is read from memory once instead of once per mask: it is
+    worked through in cache sized blocks, in the order it is laid out in memory, and each block is multiplied by
+    every mask before moving on. All of the masked STFTs go into one array, which can be given as :param:`out` to
+    reuse it. Each masked STFT in it has the memory layout of :param:`stft`.
+
+    Args:
+        stft (:obj:`np.ndarray`): complex STFT with shape ``(n_frequency_bins, n_hops, n_channels)``. A 2D STFT
+            is treated as one channel, like :attr:`MaskBase.mask` does.
+        masks (list): :class:`MaskBase`-derived objects or numpy arrays, all with the shape of :param:`stft`.
+            Masks are only read one block at a time with :func:`MaskBase.get_block`, so packed
+            :class:`separation.masks.binary_mask.BinaryMask` objects are never unpacked all at once.
+        out (:obj:`np.ndarray`): (Optional) array with shape ``(len(masks),) + stft.shape`` and the dtype of
+            :param:`stft` to write the result to.
+
+    Returns:
+        (:obj:`np.ndarray`) Masked STFTs with shape ``(len(masks),) + stft.shape`` and the dtype of :param:`stft`,
+        ``result[i]`` is :param:`stft` masked by ``masks[i]``.
+
+    Raises:
+        :obj:`ValueError` if a mask or :param:`out` doesn't have the right shape.
+
+    """
+    if stft.ndim == 2:
+        stft = np.expand_dims(stft, axis=constants.STFT_CHAN_INDEX)
+
+    masks = [np.expand_dims(mask, axis=constants.STFT_CHAN_INDEX) if not isinstance(mask, MaskBase) and mask.ndim == 2
+             else mask for mask in masks]
+    for mask in masks:
+        if mask.shape != stft.shape:
+            raise ValueError('Mask and STFT are not the same shape! mask: {}, stft: {}'.format(mask.shape,
+                                                                                               stft.shape))
+
+    shape = (len(masks),) + stft.shape
+    # axes of the STFT from the one that is furthest apart in memory to the closest
+    axes = sorted(range(stft.ndim), key=lambda axis: abs(stft.strides[axis]), reverse=True)
+    if out is None:
+        out = np.empty((len(masks),) + tuple(stft.shape[axis] for axis in axes), dtype=stft.dtype)
+        out = out.transpose((0,) + tuple(1 + axes.index(axis) for axis in range(stft.ndim)))
+    elif out.shape != shape:
+        raise ValueError('out has shape {}, expected {}!'.format(out.shape, shape))
+
+    for index in _memory_order_blocks(stft.shape, axes, stft.itemsize):
+        block = stft[index]
+        for i, mask in enumerate(masks):
+            # multiply in the STFT's precision, so a float64 mask doesn't upcast complex64 data
+            if isinstance(mask, MaskBase):
+                mask_block = mask.get_block(index[0].start, index[0].stop, index[1], index[2])
+            else:
+                mask_block = mask[index]
+            np.multiply(block, mask_block, out=out[i][index], casting='unsafe')
+
+    return out
+
+
+def _memory_order_blocks(shape, axes, itemsize):
+    """
+    Splits an array with :param:`shape` into blocks of about :data:`_APPLY_MASKS_BLOCK_BYTES` that are each close
+    together in memory, and yields the index of every block. :param:`axes` are the axes of the array from the one
+    with the largest stride to the one with the smallest. The blocks are slices of the first of these axes that
+    fits a block, and take one index at a time of the axes before it.
+    """
+    sizes = [itemsize * int(np.prod([shape[axis] for axis in axes[k + 1:]])) for k in range(len(axes))]
+    k = next((k for k, size in enumerate(sizes) if size <= _APPLY_MASKS_BLOCK_BYTES), len(axes) - 1)
+    step = max(1, _APPLY_MASKS_BLOCK_BYTES // max(1, sizes[k]))
+
+    for outer in itertools.product(*[range(shape[axis]) for axis in axes[:k]]):
+        for start in range(0, shape[axes[k]], step):
+            index = [slice(None)] * len(shape)
+            for axis, i in zip(axes[:k], outer):
+                index[axis] = slice(i, i + 1)
+            index[axes[k]] = slice(start, start + step)
+            yield tuple(index)
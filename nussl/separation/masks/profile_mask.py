@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Masks that are the same at every time hop, like the masks of a high or low pass filter. :class:`BinaryProfileMask` and
+:class:`SoftProfileMask` only store one value per frequency bin and channel (the *profile*) instead of one per
+time-frequency bin, so they take ``num_hops`` times less memory than a :class:`BinaryMask` or :class:`SoftMask`.
+
+They are :class:`BinaryMask` and :class:`SoftMask` objects, and can be used anywhere those are. :attr:`mask`,
+:func:`get_channel` and :func:`get_block` give read-only ``np.broadcast_to`` views of the profile, so the full mask is
+never materialized: applying a profile mask with :func:`AudioSignal.apply_mask` or
+:func:`separation.masks.mask_base.apply_masks` multiplies the STFT by the profile directly.
+
+Example:
+
+.. code-block:: python
+    :linenos:
+
+    import nussl
+    import numpy as np
+
+    signal = nussl.AudioSignal('path/to/file.wav')
+    signal.stft()
+
+    # keep the frequency bins below 1 kHz
+    profile = np.zeros((signal.stft_data.shape[0], signal.num_channels), dtype=bool)
+    profile[:signal.get_closest_frequency_bin(1000)] = True
+    low_pass_mask = nussl.BinaryProfileMask(profile, signal.stft_length)
+
+    low_passed = signal.apply_mask(low_pass_mask)
+
+"""
+
+import numpy as np
+
+import mask_base
+import binary_mask
+import soft_mask
+from ...core import constants
+from ...core import utils
+
+__all__ = ['BinaryProfileMask', 'SoftProfileMask']
+
+
+class _ProfileMaskMixin(object):
+    """
+    Storage shared by :class:`BinaryProfileMask` and :class:`SoftProfileMask`. The profile is kept as a valid mask
+    with one hop, of the class in :attr:`_dense_class`, and is broadcast along the hops when it's used.
+    """
+
+    _dense_class = None
+
+    def __init__(self, profile, length, validate=True):
+        if not isinstance(profile, np.ndarray):
+            raise ValueError('profile must be a np.ndarray!')
+
+        if profile.ndim == 1:
+            profile = profile[:, np.newaxis]
+
+        if profile.ndim != 2:
+            raise ValueError('profile must have shape (num_freq,) or (num_freq, num_chan), not {}!'
+                             .format(profile.shape))
+
+        if length < 0:
+            raise ValueError('length must be at least 0, not {}!'.format(length))
+
+        self._profile = None
+        self._length = int(length)
+
+        # validated like a mask with one hop
+        super(_ProfileMaskMixin, self).__init__(np.expand_dims(profile, axis=constants.STFT_LEN_INDEX),
+                                                validate=validate)
+        self._profile, self._mask = self._mask, None
+
+    @property
+    def mask(self):
+        """
+        PROPERTY
+
+        The mask as a read-only three dimensional :obj:`np.ndarray`: :attr:`profile` broadcast along the hops, without
+        copying it. Use :func:`to_dense` to get a mask that can be changed.
+
+        """
+        return np.broadcast_to(self._profile, self.shape)
+
+    @mask.setter
+    def mask(self, value):
+        raise ValueError('Cannot set the mask of a {}! Make a new one from a profile, or use to_dense().'
+                         .format(self.__class__.__name__))
+
+    @property
+    def profile(self):
+        """
+        (:obj:`np.ndarray`) The value of the mask at every frequency bin and channel, with shape
+        ``(num_freq, 1, num_chan)``.
+
+        """
+        return self._profile
+
+    @property
+    def shape(self):
+        """
+        (tuple) Returns the shape of the whole mask. Identical to ``np.ndarray.shape()``.
+
+        """
+        shape = list(self._profile.shape)
+        shape[constants.STFT_LEN_INDEX] = self._length
+        return tuple(shape)
+
+    @property
+    def dtype(self):
+        """
+        (str) Returns the data type of the values of the mask.
+
+        """
+        return self._profile.dtype
+
+    def get_channel(self, n):
+        """
+        Gets mask channel ``n`` as a read-only 2D :obj:`np.ndarray`. See :func:`MaskBase.get_channel`.
+
+        """
+        if n >= self.num_channels or n < 0:
+            raise ValueError('Cannot get channel {0} when this object only has {1} channels! (0-based)'
+                             .format(n, self.num_channels))
+
+        return np.broadcast_to(self._profile[..., n], (self.height, self.length))
+
+    def get_block(self, start, stop, hops=None, channels=None):
+        """
+        Gets frequency bins ``start`` to ``stop`` of the mask as a read-only view of :attr:`profile`.
+        See :func:`MaskBase.get_block`.
+
+        """
+        bins, hops, channels = mask_base._block_index(start, stop, hops, channels)
+        profile_block = self._profile[bins, :, channels]
+        n_hops = len(range(*hops.indices(self._length)))
+        return np.broadcast_to(profile_block, (profile_block.shape[0], n_hops, profile_block.shape[-1]))
+
+    def to_dense(self):
+        """
+        Makes a mask of the class this one is derived from, with every time-frequency bin stored.
+
+        Returns:
+            A new :class:`BinaryMask` or :class:`SoftMask` with the same values as this mask.
+
+        """
+        return self._dense_class(np.array(self.mask), validate=False)
+
+    def invert_mask(self, overwrite=False):
+        """
+        Inverts :attr:`profile`, like :func:`BinaryMask.invert_mask` or :func:`SoftMask.invert_mask` invert the
+        whole mask.
+
+        Args:
+            overwrite (bool): If ``True``, :attr:`profile` is inverted in place and this object is returned.
+
+        Returns:
+            A new mask of this class with the inverted values, or this one with ``overwrite=True``.
+
+        """
+        inverted = self._dense_class(self._profile, validate=False).invert_mask(overwrite)
+        if overwrite:
+            return self
+        return type(self)(inverted.mask[:, 0], self._length, validate=False)
+
+    @classmethod
+    def _from_json_dict(cls, json_dict):
+        if json_dict.get('_profile') is None:
+            raise TypeError('JSON string from {} does not have profile!'.format(cls.__name__))
+
+        profile = utils.json_numpy_obj_hook(json_dict['_profile'][constants.NUMPY_JSON_KEY])
+        return cls(profile[:, 0], json_dict['_length'], validate=False)
+
+
+class BinaryProfileMask(_ProfileMaskMixin, binary_mask.BinaryMask):
+    """
+    A :class:`BinaryMask` that has the same values at every time hop.
+
+    Args:
+        profile (:obj:`np.ndarray`): values of the mask for every frequency bin, with shape ``(num_freq,)`` or
+            ``(num_freq, num_chan)``. Validated like a :class:`BinaryMask`.
+        length (int): number of time hops of the mask.
+        validate (bool): If ``False``, :param:`profile` must already be a bool array and is not checked.
+
+    """
+    _dense_class = binary_mask.BinaryMask
+
+    def __init__(self, profile, length, validate=True):
+        super(BinaryProfileMask, self).__init__(profile, length, validate)
+
+    def count_nonzero(self):
+        """
+        Counts the ``True`` values in this mask from :attr:`profile`.
+
+        Returns:
+            (int) The number of ``True`` values in this mask.
+
+        """
+        return int(np.count_nonzero(self._profile)) * self._length
+
+    def pack(self):
+        """
+        A profile mask is already stored compactly, so it can't be packed. Use :func:`to_dense` first.
+
+        """
+        raise ValueError('Cannot pack a BinaryProfileMask! Use to_dense().pack() instead.')
+
+
+class SoftProfileMask(_ProfileMaskMixin, soft_mask.SoftMask):
+    """
+    A :class:`SoftMask` that has the same values at every time hop.
+
+    Args:
+        profile (:obj:`np.ndarray`): values of the mask for every frequency bin, with shape ``(num_freq,)`` or
+            ``(num_freq, num_chan)``. Validated like a :class:`SoftMask`.
+        length (int): number of time hops of the mask.
+        validate (bool): If ``False``, :param:`profile` must already be a float array in ``[0.0, 1.0]`` and is not
+            checked.
+
+    """
+    _dense_class = soft_mask.SoftMask
+
+    def __init__(self, profile, length, validate=True):
+        super(SoftProfileMask, self).__init__(profile, length, validate)
+
+    def mask_to_binary(self, threshold=0.5):
+        """
+        Create a new :class:`BinaryProfileMask` object from this object's profile.
+
+        Args:
+            threshold (float, Optional): Threshold (between ``[0.0, 1.0]``) to set the True/False cutoff for the binary
+             mask.
+
+        Returns:
+            A new :class:`BinaryProfileMask` object
+
+        """
+        return BinaryProfileMask(self._profile[:, 0] > threshold, self._length, validate=False)
+
+    def quantize(self, dtype='uint8'):
+        """
+        A profile mask is already stored compactly, so it can't be quantized. Use :func:`to_dense` first.
+
+        """
+        raise ValueError('Cannot quantize a SoftProfileMask! Use to_dense().quantize() instead.')
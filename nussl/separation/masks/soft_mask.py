@@ -11,6 +11,13 @@ The mask is stored as a 3-dimensional boolean-valued numpy array.
 methods of :class:`separation.mask_separation_base.MaskSeparationBase`-derived objects (this is most of the 
 separation methods in `nussl`.
 
+A :class:`SoftMask` can also be stored quantized (``quantize='uint8'`` or ``'uint16'``, or :func:`SoftMask.quantize`):
+each value is kept as the nearest of 256 or 65536 evenly spaced levels in ``[0.0, 1.0]``, in 8 or 4 times less memory
+(and serialized size) than float64. Each value of a quantized mask is within ``0.5 / 255`` (about ``2e-3``) for uint8,
+or ``0.5 / 65535`` (about ``7.6e-6``) for uint16, of the value it was made from; 0.0 and 1.0 are stored exactly.
+See :attr:`SoftMask.quantization_error`. Values are only turned back to floats when they are used, a block at a time
+in :func:`AudioSignal.apply_mask` and :func:`separation.masks.mask_base.apply_masks`.
+
 See Also:
     * :class:`separation.masks.mask_base.MaskBase`: The base class for BinaryMask and SoftMask
     * :class:`separation.masks.soft_mask.BinaryMask`: Similar to BinaryMask, but instead of taking floats, 
@@ -60,6 +67,11 @@ import warnings
 
 import mask_base
 import binary_mask
+from ...core import constants
+from ...core import utils
+
+# dtypes a SoftMask can be quantized to
+_QUANTIZED_DTYPES = (np.dtype(np.uint8), np.dtype(np.uint16))
 
 
 class SoftMask(mask_base.MaskBase):
@@ -69,24 +81,200 @@ class SoftMask(mask_base.MaskBase):
     
     Args:
         input_mask (:obj:`np.ndarray`): 2- or 3-D :obj:`np.array` that represents the mask.
+        validate (bool): If ``False``, skip checking that :param:`input_mask` is float and within
+            ``[0.0, 1.0]``. See :class:`separation.masks.mask_base.MaskBase`.
+        quantize (str): (Optional) ``'uint8'`` or ``'uint16'`` to store the mask quantized. See :func:`quantize`.
     """
 
-    def __init__(self, input_mask=None, mask_shape=None):
-        super(SoftMask, self).__init__(input_mask, mask_shape)
+    def __init__(self, input_mask=None, mask_shape=None, validate=True, quantize=None):
+        self._codes = None
+        super(SoftMask, self).__init__(input_mask, mask_shape, validate)
+
+        if quantize is not None:
+            self.quantize(quantize)
+
+    @property
+    def mask(self):
+        """
+        PROPERTY
+
+        The mask as a three dimensional float :obj:`np.ndarray`. See :attr:`MaskBase.mask`.
+
+        If this mask is quantized (see :attr:`is_quantized`) this is a new float64 array made from the quantized
+        values every time, so changes to it have to be assigned back to :attr:`mask` to be kept.
+
+        """
+        if self._codes is None:
+            return self._mask
+        return self._dequantize(self._codes)
+
+    @mask.setter
+    def mask(self, value):
+        self._set_mask(value)
+
+    def _set_mask(self, value, validate=True):
+        codes = self._codes
+        self._codes = None
+        super(SoftMask, self)._set_mask(value, validate)
+
+        # a quantized mask stays quantized when it's given new data
+        if codes is not None:
+            self.quantize(codes.dtype)
+
+    @property
+    def is_quantized(self):
+        """
+        (bool) ``True`` if this mask is stored quantized. See :func:`quantize`.
+
+        """
+        return self._codes is not None
+
+    @property
+    def quantized_mask(self):
+        """
+        (:obj:`np.ndarray`) The quantized mask: uint8 or uint16 codes, where code ``c`` stands for the value
+        ``c / np.iinfo(dtype).max``. ``None`` if this mask is not quantized.
+
+        """
+        return self._codes
+
+    @property
+    def quantization_error(self):
+        """
+        (float) Largest difference between a value of :attr:`mask` and the value it was made from: ``0.5 / 255`` for
+        uint8, ``0.5 / 65535`` for uint16 and 0.0 if this mask is not quantized.
+
+        """
+        if self._codes is None:
+            return 0.0
+        return 0.5 / np.iinfo(self._codes.dtype).max
+
+    def quantize(self, dtype='uint8'):
+        """
+        Stores this mask as ``round(mask * np.iinfo(dtype).max)`` in an unsigned int array, in 8 (uint8) or 4 (uint16)
+        times less memory than float64. Values are clipped to ``[0.0, 1.0]`` first.
+
+        Args:
+            dtype (str): ``'uint8'`` or ``'uint16'``.
+
+        Returns:
+            This :class:`SoftMask` object.
+
+        """
+        dtype = np.dtype(dtype)
+        if dtype not in _QUANTIZED_DTYPES:
+            raise ValueError('Can only quantize SoftMask to uint8 or uint16, not {}!'.format(dtype))
+
+        if self._codes is not None:
+            if self._codes.dtype == dtype:
+                return self
+            self.dequantize()
+
+        n_levels = np.iinfo(dtype).max
+        scaled = np.multiply(self._mask, n_levels, dtype=np.float64)
+        np.clip(scaled, 0, n_levels, out=scaled)
+        np.rint(scaled, out=scaled)
+
+        self._codes = scaled.astype(dtype)
+        self._mask = None
+        return self
+
+    def dequantize(self):
+        """
+        Stores this mask as a float64 array again, undoing :func:`quantize`. The quantization error stays.
+
+        Returns:
+            This :class:`SoftMask` object.
+
+        """
+        if self._codes is not None:
+            self._mask = self._dequantize(self._codes)
+            self._codes = None
+        return self
+
+    @classmethod
+    def from_quantized(cls, quantized_mask):
+        """
+        Makes a quantized :class:`SoftMask` from uint8 or uint16 codes, like :attr:`quantized_mask`.
+
+        Args:
+            quantized_mask (:obj:`np.ndarray`): 2- or 3-D uint8 or uint16 array.
+
+        Returns:
+            A new quantized :class:`SoftMask`.
+
+        """
+        if quantized_mask.dtype not in _QUANTIZED_DTYPES:
+            raise ValueError('quantized_mask must be uint8 or uint16, not {}!'.format(quantized_mask.dtype))
+
+        # the codes go through the unvalidated path of __init__ to check and reshape them like a mask
+        mask = cls(quantized_mask, validate=False)
+        mask._codes, mask._mask = mask._mask, None
+        return mask
+
+    @staticmethod
+    def _dequantize(codes):
+        return np.true_divide(codes, np.iinfo(codes.dtype).max)
+
+    @property
+    def shape(self):
+        """
+        (tuple) Returns the shape of the whole mask. Identical to ``np.ndarray.shape()``.
+
+        """
+        if self._codes is None:
+            return super(SoftMask, self).shape
+        return self._codes.shape
+
+    @property
+    def dtype(self):
+        """
+        (str) Returns the data type of the values of the mask, float64 if the mask is quantized.
+
+        """
+        if self._codes is None:
+            return super(SoftMask, self).dtype
+        return np.dtype(np.float64)
+
+    def get_channel(self, n):
+        """
+        Gets mask channel ``n`` and returns it as a 2D :obj:`np.ndarray`. Only this channel is dequantized if the
+        mask is quantized. See :func:`MaskBase.get_channel`.
+
+        """
+        if self._codes is None:
+            return super(SoftMask, self).get_channel(n)
+
+        if n >= self.num_channels or n < 0:
+            raise ValueError('Cannot get channel {0} when this object only has {1} channels! (0-based)'
+                             .format(n, self.num_channels))
+
+        return self._dequantize(self._codes[..., n])
+
+    def get_block(self, start, stop, hops=None, channels=None):
+        """
+        Gets frequency bins ``start`` to ``stop`` of the mask. Only this block is dequantized if the mask is
+        quantized. See :func:`MaskBase.get_block`.
+
+        """
+        if self._codes is None:
+            return super(SoftMask, self).get_block(start, stop, hops, channels)
+        return self._dequantize(self._codes[mask_base._block_index(start, stop, hops, channels)])
 
     @staticmethod
     def _validate_mask(mask_):
         assert isinstance(mask_, np.ndarray), 'Mask must be a numpy array!'
 
-        if np.max(mask_) > 1.0 or np.min(mask_) < 0.0:
+        if mask_.dtype.kind not in np.typecodes['AllFloat']:
+            raise ValueError('Mask must have type: float! Maybe you want BinaryMask?')
+
+        max_value = np.max(mask_)
+        if max_value > 1.0 or np.min(mask_) < 0.0:
             # raise ValueError('All values must be between [0.0, 1.0] for SoftMask!')
             # TODO: maybe normalize instead of throwing a warning/error?
             # warnings.warn('All values must be between [0.0, 1.0] for SoftMask! max/min={}/{}'.format(np.max(mask_),
             #                                                                                          np.min(mask_)))
-            mask_ /= np.max(mask_)
-
-        if mask_.dtype.kind not in np.typecodes['AllFloat']:
-            raise ValueError('Mask must have type: float! Maybe you want BinaryMask?')
+            mask_ /= max_value
 
         return mask_
 
@@ -104,12 +292,37 @@ class SoftMask(mask_base.MaskBase):
         """
         return binary_mask.BinaryMask(self.mask > threshold)
 
-    def invert_mask(self):
+    def invert_mask(self, overwrite=False):
         """
         Returns a new mask with inverted values set like ``1 - mask`` for :attr:`mask`.
 
+        Args:
+            overwrite (bool): If ``True``, :attr:`mask` is set to ``1 - mask`` in place and this object is returned.
+
         Returns:
-            A new :class:`SoftMask` object with values set at ``1 - mask``.
+            A new :class:`SoftMask` object with values set at ``1 - mask``, or this one with
+            ``overwrite=True``.
 
         """
-        return SoftMask(np.abs(1 - self.mask))
+        # 1 - c / n_levels is (n_levels - c) / n_levels, so quantized masks are inverted exactly
+        if self._codes is not None:
+            n_levels = np.iinfo(self._codes.dtype).max
+            if overwrite:
+                np.subtract(n_levels, self._codes, out=self._codes, dtype=self._codes.dtype)
+                return self
+            return SoftMask.from_quantized(np.subtract(n_levels, self._codes, dtype=self._codes.dtype))
+
+        # values in [0.0, 1.0] stay in [0.0, 1.0], so there is nothing to validate
+        if overwrite:
+            np.subtract(1, self.mask, out=self.mask)
+            return self
+
+        return SoftMask(np.subtract(1, self.mask), validate=False)
+
+    @classmethod
+    def _from_json_dict(cls, json_dict):
+        if json_dict.get('_codes') is None:
+            return super(SoftMask, cls)._from_json_dict(json_dict)
+
+        quantized_mask = utils.json_numpy_obj_hook(json_dict['_codes'][constants.NUMPY_JSON_KEY])
+        return cls.from_quantized(quantized_mask)
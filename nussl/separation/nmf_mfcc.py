@@ -1,12 +1,14 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import copy
+import multiprocessing
+import multiprocessing.pool
 
 import numpy as np
 import sklearn.cluster
 import librosa
 
+from ..core import constants
 from ..transformers import transformer_nmf
 import mask_separation_base
 import masks
@@ -51,6 +53,12 @@ class NMF_MFCC(mask_separation_base.MaskSeparationBase):
             mfcc_range (int,list,tuple): The range of MFCCs used for clustering. See examples below.
              Defaults to ``1:14``.
             n_mfcc (int): The max number of mfccs to use. Defaults to 20.
+            num_restarts (int): The number of times NMF is run on each channel, each from a different random
+             initialization. The factorization with the lowest reconstruction error is kept. With ``random_seed``,
+             restart ``r`` is seeded with ``random_seed + r``. Defaults to 1.
+            num_workers (int): The number of threads the NMF runs of all channels and restarts are spread across. All
+             threads share the magnitude spectrograms, nothing is copied. ``None`` uses one thread per CPU.
+             Defaults to 1.
 
         Attributes:
             input_audio_signal (:class:`audio_signal.AudioSignal`): The :class:`audio_signal.AudioSignal` object that
@@ -61,6 +69,7 @@ class NMF_MFCC(mask_separation_base.MaskSeparationBase):
                                                from the templates matrix for a particular source.
             sources (:obj:`list`): A list containing the lists of Audio Signal objects for each source.
             result_masks (:obj:`list`): A list containing the lists of Binary Mask objects for each channel.
+            reconstruction_errors (:obj:`list`): The reconstruction error of the NMF kept for each channel.
 
          Initializing Example:
 
@@ -99,12 +108,23 @@ class NMF_MFCC(mask_separation_base.MaskSeparationBase):
                               n_jobs: 1, algorithm: 'auto'}
             nmf_mfcc =  nussl.NMF_MFCC(signal, num_sources=2, kmeans_kwargs=kmeans_kwargs)
 
+            # Restarts
+            # Run NMF 4 times per channel on 4 threads and keep the best factorization of each channel
+            nmf_mfcc =  nussl.NMF_MFCC(signal, num_sources=2, random_seed=0, num_restarts=4, num_workers=4)
+
         """
     def __init__(self, input_audio_signal, num_sources, num_templates=50, num_iterations=50, random_seed=None,
                  distance_measure=transformer_nmf.TransformerNMF.EUCLIDEAN, kmeans_kwargs=None, to_mono=False,
-                 mask_type=mask_separation_base.MaskSeparationBase.BINARY_MASK, mfcc_range=(1, 14), n_mfcc=20):
+                 mask_type=mask_separation_base.MaskSeparationBase.BINARY_MASK, mfcc_range=(1, 14), n_mfcc=20,
+                 num_restarts=1, num_workers=1):
         super(NMF_MFCC, self).__init__(input_audio_signal=input_audio_signal, mask_type=mask_type)
 
+        if num_restarts < 1:
+            raise ValueError('num_restarts must be at least 1, not {}!'.format(num_restarts))
+
+        if num_workers is not None and num_workers < 1:
+            raise ValueError('num_workers must be at least 1 or None, not {}!'.format(num_workers))
+
         self.num_sources = num_sources
         self.num_templates = num_templates
         self.distance_measure = distance_measure
@@ -112,8 +132,11 @@ class NMF_MFCC(mask_separation_base.MaskSeparationBase):
         self.random_seed = random_seed
         self.kmeans_kwargs = kmeans_kwargs
         self.n_mfcc = n_mfcc
+        self.num_restarts = num_restarts
+        self.num_workers = num_workers
 
         self.signal_stft = None
+        self.reconstruction_errors = []
         self.labeled_templates = None
         self.sources = []
 
@@ -173,18 +196,15 @@ class NMF_MFCC(mask_separation_base.MaskSeparationBase):
         self.audio_signal.stft_params = self.stft_params
         self.audio_signal.stft()
 
-        uncollated_masks = []
-        n_chan = self.audio_signal.num_channels
-        for ch in range(n_chan):
-            channel_stft = self.audio_signal.get_magnitude_spectrogram_channel(ch)
+        factorizations = self._factorize_channels()
 
-            # Set up NMF and run
-            nmf = transformer_nmf.TransformerNMF(input_matrix=channel_stft, num_components=self.num_templates,
-                                                 seed=self.random_seed, should_do_epsilon=False,
-                                                 max_num_iterations=self.num_iterations,
-                                                 distance_measure=self.distance_measure)
+        n_chan = self.audio_signal.num_channels
+        n_bins, n_hops = self.audio_signal.stft_data.shape[:constants.STFT_CHAN_INDEX]
 
-            channel_activation_matrix, channel_templates_matrix = nmf.transform()
+        # Masks of every source and channel, so that each source's mask is a contiguous (freq, hops, channels) block
+        collated_masks = np.empty((self.num_sources, n_bins, n_hops, n_chan))
+        for ch, nmf in enumerate(factorizations):
+            channel_activation_matrix, channel_templates_matrix = nmf.activation_matrix, nmf.template_dictionary
 
             # Cluster the templates matrix into Mel frequencies and retrieve labels
             cluster_templates = librosa.feature.mfcc(S=channel_templates_matrix,
@@ -193,11 +213,8 @@ class NMF_MFCC(mask_separation_base.MaskSeparationBase):
             self.labeled_templates = self.clusterer.labels_
 
             # Extract sources from signal
-            uncollated_masks += self._extract_masks(channel_templates_matrix, channel_activation_matrix, ch)
-
-        # Reorder mask arrays so that the channels are collated correctly (this allows for multichannel signals)
-        collated_masks = [np.dstack([uncollated_masks[s + ch * self.num_sources] for ch in range(n_chan)])
-                          for s in range(self.num_sources)]
+            channel_masks = self._extract_masks(channel_templates_matrix, channel_activation_matrix, ch)
+            collated_masks[..., ch] = np.moveaxis(channel_masks, -1, 0)
 
         # Put each numpy array mask into a MaskBase object
         self.result_masks = []
@@ -213,43 +230,99 @@ class NMF_MFCC(mask_separation_base.MaskSeparationBase):
 
         return self.result_masks
 
+    def _factorize_channels(self):
+        """ Runs :ref:`num_restarts` NMFs on the magnitude spectrogram of every channel, spread across
+        :ref:`num_workers` threads, and keeps the one with the lowest reconstruction error for each channel.
+
+        The random initializations are all drawn here, before any thread starts, because
+        :class:`TransformerNMF` seeds the global numpy random generator. The threads only read the shared
+        spectrograms; numpy releases the GIL in the matrix products that make up most of the work. Without
+        threads, each NMF is made and run in turn, and only the best one of each channel so far is kept.
+
+        Returns:
+            factorizations (list): The :class:`TransformerNMF` object kept for each channel, after it has run.
+        """
+        num_channels = self.audio_signal.num_channels
+        num_workers = self.num_workers if self.num_workers is not None else multiprocessing.cpu_count()
+        num_workers = min(num_workers, num_channels * self.num_restarts)
+
+        best = []
+        if num_workers > 1:
+            factorizations = [self._make_factorization(ch, restart)
+                              for ch in range(num_channels) for restart in range(self.num_restarts)]
+
+            pool = multiprocessing.pool.ThreadPool(num_workers)
+            try:
+                pool.map(_run_transform, factorizations)
+            finally:
+                pool.close()
+                pool.join()
+
+            # keep the restart with the lowest final reconstruction error for each channel
+            for ch in range(num_channels):
+                restarts = factorizations[ch * self.num_restarts:(ch + 1) * self.num_restarts]
+                best.append(min(restarts, key=lambda nmf: nmf.reconstruction_error[-1]))
+        else:
+            for ch in range(num_channels):
+                best_nmf = None
+                for restart in range(self.num_restarts):
+                    nmf = self._make_factorization(ch, restart)
+                    nmf.transform()
+                    if best_nmf is None or nmf.reconstruction_error[-1] < best_nmf.reconstruction_error[-1]:
+                        best_nmf = nmf
+                best.append(best_nmf)
+
+        self.reconstruction_errors = [nmf.reconstruction_error[-1] for nmf in best]
+        return best
+
+    def _make_factorization(self, ch, restart):
+        """ Makes the :class:`TransformerNMF` object for restart :param:`restart` of channel :param:`ch`, with its
+        random initialization drawn from :ref:`random_seed` ``+`` :param:`restart`.
+        """
+        seed = self.random_seed + restart if self.random_seed is not None else None
+        return transformer_nmf.TransformerNMF(input_matrix=self.audio_signal.get_magnitude_spectrogram_channel(ch),
+                                              num_components=self.num_templates, seed=seed,
+                                              should_do_epsilon=False, max_num_iterations=self.num_iterations,
+                                              distance_measure=self.distance_measure)
+
     def _extract_masks(self, templates_matrix, activation_matrix, ch):
-        """ Creates binary masks from clustered templates and activation matrices
+        """ Creates masks from clustered templates and activation matrices. The spectrogram of each source is the
+        product of the templates and activations in its cluster only, and its mask is that spectrogram divided by
+        the larger of it and the magnitude of the mixture.
 
         Parameters:
             templates_matrix (np.ndarray): A 2D Numpy array containing the templates matrix after running NMF on
                                           the current channel
             activation_matrix (np.ndarray): A 2D Numpy array containing the activation matrix after running NMF on
                                           the current channel
+            ch (int): The channel of the mixture the matrices were computed from.
 
         Returns:
-            channel_mask_list (list): A list of :obj:`MaskBase`-derived objects corresponding to each source
+            channel_masks (np.ndarray): A 3D Numpy array with shape ``(num_freq, num_hops, num_sources)``, with
+             the mask of each source in the current channel
         """
 
         if self.audio_signal.stft_data is None:
             raise ValueError('Cannot extract masks with no signal_stft data')
 
-        channel_mask_list = []
-        for source_index in range(self.num_sources):
-            source_indices = np.where(self.labeled_templates == source_index)[0]
+        magnitude = np.abs(self.audio_signal.get_stft_channel(ch))
+        result_type = np.result_type(templates_matrix, activation_matrix)
 
-            # Make empty copies of the templates and actications
-            templates_mask = np.zeros_like(templates_matrix)
-            activation_mask = np.zeros_like(activation_matrix)
+        # stored source-major so that every source's mask is C-contiguous and np.dot can write straight into it
+        channel_masks = np.empty((self.num_sources,) + magnitude.shape, dtype=result_type)
+        denominator = np.empty(magnitude.shape, dtype=np.result_type(result_type, magnitude))
 
-            # Keep values for each source as determined by the clusterer
-            for idx in source_indices:
-                templates_mask[:, idx] = templates_matrix[:, idx]
-                activation_mask[idx, :] = activation_matrix[idx, :]
+        for source_index, source_mask in enumerate(channel_masks):
+            source_indices = np.flatnonzero(self.labeled_templates == source_index)
 
-            mask_matrix = templates_mask.dot(activation_mask)
-            music_stft_max = np.maximum(mask_matrix, np.abs(self.audio_signal.get_stft_channel(ch)))
-            mask_matrix = np.divide(mask_matrix, music_stft_max)
-            mask = np.nan_to_num(mask_matrix)
+            # only the templates and activations in this source's cluster
+            np.dot(templates_matrix[:, source_indices], activation_matrix[source_indices, :], out=source_mask)
 
-            channel_mask_list.append(mask)
+            # bins where both the source and the mixture are 0 stay 0
+            np.maximum(source_mask, magnitude, out=denominator)
+            np.divide(source_mask, denominator, out=source_mask, where=denominator > 0)
 
-        return channel_mask_list
+        return np.moveaxis(channel_masks, 0, -1)
 
     def make_audio_signals(self):
         """ Applies each mask in self.masks and returns a list of audio_signal objects for each source.
@@ -258,12 +331,16 @@ class NMF_MFCC(mask_separation_base.MaskSeparationBase):
             self.sources (np.array): An array of audio_signal objects containing each separated source
         """
         self.sources = []
-        for mask in self.result_masks:
-
-            source = copy.deepcopy(self.audio_signal)
-            source = source.apply_mask(mask)
+        # mask the stft for every source in one pass
+        for stft in masks.apply_masks(self.audio_signal.stft_data, self.result_masks):
+            source = self.audio_signal.make_copy_with_stft_data(stft, verbose=False)
             source.stft_params = self.stft_params
             source.istft(overwrite=True, truncate_to_length=self.audio_signal.signal_length)
             self.sources.append(source)
 
         return self.sources
+
+
+def _run_transform(nmf):
+    """ Runs :func:`TransformerNMF.transform` on :param:`nmf`, for :func:`NMF_MFCC._factorize_channels`'s pool. """
+    return nmf.transform()
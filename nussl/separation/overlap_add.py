@@ -24,6 +24,10 @@ class OverlapAdd(separation_base.SeparationBase):
     Notes:
         Currently supports ``Repet``, ``RepetSim``, and ``FT2D``.
 
+        If ``overlap_hop_size`` is a whole number of STFT hops, every window reuses the STFT of
+        the whole signal and only the hops at its edges are recalculated
+        (see :attr:`audio_signal.AudioSignal.cache_full_stft`).
+
     Parameters:
         input_audio_signal (:class:`audio_signal.AudioSignal`): The :class:`audio_signal.AudioSignal` object that the 
         OverlapAdd algorithm will be run on. This makes a copy of ``input_audio_signal``
@@ -226,6 +230,10 @@ class OverlapAdd(separation_base.SeparationBase):
 
         background_array = np.zeros_like(self.audio_signal.audio_data)
 
+        # Windows that start on a hop of the STFT can reuse the STFT of the whole signal
+        separation_signal = self._separation_instance.audio_signal
+        separation_signal.cache_full_stft = self.hop_samples % separation_signal.stft_params.hop_length == 0
+
         # Make the window for multiple channels
         window = stft_utils.make_window(self.overlap_window_type, 2 * self.overlap_samples)
         window = np.vstack([window for _ in range(self.audio_signal.num_channels)])
@@ -254,6 +262,8 @@ class OverlapAdd(separation_base.SeparationBase):
                 background_array[:, start:end] += np.multiply(unwindowed.audio_data, window)
 
         self.audio_signal.set_active_region_to_default()
+        separation_signal.cache_full_stft = False
+        separation_signal.audio_data_changed()
         self.background = self.audio_signal.make_copy_with_audio_data(background_array, verbose=False)
         return self.background
 
@@ -161,7 +161,8 @@ class Projet(separation_base.SeparationBase):
             source_stft = sigma_j / sigma * C
             source_stft = np.dot(source_stft, recompose_matrix.T)
             source_stft = np.reshape(source_stft, (num_freq_bins, num_time_bins, num_channels))
-            source = AudioSignal(stft=source_stft, sample_rate=self.audio_signal.sample_rate)
+            source = AudioSignal(stft=source_stft, sample_rate=self.audio_signal.sample_rate,
+                                 dtype=self.audio_signal.dtype)
             source.istft(self.stft_params.window_length, self.stft_params.hop_length, 
                         self.stft_params.window_type, overwrite=True, 
                         use_librosa=self.use_librosa_stft, 
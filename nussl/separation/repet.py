@@ -168,7 +168,7 @@ class Repet(mask_separation_base.MaskSeparationBase):
 
     def _compute_spectrograms(self):
         self.stft = self.audio_signal.stft(overwrite=True, remove_reflection=True, use_librosa=self.use_librosa_stft)
-        self.magnitude_spectrogram = np.abs(self.stft)
+        self.magnitude_spectrogram = self.audio_signal.magnitude_spectrogram_data
 
     def get_beat_spectrum(self, recompute_stft=False):
         """Calculates and returns the beat spectrum for the audio signal associated with this object
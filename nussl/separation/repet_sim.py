@@ -119,7 +119,7 @@ class RepetSim(mask_separation_base.MaskSeparationBase):
 
     def _compute_spectrograms(self):
         self.stft = self.audio_signal.stft(overwrite=True, remove_reflection=True, use_librosa=self.use_librosa_stft)
-        self.magnitude_spectrogram = np.abs(self.stft)
+        self.magnitude_spectrogram = self.audio_signal.magnitude_spectrogram_data
 
     def _get_similarity_indices(self):
         if self.magnitude_spectrogram is None:
@@ -82,13 +82,14 @@ class RPCA(mask_separation_base.MaskSeparationBase):
 
         background_stft = np.array(background_stft).transpose((1, 2, 0))
         self.background = AudioSignal(stft=background_stft,
-                                      sample_rate=self.audio_signal.sample_rate)
+                                      sample_rate=self.audio_signal.sample_rate,
+                                      dtype=self.audio_signal.dtype)
         self.background.istft(self.stft_params.window_length, self.stft_params.hop_length,
                               self.stft_params.window_type,
                               overwrite=True, use_librosa=self.use_librosa_stft,
                               truncate_to_length=self.audio_signal.signal_length)
 
-        background_mask = np.array(background_mask).transpose((1, 2, 0)).astype('float')
+        background_mask = np.array(background_mask).transpose((1, 2, 0)).astype(self.audio_signal.dtype)
         background_mask = masks.SoftMask(background_mask)
         if self.mask_type == self.BINARY_MASK:
             background_mask = background_mask.mask_to_binary(self.mask_threshold)
@@ -100,7 +101,7 @@ class RPCA(mask_separation_base.MaskSeparationBase):
     def _compute_spectrum(self):
         self.stft = self.audio_signal.stft(overwrite=True, remove_reflection=True,
                                            use_librosa=self.use_librosa_stft)
-        self.magnitude_spectrogram = np.abs(self.stft)
+        self.magnitude_spectrogram = self.audio_signal.magnitude_spectrogram_data
 
     def compute_rpca_mask(self, magnitude_spectrogram):
         low_rank, sparse_matrix = self.decompose(magnitude_spectrogram)
@@ -91,9 +91,14 @@ class SeparationBase(object):
         """
         raise NotImplementedError('Cannot call base class.')
 
-    def to_json(self):
+    def to_json(self, array_dir=None):
         """
         Outputs JSON from the data stored in this object.
+
+        Args:
+            array_dir (str): If given, numpy arrays are saved as ``.npy`` files in this directory and the JSON only
+                has references to them, see :func:`utils.array_directory`. Identical arrays are saved once, so this
+                keeps large separator state (STFTs, spectrograms, the :attr:`audio_signal`) out of the JSON.
         
         Returns:
             (str) a JSON string containing all of the information to restore this object exactly as it was when this
@@ -103,6 +108,10 @@ class SeparationBase(object):
             :func:`from_json` to restore a JSON frozen object.
 
         """
+        if array_dir is not None:
+            with utils.array_directory(array_dir):
+                return self.to_json()
+
         return json.dumps(self, default=SeparationBase._to_json_helper)
 
     def __str__(self):
@@ -136,13 +145,15 @@ class SeparationBase(object):
         return d
 
     @classmethod
-    def from_json(cls, json_string):
+    def from_json(cls, json_string, array_dir=None):
         """
         Creates a new :class:`SeparationBase` object from the parameters stored in this JSON string.
         
         Args:
             json_string (str): A JSON string containing all the data to create a new :class:`SeparationBase` 
                 object.
+            array_dir (str): Directory that the arrays were saved to if :func:`to_json` was called with
+                ``array_dir``. They are loaded lazily, as copy-on-write memory maps.
 
         Returns:
             (:class:`SeparationBase`) A new :class:`SeparationBase` object from the JSON string.
@@ -151,8 +162,79 @@ class SeparationBase(object):
             :func:`to_json` to make a JSON string to freeze this object.
 
         """
-        sep_decoder = SeparationBaseDecoder(cls)
-        return sep_decoder.decode(json_string)
+        if array_dir is not None:
+            with utils.array_directory(array_dir):
+                return cls.from_json(json_string)
+
+        return cls._json_decoder().decode(json_string)
+
+    @classmethod
+    def _json_decoder(cls):
+        """
+        Makes the JSON decoder :func:`from_json` uses for this class. Subclasses that need a different decoder
+        override this instead of :func:`from_json`.
+
+        Returns:
+            (:class:`SeparationBaseDecoder`) A decoder that makes objects of this class.
+
+        """
+        return SeparationBaseDecoder(cls)
+
+    def to_bytes(self):
+        """
+        Outputs the data stored in this object in nussl's binary format: the JSON from :func:`to_json` with every
+        numpy array (including the ones in :attr:`audio_signal`) stored as raw bytes instead of base64 text.
+
+        Returns:
+            (bytes) binary representation of this object.
+
+        See Also:
+            :func:`from_bytes` to restore it, :func:`utils.to_binary` for the format.
+
+        """
+        return utils.to_binary(self)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """
+        Creates a new :class:`SeparationBase` object from the output of :func:`to_bytes`.
+
+        Args:
+            data (bytes): binary representation of a :class:`SeparationBase` object.
+
+        Returns:
+            (:class:`SeparationBase`) A new :class:`SeparationBase` object. Its arrays are read-only views into
+            :param:`data`.
+
+        """
+        return utils.from_binary(data, cls.from_json)
+
+    def save(self, file_path):
+        """
+        Writes this object to :param:`file_path` in the binary format of :func:`to_bytes`, e.g. to checkpoint it
+        between stages of a pipeline. Use :func:`load` to read it back.
+
+        Args:
+            file_path (str): path of the file to write.
+
+        """
+        utils.write_binary(self, file_path)
+
+    @classmethod
+    def load(cls, file_path, memory_map=True):
+        """
+        Reads an object written by :func:`save`.
+
+        Args:
+            file_path (str): path of the file to read.
+            memory_map (bool): if ``True`` (default), arrays are copy-on-write memory maps of the file, so they are
+                only read from disk as they are used.
+
+        Returns:
+            (:class:`SeparationBase`) The object that was saved.
+
+        """
+        return utils.read_binary(file_path, cls.from_json, memory_map)
 
     def __call__(self):
         return self.run()
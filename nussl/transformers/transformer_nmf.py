@@ -3,7 +3,7 @@
 """
 Non-negative Matrix Factorization
 """
-import math
+import contextlib
 import numpy as np
 import warnings
 import matplotlib.pyplot as plt
@@ -37,6 +37,11 @@ class TransformerNMF(object):
         max_num_iterations (int): Maximum number of times that the update rules will be computed
         should_do_epsilon (bool):
         stopping_epsilon (float):
+        evaluation_interval (int): :attr:`distance` is computed (and added to :ref:`reconstruction_error`) every
+            this many iterations, and after the last one. Defaults to 1 (every iteration).
+        relative_tolerance (float): If set, :func:`transform` stops early when :attr:`distance` improves by less
+            than this fraction between evaluations, for :param:`patience` evaluations in a row. E.g. ``1e-4``.
+        patience (int): Number of evaluations in a row without enough improvement before stopping. Defaults to 1.
 
     Attributes:
 
@@ -54,7 +59,8 @@ class TransformerNMF(object):
     def __init__(self, input_matrix, num_components=50,
                  activation_matrix=None, template_dictionary=None, distance_measure=None,
                  should_update_activation=None, should_update_template=None,
-                 seed=None, max_num_iterations=50, should_do_epsilon=False, stopping_epsilon=1e10):
+                 seed=None, max_num_iterations=50, should_do_epsilon=False, stopping_epsilon=1e10,
+                 evaluation_interval=1, relative_tolerance=None, patience=1):
 
         # Check input_matrix
         self._check_input_matrix(input_matrix)
@@ -112,7 +118,33 @@ class TransformerNMF(object):
         self.stopping_epsilon = stopping_epsilon
         self.max_num_iterations = max_num_iterations
 
+        if evaluation_interval < 1:
+            raise ValueError('evaluation_interval must be at least 1!')
+        if patience < 1:
+            raise ValueError('patience must be at least 1!')
+        if relative_tolerance is not None and relative_tolerance < 0:
+            raise ValueError('relative_tolerance must be non-negative!')
+
+        self.evaluation_interval = evaluation_interval
+        self.relative_tolerance = relative_tolerance
+        self.patience = patience
+
         self.reconstruction_error = []
+        self.num_iterations_run = 0
+
+        # preallocated work arrays for the update rules, and the matrices that the W·H buffer was computed from. They
+        # are only kept while transform() or partial_transform() runs, see _update_loop()
+        self._buffers = {}
+        self._product_factors = None
+        self._in_update_loop = False
+
+        # statistics of the blocks seen by partial_transform(), to update the templates
+        self._online_statistics = None
+
+        # V H^T and H H^T from the last euclidean template update, and the H they were computed with, and |V|^2. Also
+        # only kept inside _update_loop()
+        self._euclidean_statistics = None
+        self._input_norm = None
 
     @staticmethod
     def _check_input_matrix(matrix):
@@ -166,6 +198,11 @@ class TransformerNMF(object):
         """
         This runs Non-negative matrix factorization with update rules as outlined in [1].
 
+        It runs :ref:`max_num_iterations` iterations, or until :attr:`distance` is at most :ref:`stopping_epsilon`
+        if :ref:`should_do_epsilon` is set. With :ref:`relative_tolerance` it also stops once :attr:`distance`
+        stops improving, see :class:`TransformerNMF`. :attr:`distance` is only computed every
+        :ref:`evaluation_interval` iterations; the number of iterations that ran is in :ref:`num_iterations_run`.
+
         Returns:
             * **activation_matrix** (*np.array*) - a 2D numpy matrix containing the estimated activation matrix
             * **templates** (*np.array*) - a 2D numpy matrix containing the estimated templates
@@ -191,26 +228,152 @@ class TransformerNMF(object):
                           'this function. Expect this to take a long time if you have not set '
                           'a suitable epsilon!')
 
-        should_stop = False
-        num_iterations = 0
-        while not should_stop:
+        # work arrays are allocated once per call, on the first iteration, and dropped when it returns
+        with self._update_loop():
+            num_iterations = 0
+            previous_distance = None
+            evaluations_without_improvement = 0
+            while True:
+
+                self.update()
+                num_iterations += 1
+                self.num_iterations_run = num_iterations
+
+                is_last_iteration = not self.should_do_epsilon and num_iterations >= self.max_num_iterations
+                if num_iterations % self.evaluation_interval != 0 and not is_last_iteration:
+                    continue
+
+                current_distance = self.distance
+                self.reconstruction_error.append(current_distance)
+
+                # Stopping conditions
+                if is_last_iteration or (self.should_do_epsilon and current_distance <= self.stopping_epsilon):
+                    break
+
+                if self.relative_tolerance is not None and previous_distance is not None:
+                    improvement = previous_distance - current_distance
+                    if improvement < self.relative_tolerance * previous_distance:
+                        evaluations_without_improvement += 1
+                    else:
+                        evaluations_without_improvement = 0
+
+                    if evaluations_without_improvement >= self.patience:
+                        break
+
+                previous_distance = current_distance
+
+        return self.activation_matrix, self.template_dictionary
+
+    def partial_transform(self, input_block, num_iterations=None, forget_factor=1.0):
+        """
+        One step of online NMF: factors a block of columns of a (possibly very long) matrix, like a few seconds of
+        a spectrogram, and refines :ref:`template_dictionary` with it.
+
+        The activations of the block are found with the templates fixed, then the templates are updated from
+        statistics accumulated over every block seen so far: ``sum(H H^T)`` and ``sum(V H^T)`` for euclidean
+        distance, and the numerator and denominator of the multiplicative update for KL divergence. Only the
+        current block and its activations are kept, so memory doesn't grow with the length of the input.
+        The statistics are kept by this object, so later calls keep refining the same templates. To warm-start
+        from templates learned before, pass them as ``template_dictionary`` when making this object.
+
+        After this call, :ref:`input_matrix` is the block and :ref:`activation_matrix` its activations, so
+        :attr:`distance` and :attr:`reconstructed_matrix` are for the block.
+
+        Args:
+            input_block (:obj:`np.array`): non-negative matrix with the same number of rows as the templates.
+            num_iterations (int): number of activation updates for the block. Defaults to
+                :ref:`max_num_iterations`.
+            forget_factor (float): the accumulated statistics are multiplied by this (between 0.0 and 1.0) before the
+                block is added, so older blocks count less. Defaults to 1.0 (don't forget).
+
+        Returns:
+            * **activation_matrix** (*np.array*) - the activations of the block
+            * **templates** (*np.array*) - the updated templates
+
+        Example:
+            ::
+            nmf = nussl.TransformerNMF(spectrogram[:, :500], num_components=20)
+            for start in range(0, spectrogram.shape[1], 500):
+                activations, templates = nmf.partial_transform(spectrogram[:, start:start + 500])
+        """
+        self._check_input_matrix(input_block)
+
+        if input_block.shape[0] != self.template_dictionary.shape[0]:
+            raise ValueError('input_block has {} rows but templates have {}!'
+                             .format(input_block.shape[0], self.template_dictionary.shape[0]))
+
+        if not 0.0 <= forget_factor <= 1.0:
+            raise ValueError('forget_factor must be between 0.0 and 1.0!')
+
+        num_iterations = self.max_num_iterations if num_iterations is None else num_iterations
 
-            self.update()
+        self.input_matrix = input_block
+        self.activation_matrix = np.random.rand(self.num_components, input_block.shape[1])
 
-            current_distance = self.distance
-            self.reconstruction_error.append(current_distance)
+        with self._update_loop():
+            for _ in range(num_iterations):
+                self.activation_matrix = self.activation_update_func()
 
-            # Stopping conditions
-            # TODO: Rethink stopping logic
-            num_iterations += 1
-            if self.should_do_epsilon:
-                should_stop = current_distance <= self.stopping_epsilon
+            if self.should_update_template:
+                self._accumulate_online_statistics(forget_factor)
+                numerator, denominator = self._online_statistics
 
-            else:
-                should_stop = num_iterations >= self.max_num_iterations
+                if self._do_euclidean:
+                    # W * sum(V H^T) / (W sum(H H^T))
+                    self.template_dictionary = self.template_dictionary * numerator / np.dot(self.template_dictionary,
+                                                                                             denominator)
+                else:
+                    # the KL update averaged over blocks: sum(W * (V / W·H) H^T) / sum(H)
+                    self.template_dictionary = numerator / denominator[np.newaxis, :]
+
+            self.reconstruction_error.append(self.distance)
 
         return self.activation_matrix, self.template_dictionary
 
+    def transform_online(self, input_blocks, num_iterations=None, forget_factor=1.0):
+        """
+        Runs :func:`partial_transform` on every block of ``input_blocks``, e.g. consecutive column blocks of a
+        spectrogram that is too long to factor at once.
+
+        Args:
+            input_blocks (iterable): non-negative matrices with the same number of rows as the templates. Can be a
+                generator, so blocks are only made when they are needed.
+            num_iterations (int): number of activation updates for each block. See :func:`partial_transform`.
+            forget_factor (float): See :func:`partial_transform`.
+
+        Returns:
+            A generator that yields the activation matrix of each block, after the templates have been updated with
+            it. The final templates are in :ref:`template_dictionary`.
+
+        Example:
+            ::
+            nmf = nussl.TransformerNMF(spectrogram[:, :500], num_components=20)
+            blocks = (spectrogram[:, start:start + 500] for start in range(0, spectrogram.shape[1], 500))
+            activations = np.hstack(list(nmf.transform_online(blocks)))
+        """
+        for input_block in input_blocks:
+            activation_block, _ = self.partial_transform(input_block, num_iterations, forget_factor)
+            yield activation_block
+
+    def _accumulate_online_statistics(self, forget_factor):
+        """
+        Adds the current block and its activations to the statistics used by :func:`partial_transform` to update
+        the templates.
+        """
+        if self._do_euclidean:
+            numerator = np.dot(self.input_matrix, self.activation_matrix.T)
+            denominator = np.dot(self.activation_matrix, self.activation_matrix.T)
+        else:
+            numerator = self.template_dictionary * np.dot(self._ratio(), self.activation_matrix.T)
+            denominator = np.sum(self.activation_matrix, axis=1)
+
+        if self._online_statistics is not None:
+            old_numerator, old_denominator = self._online_statistics
+            numerator += forget_factor * old_numerator
+            denominator += forget_factor * old_denominator
+
+        self._online_statistics = (numerator, denominator)
+
     def update(self):
         """
         Computes a single update using the update function specified.
@@ -224,93 +387,126 @@ class TransformerNMF(object):
         if self.should_update_template:
             self.template_dictionary = self.template_update_func()
 
+    @contextlib.contextmanager
+    def _update_loop(self):
+        """
+        Lets the update rules and :attr:`distance` keep work arrays and results between iterations while
+        :func:`transform` or :func:`partial_transform` runs. They are found by the identity of the matrices, which is
+        only safe while nothing but the update rules changes them, so everything kept is dropped when the loop ends.
+        Outside of it every call computes from the current matrices.
+        """
+        self._clear_work_arrays()
+        self._in_update_loop = True
+        try:
+            yield
+        finally:
+            self._in_update_loop = False
+            self._clear_work_arrays()
+
+    def _clear_work_arrays(self):
+        """
+        Drops everything that :func:`_update_loop` lets the update rules keep.
+        """
+        self._buffers = {}
+        self._product_factors = None
+        self._euclidean_statistics = None
+        self._input_norm = None
+
+    def _buffer(self, name, shape, dtype):
+        """
+        Returns the preallocated array called ``name``, allocating it if it doesn't exist yet or if its shape or dtype
+        changed. Buffers are only kept inside :func:`_update_loop`, outside of it a new array is returned every time.
+        """
+        if not self._in_update_loop:
+            return np.empty(shape, dtype=dtype)
+
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._buffers[name] = buffer
+        return buffer
+
+    def _product(self):
+        """
+        Computes ``W·H`` (:ref:`template_dictionary` dot :ref:`activation_matrix`) into a preallocated buffer. The
+        product is only computed once for each pair of matrices: the update rules return new matrices, so it is
+        recomputed after every update and reused otherwise (e.g. by :attr:`distance` and the next KL update). Outside
+        of :func:`_update_loop` it is always computed into a new array.
+        :return: ``W·H``, only valid until the next update
+        """
+        template, activation = self.template_dictionary, self.activation_matrix
+        if not self._in_update_loop:
+            return np.dot(template, activation)
+
+        if self._product_factors is None or self._product_factors[0] is not template \
+                or self._product_factors[1] is not activation:
+            product = self._buffer('product', (template.shape[0], activation.shape[1]),
+                                   np.result_type(template, activation))
+            np.dot(template, activation, out=product)
+            self._product_factors = (template, activation)
+
+        return self._buffers['product']
+
+    def _ratio(self, product=None):
+        """
+        Computes ``V / (W·H)`` into a preallocated buffer, for the KL divergence update rules. ``W·H`` is computed
+        with :func:`_product` unless it is given as ``product``.
+        """
+        product = self._product() if product is None else product
+        ratio = self._buffer('ratio', product.shape, np.result_type(self.input_matrix, product, 1.0))
+        return np.divide(self.input_matrix, product, out=ratio)
+
     def _update_activation_euclidean(self):
         """
         Computes a new activation matrix using the Lee and Seung multiplicative update algorithm
         :return: An updated activation matrix based on euclidean distance
         """
-
-        # make a new matrix to store results
-        activation_copy = np.empty_like(self.activation_matrix)
-
-        # store in memory so we don't have to do n*m calculations.
         template_transpose = self.template_dictionary.T
-        temp_transpose_matrix = np.dot(template_transpose, self.input_matrix)
-        temp_transpose_act = np.dot(np.dot(template_transpose, self.template_dictionary), self.activation_matrix)
 
-        # Eq. 4, H update from [1]
-        for indices, val in np.ndenumerate(self.activation_matrix):
-            result = temp_transpose_matrix[indices]
-            result /= temp_transpose_act[indices]
-            result *= self.activation_matrix[indices]
-            activation_copy[indices] = result
+        # Eq. 4, H update from [1]: H * (W^T V) / (W^T W H)
+        numerator = np.dot(template_transpose, self.input_matrix)
+        denominator = np.dot(np.dot(template_transpose, self.template_dictionary), self.activation_matrix)
 
-        return activation_copy
+        numerator /= denominator
+        return numerator * self.activation_matrix
 
     def _update_template_euclidean(self):
         """
         Computes a new template matrix using the Lee and Seung multiplicative update algorithm
         :return: An updated template matrix based on euclidean distance
         """
-
-        # Make a new matrix to store results
-        template_copy = np.empty_like(self.template_dictionary)
-
-        # Cache some variables
         activation_transpose = self.activation_matrix.T
-        input_matrix_activation_transpose = np.dot(self.input_matrix, activation_transpose)
-        temp_act = np.dot(np.dot(self.template_dictionary, self.activation_matrix), activation_transpose)
 
-        # Eq. 4, W update from [1]
-        for indices, val in np.ndenumerate(self.template_dictionary):
-            result = input_matrix_activation_transpose[indices]
-            result /= temp_act[indices]
-            result *= self.template_dictionary[indices]
-            template_copy[indices] = result
+        # Eq. 4, W update from [1]: W * (V H^T) / (W H H^T), with H H^T computed first so W·H isn't needed
+        input_activation = np.dot(self.input_matrix, activation_transpose)
+        activation_gram = np.dot(self.activation_matrix, activation_transpose)
+        denominator = np.dot(self.template_dictionary, activation_gram)
 
-        return template_copy
+        # kept so _euclidean_distance() doesn't need W·H
+        if self._in_update_loop:
+            self._euclidean_statistics = (self.activation_matrix, input_activation, activation_gram)
+
+        return input_activation / denominator * self.template_dictionary
 
     def _update_activation_kl_divergence(self):
         """
         Computes a new activation matrix using the Lee and Seung multiplicative update algorithm
         :return: An updated activation matrix based on KL divergence
         """
-        # make a new matrix to store results
-        activation_copy = np.empty_like(self.activation_matrix)
-
-        dot = np.dot(self.template_dictionary, self.activation_matrix)
-
-        # Eq. 5, H update from [1]
-        for indices, val in np.ndenumerate(self.activation_matrix):
-            (a, mu) = indices
-            result = sum((self.template_dictionary[i][a] * self.input_matrix[i][mu]) / dot[i][mu]
-                         for i in range(self.template_dictionary.shape[0]))
-            result /= sum(self.template_dictionary[k][a] for k in range(self.template_dictionary.shape[0]))
-            result *= self.activation_matrix[indices]
-            activation_copy[indices] = result
-
-        return activation_copy
+        # Eq. 5, H update from [1]: H * (W^T (V / W·H)) / (sum of W over frequencies)
+        numerator = np.dot(self.template_dictionary.T, self._ratio())
+        numerator /= np.sum(self.template_dictionary, axis=0)[:, np.newaxis]
+        return numerator * self.activation_matrix
 
     def _update_template_kl_divergence(self):
         """
         Computes a new template matrix using the Lee and Seung multiplicative update algorithm
         :return: An updated template matrix based on KL divergence
         """
-        # make a new matrix to store results
-        template_copy = np.empty_like(self.template_dictionary)
-
-        dot = np.dot(self.template_dictionary, self.activation_matrix)
-
-        # Eq. 5, W update from [1]
-        for indices, val in np.ndenumerate(self.template_dictionary):
-            (i, a) = indices
-            result = sum((self.activation_matrix[a][mu] * self.input_matrix[i][mu]) / dot[i][mu]
-                         for mu in range(self.activation_matrix.shape[1]))
-            result /= sum(self.activation_matrix[a][nu] for nu in range(self.activation_matrix.shape[1]))
-            result *= self.template_dictionary[indices]
-            template_copy[indices] = result
-
-        return template_copy
+        # Eq. 5, W update from [1]: W * ((V / W·H) H^T) / (sum of H over time)
+        numerator = np.dot(self._ratio(), self.activation_matrix.T)
+        numerator /= np.sum(self.activation_matrix, axis=1)[np.newaxis, :]
+        return numerator * self.template_dictionary
 
     def _euclidean_distance(self):
         """
@@ -319,19 +515,57 @@ class TransformerNMF(object):
         using Euclidean distance
         :return: Euclidean distance
         """
-        return sum((self.input_matrix[index] - val) ** 2 for index, val in np.ndenumerate(self.reconstructed_matrix))
+        if self._in_update_loop and self._euclidean_statistics is not None \
+                and self._euclidean_statistics[0] is self.activation_matrix:
+            # right after a template update: |V - W H|^2 = |V|^2 - 2 <W, V H^T> + <W^T W, H H^T>, from matrices
+            # that are only as big as W, so W·H is never formed
+            _, input_activation, activation_gram = self._euclidean_statistics
+            template = self.template_dictionary
+            input_norm = self._squared_input_norm()
+            distance = input_norm - 2 * np.sum(template * input_activation) \
+                + np.sum(np.dot(template.T, template) * activation_gram)
+
+            # the terms cancel for very good fits, then the rounding error is too big and W·H is used instead
+            if distance > 1e-6 * input_norm:
+                return distance
+
+        product = self._product()
+        difference = self._buffer('difference', product.shape, np.result_type(self.input_matrix, product))
+        np.subtract(self.input_matrix, product, out=difference)
+        difference = difference.ravel()
+        return np.dot(difference, difference)
+
+    def _squared_input_norm(self):
+        """
+        ``|V|^2``, computed once for each :ref:`input_matrix` inside :func:`_update_loop`, and every time outside of it.
+        """
+        if self._input_norm is not None and self._input_norm[0] is self.input_matrix:
+            return self._input_norm[1]
+
+        # accumulated in float64 even for a float32 input: the distance is a small difference of this and other large
+        # terms, so float32 rounding here would swamp it
+        flat_input = self.input_matrix.ravel()
+        input_norm = float(np.einsum('i,i->', flat_input, flat_input, dtype=np.float64))
+        if self._in_update_loop:
+            self._input_norm = (self.input_matrix, input_norm)
+        return input_norm
 
     def _kl_divergence(self):
         """
         Calculates the KL divergence between the original matrix (:ref:`input_matrix`) and the
         dot product of the current template (:ref:`templates`) and activation (:ref:`activation_matrix`) matrices.
+        Elements where :ref:`input_matrix` is 0 add ``-W·H`` (``0 * log(0)`` is taken as 0).
 
         :return:
 
         """
-        return sum(
-            (self.input_matrix[index] * math.log(self.input_matrix[index] / val, 10) + self.input_matrix[index] - val)
-            for index, val in np.ndenumerate(self.reconstructed_matrix))
+        product = self._product()
+        divergence = self._ratio(product)
+
+        # V * log10(V / W·H), where ratios of 0 stay 0
+        np.log10(divergence, out=divergence, where=divergence > 0)
+        divergence *= self.input_matrix
+        return np.sum(divergence) + np.sum(self.input_matrix) - np.sum(product)
 
     MAX_TEMPLATES_FOR_LINES = 30
 
@@ -4,6 +4,7 @@ import unittest
 import nussl
 import numpy as np
 import os
+import shutil
 
 
 class TestJson(unittest.TestCase):
@@ -69,3 +70,67 @@ class TestJson(unittest.TestCase):
         f = nussl.NMF_MFCC.from_json(j)
         worked = n == f
         return worked
+
+    def test_binary(self):
+        a = nussl.AudioSignal(audio_data_array=np.random.rand(2, 44100 * 10) * 2 - 1)
+        a.stft()
+
+        b = nussl.AudioSignal.from_bytes(a.to_bytes())
+        assert a == b
+        assert len(a.to_bytes()) < len(a.to_json())
+
+        r = nussl.Repet(a)
+        r()
+        f = nussl.Repet.from_bytes(r.to_bytes())
+        assert r == f
+
+        m = nussl.separation.masks.SoftMask(np.random.rand(*a.stft_data.shape))
+        assert m == nussl.separation.masks.SoftMask.from_bytes(m.to_bytes())
+
+        # quantized and packed masks stay compressed in the binary format
+        q = nussl.separation.masks.SoftMask(m.mask.copy(), quantize='uint8')
+        q_loaded = nussl.separation.masks.SoftMask.from_bytes(q.to_bytes())
+        assert q_loaded.is_quantized
+        assert q == q_loaded
+        assert len(q.to_bytes()) < len(m.to_bytes()) // 4
+
+        b = nussl.separation.masks.BinaryMask(m.mask > 0.5, packed=True)
+        b_loaded = nussl.separation.masks.BinaryMask.from_bytes(b.to_bytes())
+        assert b_loaded.is_packed
+        assert b == b_loaded
+
+    def test_binary_file(self):
+        a = nussl.AudioSignal(audio_data_array=np.random.rand(2, 44100) * 2 - 1)
+        a.stft()
+        path = 'audio_signal.nussl'
+
+        try:
+            a.save(path)
+            for memory_map in [True, False]:
+                b = nussl.AudioSignal.load(path, memory_map=memory_map)
+                assert a == b
+
+                b.audio_data[0, 0] = 2.0  # arrays are writable, the file doesn't change
+                assert a == nussl.AudioSignal.load(path, memory_map=memory_map)
+        finally:
+            os.remove(path)
+
+    def test_array_dir(self):
+        a = nussl.AudioSignal(audio_data_array=np.random.rand(2, 44100 * 10) * 2 - 1)
+        r = nussl.Repet(a)
+        r()
+        array_dir = 'repet_arrays'
+
+        try:
+            j = r.to_json(array_dir=array_dir)
+            assert len(j) < len(r.to_json())
+
+            # saving again doesn't add any files, identical arrays are only saved once
+            n_files = len(os.listdir(array_dir))
+            r.to_json(array_dir=array_dir)
+            assert len(os.listdir(array_dir)) == n_files
+
+            f = nussl.Repet.from_json(j, array_dir=array_dir)
+            assert r == f
+        finally:
+            shutil.rmtree(array_dir)
@@ -55,3 +55,7 @@ class PrecisionRecallFScoreUnitTest(unittest.TestCase):
             assert prf_scores['Source 0']['Recall'] == recall
             assert prf_scores['Source 0']['F1-Score'] == f1_score
             assert prf_scores['Source 0']['Accuracy'] == accuracy
+
+            # bit-packed masks give the same scores
+            prf = nussl.PrecisionRecallFScore([mask1.pack()], [mask2.pack()])
+            assert prf.evaluate()['Source 0'] == prf_scores['Source 0']
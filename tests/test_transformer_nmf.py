@@ -48,6 +48,171 @@ class TransformerNMFUnitTests(unittest.TestCase):
             distance_type = nussl.transformers.TransformerNMF.KL_DIVERGENCE
             self.calculate_nmf_error(matrix, self.n_bases, distance_type, self.n_iters, self.n_attempts, n)
 
+    def test_update_rules(self):
+        matrix = np.random.rand(30, 40)
+        matrix[matrix < 0.1] = 0
+        template = np.random.rand(30, 3)
+        activation = np.random.rand(3, 40)
+        template_copy, activation_copy = template.copy(), activation.copy()
+
+        euclidean = nussl.transformers.TransformerNMF.EUCLIDEAN
+        kl_divergence = nussl.transformers.TransformerNMF.KL_DIVERGENCE
+        for dist_type in [euclidean, kl_divergence]:
+            nmf = nussl.TransformerNMF(matrix, 3, template_dictionary=template,
+                                       activation_matrix=activation, distance_measure=dist_type)
+            nmf.update()
+
+            # Lee and Seung updates, H first and then W with the new H
+            w, h = template, activation
+            if dist_type == euclidean:
+                h = h * np.dot(w.T, matrix) / np.dot(np.dot(w.T, w), h)
+                w = w * np.dot(matrix, h.T) / np.dot(np.dot(w, h), h.T)
+            else:
+                h = h * np.dot(w.T, matrix / np.dot(w, h)) / w.sum(axis=0)[:, np.newaxis]
+                w = w * np.dot(matrix / np.dot(w, h), h.T) / h.sum(axis=1)[np.newaxis, :]
+
+            assert np.allclose(nmf.activation_matrix, h)
+            assert np.allclose(nmf.template_dictionary, w)
+
+            reconstruction = np.dot(w, h)
+            if dist_type == euclidean:
+                distance = np.sum((matrix - reconstruction) ** 2)
+            else:
+                nonzero = matrix > 0
+                distance = np.sum(matrix[nonzero] * np.log10(matrix[nonzero] / reconstruction[nonzero]))
+                distance += np.sum(matrix - reconstruction)
+            assert np.isclose(nmf.distance, distance)
+
+            # zeros in the input matrix don't make the divergence nan
+            nmf.transform()
+            assert np.all(np.isfinite(nmf.reconstruction_error))
+
+            # the work arrays aren't kept once transform() is done
+            assert not nmf._buffers
+            assert np.allclose(nmf.reconstructed_matrix, np.dot(nmf.template_dictionary, nmf.activation_matrix))
+
+        # the initial matrices that were passed in are not changed
+        assert np.array_equal(template, template_copy)
+        assert np.array_equal(activation, activation_copy)
+
+    def test_early_stopping(self):
+        matrix = np.random.rand(60, 80)
+
+        for dist_type in nussl.transformers.TransformerNMF.ALL_DISTANCE_TYPES:
+            # the distance is only computed every evaluation_interval iterations, and after the last one
+            nmf = nussl.TransformerNMF(matrix, 5, distance_measure=dist_type, seed=0, max_num_iterations=23,
+                                       evaluation_interval=5)
+            nmf.transform()
+            assert nmf.num_iterations_run == 23
+            assert len(nmf.reconstruction_error) == 5
+
+            reconstruction = nmf.reconstructed_matrix
+            if dist_type == nussl.transformers.TransformerNMF.EUCLIDEAN:
+                assert np.isclose(nmf.reconstruction_error[-1], np.sum((matrix - reconstruction) ** 2))
+
+            # stops when the distance stops improving
+            nmf = nussl.TransformerNMF(matrix, 5, distance_measure=dist_type, seed=0, max_num_iterations=1000,
+                                       relative_tolerance=1e-3, patience=2)
+            nmf.transform()
+            assert nmf.num_iterations_run < 1000
+            errors = nmf.reconstruction_error
+            assert errors[-3] - errors[-1] < 2e-3 * errors[-3]
+
+        with self.assertRaises(ValueError):
+            nussl.TransformerNMF(matrix, 5, evaluation_interval=0)
+
+    @staticmethod
+    def expected_distance(nmf):
+        reconstruction = np.dot(nmf.template_dictionary, nmf.activation_matrix)
+        if nmf.distance_measure == nussl.transformers.TransformerNMF.EUCLIDEAN:
+            return np.sum((nmf.input_matrix - reconstruction) ** 2)
+
+        nonzero = nmf.input_matrix > 0
+        distance = np.sum(nmf.input_matrix[nonzero] * np.log10(nmf.input_matrix[nonzero] / reconstruction[nonzero]))
+        return distance + np.sum(nmf.input_matrix - reconstruction)
+
+    def test_distance_after_transform(self):
+        matrix = np.random.rand(40, 60)
+
+        for dist_type in nussl.transformers.TransformerNMF.ALL_DISTANCE_TYPES:
+            nmf = nussl.TransformerNMF(matrix, 4, distance_measure=dist_type, seed=0, max_num_iterations=10)
+            nmf.transform()
+            assert np.isclose(nmf.distance, self.expected_distance(nmf))
+
+            # the matrices can be changed in place after transform(), nothing computed from them is kept
+            nmf.template_dictionary *= 2
+            assert np.isclose(nmf.distance, self.expected_distance(nmf))
+            assert not nmf._buffers and nmf._product_factors is None
+
+            nmf.partial_transform(matrix[:, :20], num_iterations=5)
+            assert not nmf._buffers and nmf._product_factors is None
+            nmf.activation_matrix[:] = 0.5
+            assert np.isclose(nmf.distance, self.expected_distance(nmf))
+
+        # edits of W, H and V after a euclidean transform(), that ends with a template update
+        euclidean = nussl.transformers.TransformerNMF.EUCLIDEAN
+        nmf = nussl.TransformerNMF(matrix.copy(), 4, distance_measure=euclidean, seed=0, max_num_iterations=10,
+                                   should_update_activation=False)
+        nmf.transform()
+        assert nmf._euclidean_statistics is None and nmf._input_norm is None
+
+        nmf.input_matrix = np.random.rand(40, 60) * 3
+        assert np.isclose(nmf.distance, self.expected_distance(nmf))
+        nmf.input_matrix *= 2
+        assert np.isclose(nmf.distance, self.expected_distance(nmf))
+        nmf.template_dictionary[:] = 1
+        assert np.isclose(nmf.distance, self.expected_distance(nmf))
+        nmf.activation_matrix[:] = 0
+        assert np.isclose(nmf.distance, self.expected_distance(nmf))
+
+    def test_float32_input(self):
+        matrix = np.random.rand(500, 2000).astype('float32') * 1000
+
+        nmf = nussl.TransformerNMF(matrix, 5, seed=0, max_num_iterations=5)
+        nmf.transform()
+        expected = np.sum(matrix.astype('float64') ** 2)
+        assert abs(nmf._squared_input_norm() - expected) < 1e-12 * expected
+
+    def test_online(self):
+        templates = np.random.rand(50, 3)
+        matrix = np.dot(templates, np.random.rand(3, 2000))
+        block_size = 200
+
+        for dist_type in nussl.transformers.TransformerNMF.ALL_DISTANCE_TYPES:
+            # one block is the same as one batch update
+            template = np.random.rand(50, 3)
+            np.random.seed(0)
+            activation = np.random.rand(3, block_size)
+            nmf = nussl.TransformerNMF(matrix[:, :block_size], 3, template_dictionary=template,
+                                       activation_matrix=activation, distance_measure=dist_type)
+            nmf.update()
+
+            online_nmf = nussl.TransformerNMF(matrix[:, :block_size], 3, template_dictionary=template,
+                                              distance_measure=dist_type)
+            np.random.seed(0)
+            activation_block, template_block = online_nmf.partial_transform(matrix[:, :block_size], 1)
+            assert np.allclose(activation_block, nmf.activation_matrix)
+            assert np.allclose(template_block, nmf.template_dictionary)
+
+            # streaming blocks through a few times learns the templates
+            online_nmf = nussl.TransformerNMF(matrix[:, :block_size], 3, distance_measure=dist_type, seed=0)
+            for _ in range(3):
+                blocks = (matrix[:, i:i + block_size] for i in range(0, matrix.shape[1], block_size))
+                activations = list(online_nmf.transform_online(blocks, num_iterations=30))
+
+            assert all(a.shape == (3, block_size) for a in activations)
+            reconstruction = np.dot(online_nmf.template_dictionary, np.hstack(activations))
+            assert np.linalg.norm(matrix - reconstruction) / np.linalg.norm(matrix) < 0.2
+
+            # warm start from the learned templates
+            warm_nmf = nussl.TransformerNMF(matrix[:, :block_size], 3, distance_measure=dist_type,
+                                            template_dictionary=online_nmf.template_dictionary)
+            warm_nmf.partial_transform(matrix[:, :block_size], forget_factor=0.5)
+            assert warm_nmf.reconstruction_error[-1] <= online_nmf.reconstruction_error[0]
+
+            with self.assertRaises(ValueError):
+                online_nmf.partial_transform(matrix[:10])
+
     def calculate_nmf_error(self, mixture, n_bases, dist_type, iterations, attempts, seed):
         div = nussl.transformers.TransformerNMF.KL_DIVERGENCE
         nimfa_type = 'divergence' if dist_type == div else dist_type
@@ -142,6 +142,72 @@ class AudioSignalUnitTests(unittest.TestCase):
         a = nussl.AudioSignal()
         a.load_audio_from_file(path, offset=offset, duration=duration)
 
+    def test_load_wav_memmap(self):
+        """
+        WAV files are memory mapped instead of decoded. audio_data should be the same as decoding
+        the file, offset and duration should slice the file, and samples should only be converted
+        for the active region.
+        """
+        ref_sr, ref_data = wav.read(self.audio_input1)
+        ref_data = (ref_data.T / 32768.0).reshape((-1, ref_data.shape[0]))
+
+        a = nussl.AudioSignal(self.audio_input1)
+        assert isinstance(a._audio_data, np.memmap)
+        assert a.audio_data.dtype == np.float64
+        assert np.allclose(a.audio_data, ref_data)
+
+        offset, duration = 0.5, 1.0
+        start, length = int(offset * ref_sr), int(duration * ref_sr)
+        b = nussl.AudioSignal(self.audio_input1, offset=offset, duration=duration)
+        assert b.signal_length == length
+        assert np.allclose(b.audio_data, ref_data[:, start:start + length])
+
+        # the active region is converted once, a channel is converted on its own until then
+        c = nussl.AudioSignal(self.audio_input1)
+        assert np.array_equal(c.get_channel(0), ref_data[0])
+        assert c._converted_audio_cache is None
+        assert c.audio_data is c.audio_data
+        assert not c.audio_data.flags.writeable
+
+        a.set_active_region(start, start + length)
+        assert np.array_equal(a.audio_data, b.audio_data)
+        assert np.array_equal(a.get_channel(0), b.get_channel(0))
+
+        # setting audio_data replaces the memory mapped samples
+        a.audio_data = np.zeros((1, 100))
+        assert not isinstance(a._audio_data, np.memmap)
+        assert np.array_equal(a.audio_data, np.zeros((1, 100)))
+
+    def test_write_over_memmap(self):
+        """
+        A memory mapped signal can be written back to the file it is mapped from, and its
+        audio_data doesn't change. audio_data is read-only until it is set.
+        """
+        for dtype, kwargs in [('float32', {'use_float': True}), ('float64', {})]:
+            audio_data = (np.random.rand(self.length, 2) * 2.0 - 1.0)
+            if dtype == 'float32':
+                wav.write(self.audio_output, self.sr, audio_data.astype(np.float32))
+            else:
+                wav.write(self.audio_output, self.sr, (audio_data * 32767).astype(np.int16))
+
+            a = nussl.AudioSignal(self.audio_output, dtype=dtype)
+            assert isinstance(a._audio_data, np.memmap)
+            before = np.array(a.audio_data)
+
+            with self.assertRaises(ValueError):
+                a.audio_data[0, 0] = 0.5
+
+            a.write_audio_to_file(self.audio_output, **kwargs)
+            assert np.array_equal(a.audio_data, before)
+
+            b = nussl.AudioSignal(self.audio_output, dtype=dtype)
+            assert np.allclose(b.audio_data, before, atol=1e-6)
+
+            # setting audio_data loads it into memory, where it can be changed
+            a.audio_data = np.array(a.audio_data)
+            a.audio_data[0, 0] = 0.5
+            assert a.audio_data[0, 0] == 0.5
+
     def test_write_to_file_path1(self):
         a = nussl.AudioSignal(self.audio_input1)
         a.write_audio_to_file(self.audio_output)
@@ -186,6 +252,56 @@ class AudioSignalUnitTests(unittest.TestCase):
 
         assert (b.sample_rate == sample_rate)
 
+    def test_write_formats(self):
+        # audio_data is not normalized in place, and every output format reads back the same
+        audio_data = np.random.rand(2, self.length) * 2.0 - 1.0
+        audio_data[0, 0] = 1.5
+        a = nussl.AudioSignal(audio_data_array=audio_data)
+
+        for kwargs, atol in [({}, 1e-4), ({'bit_depth': 24}, 1e-6), ({'bit_depth': 32}, 1e-6),
+                             ({'use_float': True}, 1e-6)]:
+            a.write_audio_to_file(self.audio_output, **kwargs)
+            assert np.array_equal(a.audio_data, audio_data)
+
+            b = nussl.AudioSignal(self.audio_output)
+            assert b.sample_rate == a.sample_rate
+
+            read_back = b.audio_data
+            if kwargs.get('bit_depth') == 24:
+                # 24-bit files are decoded by librosa, which may only keep 16 bits, so check the
+                # samples after the 44 byte header directly
+                with open(self.audio_output, 'rb') as f:
+                    packed = np.frombuffer(f.read()[44:], dtype=np.uint8).reshape(-1, 3)
+                ints = packed[:, 0].astype(np.int32) | (packed[:, 1].astype(np.int32) << 8) | \
+                    (packed[:, 2].astype(np.int8).astype(np.int32) << 16)
+                read_back = ints.reshape(-1, 2).T / 2.0 ** 23
+
+            assert np.allclose(read_back, audio_data / 1.5, atol=atol)
+
+        # without normalizing, integer output is clipped
+        a.write_audio_to_file(self.audio_output, normalize=False)
+        sr, data = wav.read(self.audio_output)
+        assert data[0, 0] == np.iinfo(np.int16).max
+        assert np.allclose(data[1:].T / 32768.0, audio_data[:, 1:], atol=1e-4)
+
+        self.assertRaises(nussl.core.audio_signal.AudioSignalException, a.write_audio_to_file,
+                          self.audio_output, bit_depth=12)
+
+    def test_write_audio_files(self):
+        signals = [nussl.AudioSignal(audio_data_array=np.random.rand(2, self.length) * 2.0 - 1.0)
+                   for _ in range(5)]
+        paths = ['k0140_output_{}.wav'.format(i) for i in range(len(signals))]
+
+        try:
+            nussl.AudioSignal.write_audio_files(signals, paths, num_threads=3, use_float=True)
+            for signal, path in zip(signals, paths):
+                sr, data = wav.read(path)
+                assert np.allclose(data.T, signal.audio_data, atol=1e-6)
+        finally:
+            for path in paths:
+                if os.path.exists(path):
+                    os.remove(path)
+
     freq = 30
     sine_wave = np.sin(np.linspace(0, freq * 2 * np.pi, length))
 
@@ -196,6 +312,30 @@ class AudioSignalUnitTests(unittest.TestCase):
         b.resample(a.sample_rate / 2)
         assert (b.sample_rate == a.sample_rate/2)
 
+    def test_resample_backends(self):
+        # Every backend resamples all channels to the same length, and an in-band tone survives
+        sr, new_sr = 48000, 44100
+        t = np.arange(sr) / float(sr)
+        audio_data = np.vstack([np.sin(2 * np.pi * 440 * t), np.sin(2 * np.pi * 1000 * t)])
+        new_t = np.arange(new_sr) / float(new_sr)
+        expected = np.vstack([np.sin(2 * np.pi * 440 * new_t), np.sin(2 * np.pi * 1000 * new_t)])
+
+        for backend in nussl.ALL_RESAMPLE_BACKENDS:
+            a = nussl.AudioSignal(audio_data_array=audio_data, sample_rate=sr)
+            a.resample(new_sr, backend=backend, quality=nussl.RESAMPLE_QUALITY_MEDIUM)
+            assert a.sample_rate == new_sr
+            assert a.audio_data.shape == (2, new_sr)
+            assert np.allclose(a.audio_data[:, 1000:-1000], expected[:, 1000:-1000], atol=1e-2)
+
+        nussl.resample_utils.clear_resample_cache()
+        first = nussl.resample_utils.resample_filter(sr, new_sr)
+        assert first is nussl.resample_utils.resample_filter(2 * sr, 2 * new_sr)
+        assert nussl.resample_utils.resample_cache_info().hits == 1
+
+        a = nussl.AudioSignal(audio_data_array=audio_data, sample_rate=sr)
+        self.assertRaises(nussl.core.audio_signal.AudioSignalException, a.resample, new_sr,
+                          backend='bogus')
+
     def test_resample_on_load_from_file(self):
         # Test resample right when loading from file vs resampling after loading
         a = nussl.AudioSignal(self.audio_input1)
@@ -211,7 +351,8 @@ class AudioSignalUnitTests(unittest.TestCase):
         a.resample(48000)
         b_audio_data, b_sample_rate = librosa.load(self.audio_input1, sr=48000)
         assert (a.sample_rate == b_sample_rate)
-        assert (np.allclose(a.audio_data, b_audio_data))
+        # the WAV is memory mapped and resampled as float64, librosa.load resamples float32 samples
+        assert (np.allclose(a.audio_data, b_audio_data, atol=1e-6))
 
     def test_default_sr_on_load_from_array(self):
         # Check that the default sample rate is set when no sample rate is provided load_audio_from_array
@@ -369,6 +510,168 @@ class AudioSignalUnitTests(unittest.TestCase):
         signal.stft(use_librosa=True)
         signal.istft(use_librosa=True)
 
+    def test_stft_multichannel(self):
+        """
+        The STFT of every channel is done in one call. Make sure each channel of stft_data is the
+        same as the STFT of that channel on its own, and that istft gets every channel back.
+        """
+        n_channels = 6
+        audio_data = np.random.rand(n_channels, self.length) * 2 - 1
+        signal = nussl.AudioSignal(audio_data_array=audio_data)
+
+        stft = signal.stft()
+        self.assertEqual(stft.shape[nussl.STFT_CHAN_INDEX], n_channels)
+
+        for ch in range(n_channels):
+            mono = nussl.AudioSignal(audio_data_array=audio_data[ch])
+            self.assertTrue(np.array_equal(signal.get_stft_channel(ch),
+                                           mono.stft()[:, :, 0]))
+
+        calculated = signal.istft(overwrite=False)
+        self.assertEqual(calculated.shape, audio_data.shape)
+        self.assertTrue(np.allclose(calculated, audio_data))
+
+    def test_stft_istft_float32(self):
+        """
+        A single precision AudioSignal keeps audio_data as float32 and stft_data as complex64
+        through stft(), apply_mask() and istft(), and round trips to within 1e-5.
+        """
+        audio_data = np.random.rand(2, self.length) * 2 - 1
+        signal = nussl.AudioSignal(audio_data_array=audio_data, dtype=nussl.FLOAT32)
+        self.assertEqual(signal.audio_data.dtype, np.float32)
+
+        signal.stft()
+        self.assertEqual(signal.stft_data.dtype, np.complex64)
+
+        masked = signal.apply_mask(nussl.separation.masks.SoftMask(np.ones(signal.stft_data.shape)))
+        self.assertEqual(masked.stft_data.dtype, np.complex64)
+
+        calculated = masked.istft(truncate_to_length=self.length)
+        self.assertEqual(calculated.dtype, np.float32)
+        self.assertTrue(np.allclose(calculated, audio_data, atol=1e-5))
+
+        double = nussl.AudioSignal(audio_data_array=audio_data)
+        self.assertEqual(double.dtype, nussl.FLOAT64)
+        self.assertTrue(np.allclose(double.stft(), signal.stft_data, atol=1e-3))
+
+        self.assertRaises(nussl.core.audio_signal.AudioSignalException, nussl.AudioSignal,
+                          dtype='int16')
+
+    def test_spectrogram_cache(self):
+        """
+        magnitude_spectrogram_data and power_spectrogram_data are calculated once per stft_data
+        and recalculated after stft_data is set or stft_data_changed() is called.
+        """
+        signal = nussl.AudioSignal(audio_data_array=np.random.rand(2, self.length) * 2 - 1)
+        signal.stft()
+        version = signal.stft_version
+
+        magnitude = signal.magnitude_spectrogram_data
+        assert magnitude is signal.magnitude_spectrogram_data
+        assert not magnitude.flags.writeable
+        assert np.array_equal(magnitude, np.abs(signal.stft_data))
+        assert np.allclose(signal.power_spectrogram_data, np.abs(signal.stft_data) ** 2)
+        assert np.shares_memory(signal.get_magnitude_spectrogram_channel(1), magnitude)
+
+        signal.stft_data[:, :, 0] *= 2
+        signal.stft_data_changed()
+        assert signal.stft_version > version
+        assert np.array_equal(signal.magnitude_spectrogram_data, np.abs(signal.stft_data))
+
+        signal.stft_data = signal.stft_data / 2
+        assert signal.magnitude_spectrogram_data is not magnitude
+        assert np.allclose(signal.power_spectrogram_data, np.abs(signal.stft_data) ** 2)
+
+        copied = nussl.AudioSignal.from_json(signal.to_json())
+        assert copied == signal
+
+    def test_next_window_generator(self):
+        """
+        next_window_generator() steps the active region through the signal, cuts the last window
+        short, and puts the active region back when it's done.
+        """
+        signal = nussl.AudioSignal(audio_data_array=self.sine_wave)
+        signal.set_active_region(10, 20)
+
+        window_size, hop_size = 4096, 2048
+        windows = []
+        for start, end in signal.next_window_generator(window_size, hop_size):
+            self.assertEqual(signal.signal_length, end - start)
+            self.assertTrue(np.array_equal(signal.audio_data[0], self.sine_wave[start:end]))
+            windows.append((start, end))
+
+        starts = list(range(0, self.length - window_size + hop_size, hop_size))
+        self.assertEqual([s for s, _ in windows], starts)
+        self.assertEqual(windows[-1][1], self.length)
+        self.assertEqual((signal._active_start, signal._active_end), (10, 20))
+
+        seconds = list(signal.next_window_generator(1.0, 0.5, convert_to_samples=True))
+        self.assertEqual(seconds[1], (self.sr // 2, self.sr // 2 + self.sr))
+
+    def test_cache_full_stft(self):
+        """
+        With cache_full_stft, stft() of an active region is made from the cached STFT of the
+        whole signal and matches the STFT calculated without the cache.
+        """
+        signal = nussl.AudioSignal(audio_data_array=np.random.rand(2, self.length) * 2 - 1)
+        signal.cache_full_stft = True
+        hop_length = signal.stft_params.hop_length
+
+        full_stft = signal.stft(overwrite=False)
+        self.assertFalse(full_stft.flags.writeable)
+        self.assertIs(signal.stft(overwrite=False), full_stft)
+
+        for start in [hop_length, 10 * hop_length, 10 * hop_length + 1]:
+            signal.set_active_region(start, start + 20 * hop_length + 5)
+            region_stft = signal.stft()
+
+            signal.cache_full_stft = False
+            self.assertTrue(np.allclose(region_stft, signal.stft(overwrite=False)))
+            signal.cache_full_stft = True
+
+        signal.set_active_region_to_default()
+        signal.audio_data = signal.audio_data * 2
+        self.assertTrue(np.allclose(signal.stft(overwrite=False), full_stft * 2))
+
+    def test_make_copy(self):
+        """
+        make_copy_without_data() copies metadata only; the make_copy_with_* functions attach the
+        new array without duplicating the ones they throw away.
+        """
+        signal = nussl.AudioSignal(audio_data_array=np.random.rand(2, self.length) * 2 - 1,
+                                   label='mix', dtype=nussl.FLOAT32)
+        signal.stft_params.window_length = 1024
+        signal.stft()
+        _ = signal.magnitude_spectrogram_data
+
+        empty = signal.make_copy_without_data()
+        self.assertIsNone(empty.audio_data)
+        self.assertIsNone(empty.stft_data)
+        self.assertEqual(empty._spectrogram_cache, {})
+        self.assertEqual((empty.label, empty.sample_rate, empty.dtype),
+                         (signal.label, signal.sample_rate, signal.dtype))
+        self.assertEqual(empty.stft_params, signal.stft_params)
+        self.assertIsNot(empty.stft_params, signal.stft_params)
+
+        new_audio = np.zeros_like(signal.audio_data)
+        audio_copy = signal.make_copy_with_audio_data(new_audio)
+        # audio_data is a view of the active region of the array that was attached
+        self.assertIs(audio_copy._audio_data, new_audio)
+        self.assertTrue(np.shares_memory(audio_copy.audio_data, new_audio))
+        self.assertIsNone(audio_copy.stft_data)
+
+        new_stft = signal.stft_data * 0.5
+        stft_copy = signal.make_copy_with_stft_data(new_stft)
+        self.assertIs(stft_copy.stft_data, new_stft)
+        self.assertIsNone(stft_copy.audio_data)
+        self.assertTrue(np.allclose(stft_copy.magnitude_spectrogram_data,
+                                    signal.magnitude_spectrogram_data * 0.5))
+
+        zeros = signal.make_empty_copy()
+        self.assertFalse(np.any(zeros.audio_data))
+        self.assertFalse(np.any(zeros.stft_data))
+        self.assertEqual(zeros.stft_data.shape, signal.stft_data.shape)
+
     def test_get_channel(self):
         # Here we're setting up signals with 1 to 8 channels
         # Each channel has a sine wave of different frequency in it
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+from __future__ import division
+
+import unittest
+
+import numpy as np
+
+import nussl
+
+
+class AudioSignalBatchUnitTests(unittest.TestCase):
+    sr = nussl.DEFAULT_SAMPLE_RATE
+    batch_size = 5
+    length = sr // 4
+
+    def setUp(self):
+        self.audio_data = np.random.rand(self.batch_size, 2, self.length) * 2 - 1
+        self.signals = [nussl.AudioSignal(audio_data_array=a, sample_rate=self.sr)
+                        for a in self.audio_data]
+
+    def test_from_signals(self):
+        batch = nussl.AudioSignalBatch.from_signals(self.signals)
+        assert len(batch) == self.batch_size
+        assert batch.num_channels == 2
+        assert batch.signal_length == self.length
+        assert batch.audio_data.flags.c_contiguous
+        assert np.array_equal(batch.audio_data, self.audio_data)
+
+        short = nussl.AudioSignal(audio_data_array=self.audio_data[0, :, :-1], sample_rate=self.sr)
+        self.assertRaises(nussl.core.audio_signal.AudioSignalException,
+                          nussl.AudioSignalBatch.from_signals, self.signals + [short])
+
+    def test_stft_istft(self):
+        batch = nussl.AudioSignalBatch(self.audio_data, sample_rate=self.sr)
+        stft = batch.stft()
+        assert stft.shape[0] == self.batch_size and stft.shape[-1] == 2
+
+        for i, signal in enumerate(self.signals):
+            assert np.allclose(signal.stft(), stft[i])
+
+        assert np.allclose(batch.istft(overwrite=False), self.audio_data)
+
+    def test_apply_mask(self):
+        batch = nussl.AudioSignalBatch(self.audio_data, sample_rate=self.sr)
+        stft = batch.stft()
+        masks = [nussl.separation.masks.SoftMask(np.random.rand(*stft.shape[1:]))
+                 for _ in range(self.batch_size)]
+
+        masked = batch.apply_mask(masks)
+        masked.istft(truncate_to_length=self.length)
+
+        for i, signal in enumerate(self.signals):
+            signal.stft()
+            expected = signal.apply_mask(masks[i])
+            expected.istft(truncate_to_length=self.length)
+            assert np.allclose(masked[i].audio_data, expected.audio_data)
+
+        # one array broadcast over the whole batch
+        same = batch.apply_mask(masks[0].mask)
+        assert np.allclose(same.stft_data, stft * masks[0].mask)
+
+        self.assertRaises(nussl.core.audio_signal.AudioSignalException, batch.apply_mask,
+                          masks[:-1])
+
+    def test_apply_compact_masks(self):
+        batch = nussl.AudioSignalBatch(self.audio_data, sample_rate=self.sr)
+        stft = batch.stft()
+        dense = [np.random.rand(*stft.shape[1:]) > 0.5 for _ in range(self.batch_size)]
+        masks = [nussl.separation.BinaryMask(d, packed=True) for d in dense]
+        masks[0] = nussl.separation.masks.SoftProfileMask(np.full((stft.shape[1], 2), 0.5),
+                                                          stft.shape[2])
+        dense[0] = masks[0].mask
+
+        masked = batch.apply_mask(masks)
+        assert np.allclose(masked.stft_data, stft * np.stack(dense))
+        assert masks[1].is_packed
+
+        batch.apply_mask(masks, overwrite=True)
+        assert batch.stft_data is stft
+        assert np.allclose(stft, masked.stft_data)
+
+    def test_views(self):
+        batch = nussl.AudioSignalBatch(self.audio_data, sample_rate=self.sr)
+        batch.stft()
+
+        signal = batch[1]
+        assert isinstance(signal, nussl.AudioSignal)
+        assert signal.sample_rate == self.sr
+        assert np.shares_memory(signal.audio_data, batch.audio_data)
+        assert np.shares_memory(signal.stft_data, batch.stft_data)
+        assert len(list(batch)) == self.batch_size
+
+    def test_operations(self):
+        batch = nussl.AudioSignalBatch(self.audio_data * 3, sample_rate=self.sr)
+        assert np.allclose(batch.rms(),
+                           [nussl.AudioSignal(audio_data_array=a * 3).rms() for a in self.audio_data])
+
+        batch.peak_normalize()
+        assert np.allclose(np.abs(batch.audio_data).max(axis=(1, 2)), 1.0)
+
+        assert batch.to_mono().shape == (self.batch_size, self.length)
+        batch.to_mono(overwrite=True, keep_dims=True)
+        assert batch.audio_data.shape == (self.batch_size, 1, self.length)
+
+
+class RaggedAudioSignalBatchUnitTests(unittest.TestCase):
+    sr = nussl.DEFAULT_SAMPLE_RATE
+
+    def setUp(self):
+        lengths = np.random.randint(self.sr // 20, self.sr // 2, size=12)
+        lengths[1] = lengths[0]
+        self.signals = [nussl.AudioSignal(audio_data_array=np.random.rand(2, n) * 2 - 1,
+                                          sample_rate=self.sr) for n in lengths]
+        self.batch = nussl.RaggedAudioSignalBatch.from_signals(self.signals)
+
+    def test_from_signals(self):
+        assert len(self.batch) == len(self.signals)
+        assert self.batch.audio_data.shape == (2, sum(s.signal_length for s in self.signals))
+        assert np.array_equal(self.batch.lengths, [s.signal_length for s in self.signals])
+
+        for i, signal in enumerate(self.signals):
+            view = self.batch[i]
+            assert np.shares_memory(view.audio_data, self.batch.audio_data)
+            assert np.array_equal(view.audio_data, signal.audio_data)
+
+        padded, valid = self.batch.pad([0, 2])
+        assert padded.shape == (2, 2, max(self.batch.lengths[[0, 2]]))
+        assert np.array_equal(valid.sum(axis=1), self.batch.lengths[[0, 2]])
+
+    def test_buckets(self):
+        lengths = self.batch.lengths
+        for max_padding in [0, 0.1, 0.5, 1.0]:
+            buckets = self.batch.buckets(max_padding)
+            assert sorted(np.concatenate(buckets)) == list(range(len(lengths)))
+            for bucket in buckets:
+                assert lengths[bucket].min() >= (1 - max_padding) * lengths[bucket].max()
+
+        assert len(self.batch.buckets(1.0)) == 1
+
+    def test_stft_istft(self):
+        for max_padding in [0, 0.5, 1.0]:
+            stft, hop_offsets = self.batch.stft(max_padding=max_padding)
+            for i, signal in enumerate(self.signals):
+                assert np.allclose(signal.stft(), stft[:, hop_offsets[i]:hop_offsets[i + 1]])
+
+            assert np.allclose(self.batch.istft(overwrite=False, max_padding=max_padding),
+                               self.batch.audio_data)
+
+    def test_apply_mask(self):
+        stft, hop_offsets = self.batch.stft()
+        masks = [nussl.separation.masks.SoftMask(np.random.rand(*signal.stft().shape))
+                 for signal in self.signals]
+
+        masked = self.batch.apply_mask(masks)
+        masked.istft(max_padding=1.0)
+
+        for i, signal in enumerate(self.signals):
+            expected = signal.apply_mask(masks[i])
+            expected.istft(truncate_to_length=signal.signal_length)
+            assert np.allclose(masked[i].audio_data, expected.audio_data)
+
+    def test_apply_compact_masks(self):
+        stft, hop_offsets = self.batch.stft()
+        dense = [np.random.rand(*signal.stft().shape) > 0.5 for signal in self.signals]
+        masks = [nussl.separation.BinaryMask(d, packed=True) for d in dense]
+
+        masked = self.batch.apply_mask(masks)
+        assert np.allclose(masked.stft_data, stft * np.concatenate(dense, axis=1))
+        assert masks[0].is_packed
+
+        self.assertRaises(nussl.core.audio_signal.AudioSignalException, self.batch.apply_mask,
+                          masks[::-1])
+
+        self.batch.apply_mask(masks, overwrite=True)
+        assert self.batch.stft_data is stft
+        assert np.allclose(stft, masked.stft_data)
+
+    def test_operations(self):
+        assert np.allclose(self.batch.rms(), [s.rms() for s in self.signals])
+
+        loud = nussl.RaggedAudioSignalBatch(self.batch.audio_data * 3, self.batch.offsets)
+        loud.peak_normalize()
+        for signal in loud:
+            assert np.isclose(np.abs(signal.audio_data).max(), 1.0)
+
+        assert self.batch.to_mono().shape == (self.batch.offsets[-1],)
@@ -249,6 +249,205 @@ class TestSpectralUtils(unittest.TestCase):
 
         assert np.allclose(lib_signal, nussl_signal, atol=self.librosa_epsilon)
 
+    def test_e_stft_matches_per_hop_loop(self):
+        """
+        e_stft() does one fft over a strided frame matrix. This checks that it gives exactly the
+        same output as windowing and transforming one hop at a time, for both reflection settings
+        and for n_fft_bins that are larger than (and not a multiple of) the window length.
+
+        This WILL raise an error if the calculated stfts are different.
+        """
+        np.random.seed(0)
+        noise = (np.random.rand(self.length // 4) * 2) - 1
+
+        for win_length in [128, 1024, 2048]:
+            for i in self.hop_length_ratios:
+                hop_length = int(win_length * i)
+                for n_fft_bins in [None, 2 * win_length + 1]:
+                    for remove_reflection in [True, False]:
+                        expected = self.e_stft_loop(noise, win_length, hop_length, nussl.WINDOW_HANN,
+                                                    n_fft_bins, remove_reflection)
+                        stft = nussl.stft_utils.e_stft(noise, win_length, hop_length,
+                                                       nussl.WINDOW_HANN, n_fft_bins,
+                                                       remove_reflection)
+
+                        assert stft.shape == expected.shape
+                        assert np.array_equal(stft, expected)
+
+    def test_stft_istft_multichannel(self):
+        """
+        e_stft() and e_istft() take every channel of a (n_channels, n_samples) signal in one call.
+        The output for each channel should be exactly what the single channel call gives.
+
+        This WILL raise an error if the calculated arrays are different.
+        """
+        win_type = nussl.WINDOW_HANN
+        win_length = 2048
+        hop_length = win_length // 2
+        np.random.seed(0)
+        noise = (np.random.rand(6, self.length // 4) * 2) - 1
+
+        stft = nussl.stft_utils.e_stft(noise, win_length, hop_length, win_type)
+        signal = nussl.stft_utils.e_istft(stft, win_length, hop_length, win_type)
+
+        assert stft.ndim == 3 and stft.shape[2] == noise.shape[0]
+        assert signal.shape[0] == noise.shape[0]
+
+        for ch in range(noise.shape[0]):
+            stft_ch = nussl.stft_utils.e_stft(noise[ch], win_length, hop_length, win_type)
+            assert np.array_equal(stft[:, :, ch], stft_ch)
+
+            signal_ch = nussl.stft_utils.e_istft(stft_ch, win_length, hop_length, win_type)
+            assert np.array_equal(signal[ch], signal_ch)
+
+        assert np.allclose(noise, signal[:, :noise.shape[1]])
+
+    def test_stft_istft_stream(self):
+        """
+        e_stft_stream() and e_istft_stream() take the signal/stft a block at a time. Concatenating their
+        outputs should give what e_stft() and e_istft() give for the whole signal, for any block size.
+        """
+        np.random.seed(0)
+        noise = (np.random.rand(2, self.length // 8) * 2) - 1
+        n_samples = noise.shape[-1]
+
+        for win_length, hop_length in [(2048, 1024), (1024, 256), (1000, 300), (512, 512)]:
+            stft = nussl.stft_utils.e_stft(noise, win_length, hop_length, nussl.WINDOW_HANN)
+            signal = nussl.stft_utils.e_istft(stft, win_length, hop_length, nussl.WINDOW_HANN)
+
+            for block_size in [1, 777, 4096, n_samples]:
+                blocks = (noise[:, i:i + block_size] for i in range(0, n_samples, block_size))
+                stream = nussl.stft_utils.e_stft_stream(blocks, win_length, hop_length, nussl.WINDOW_HANN)
+                stream_stft = np.concatenate(list(stream), axis=1)
+
+                assert stream_stft.shape == stft.shape
+                assert np.allclose(stream_stft, stft)
+
+            for n_hops in [1, 5, stft.shape[1]]:
+                stft_blocks = (stft[:, i:i + n_hops] for i in range(0, stft.shape[1], n_hops))
+                stream = nussl.stft_utils.e_istft_stream(stft_blocks, win_length, hop_length, nussl.WINDOW_HANN)
+                stream_signal = np.concatenate(list(stream), axis=-1)
+
+                assert stream_signal.shape == signal.shape
+                assert np.allclose(stream_signal, signal)
+
+    def test_e_stft_region(self):
+        """
+        e_stft_region() reuses the hops of the whole signal's stft. It should give what e_stft() gives for the
+        region, whether or not the region starts on a hop.
+        """
+        np.random.seed(0)
+        noise = (np.random.rand(2, self.length // 8) * 2) - 1
+        n_samples = noise.shape[-1]
+
+        for win_length, hop_length in [(2048, 1024), (1024, 256), (1000, 300), (512, 512)]:
+            full_stft = nussl.stft_utils.e_stft(noise, win_length, hop_length, nussl.WINDOW_HANN)
+
+            for start in [0, hop_length, 5 * hop_length, 5 * hop_length + 7]:
+                for end in [start + win_length, start + 10 * win_length + 3, n_samples]:
+                    region = noise[:, start:end]
+                    stft = nussl.stft_utils.e_stft(region, win_length, hop_length, nussl.WINDOW_HANN)
+                    region_stft = nussl.stft_utils.e_stft_region(region, start, full_stft, win_length,
+                                                                 hop_length, nussl.WINDOW_HANN)
+
+                    assert region_stft.shape == stft.shape
+                    assert np.allclose(region_stft, stft)
+
+    def test_e_istft_ragged(self):
+        """
+        e_istft_ragged() inverts channels with different numbers of hops in one call. Every channel should come
+        out as e_istft() of its own hops, followed by zeros.
+        """
+        np.random.seed(0)
+        noise = (np.random.rand(3, self.length // 8) * 2) - 1
+
+        for win_length, hop_length in [(2048, 1024), (1024, 256), (1000, 300), (512, 512)]:
+            stft = nussl.stft_utils.e_stft(noise, win_length, hop_length, nussl.WINDOW_HANN)
+            n_hops = [stft.shape[1], stft.shape[1] - 3, stft.shape[1] // 2]
+
+            signals, lengths = nussl.stft_utils.e_istft_ragged(stft, n_hops, win_length, hop_length,
+                                                               nussl.WINDOW_HANN)
+
+            for channel, n in enumerate(n_hops):
+                expected = nussl.stft_utils.e_istft(stft[:, :n, channel], win_length, hop_length,
+                                                    nussl.WINDOW_HANN)
+                assert lengths[channel] == len(expected)
+                assert np.allclose(signals[channel, :lengths[channel]], expected)
+                assert not signals[channel, lengths[channel]:].any()
+
+    def test_e_istft_window_sum_cache(self):
+        """
+        e_istft() divides by an overlap-added window envelope that is cached per
+        (window_type, window_length, hop_length, n_hops). Checks that the cached envelope is
+        reused, is read-only, and matches summing the windows one hop at a time.
+        """
+        win_type, win_length, hop_length, n_hops = nussl.WINDOW_HANN, 1024, 256, 40
+        norm_window = nussl.stft_utils._get_window_sum(win_type, win_length, hop_length, n_hops)
+
+        assert norm_window is nussl.stft_utils._get_window_sum(win_type, win_length,
+                                                               hop_length, n_hops)
+        assert not norm_window.flags.writeable
+
+        window = nussl.stft_utils.make_window(win_type, win_length)
+        expected = np.zeros((n_hops - 1) * hop_length + win_length)
+        for n in range(n_hops):
+            expected[n * hop_length:n * hop_length + win_length] += window
+        expected[expected == 0.0] = nussl.EPSILON
+
+        assert np.array_equal(norm_window, expected)
+
+    def test_make_window_cache(self):
+        """
+        make_window() caches windows per (window_type, length, symmetric, dtype). Checks that a
+        cached window is shared, read-only, matches scipy's window and counts hits and misses.
+        """
+        import scipy.signal
+
+        nussl.stft_utils.clear_window_cache()
+        window = nussl.stft_utils.make_window(nussl.WINDOW_HANN, 1024)
+        assert nussl.stft_utils.window_cache_info()['window'].misses == 1
+
+        assert window is nussl.stft_utils.make_window(nussl.WINDOW_HANN, 1024)
+        assert not window.flags.writeable
+        assert np.array_equal(window, scipy.signal.hann(1024, False))
+        assert nussl.stft_utils.window_cache_info()['window'].hits == 1
+
+        symmetric = nussl.stft_utils.make_window(nussl.WINDOW_HANN, 1024, symmetric=True)
+        single = nussl.stft_utils.make_window(nussl.WINDOW_HANN, 1024, dtype=np.float32)
+        assert symmetric is not window and single is not window
+        assert single.dtype == np.float32
+
+        info = nussl.stft_utils.window_cache_info()['window']
+        assert (info.hits, info.misses, info.currsize) == (1, 3, 3)
+
+        nussl.stft_utils.clear_window_cache()
+        assert nussl.stft_utils.window_cache_info()['window'].currsize == 0
+
+    def test_window_cache_threads(self):
+        """
+        The window cache is shared by every thread. Hammers a small cache from a thread pool so that
+        lookups, inserts and evictions of the same keys overlap, and checks that nothing raises and the
+        counters add up.
+        """
+        import multiprocessing.pool
+
+        cache = nussl.stft_utils._ArrayCache(maxsize=4)
+        keys = [i % 6 for i in range(3000)]
+
+        pool = multiprocessing.pool.ThreadPool(8)
+        try:
+            values = pool.map(lambda key: cache.get(key, lambda: np.full(16, float(key))), keys)
+        finally:
+            pool.close()
+            pool.join()
+
+        for key, value in zip(keys, values):
+            assert np.all(value == key)
+
+        info = cache.info()
+        assert info.hits + info.misses == len(keys)
+        assert info.currsize <= 4
+
     # TODO: this
     # ##########################################################################################
     # COMING SOON:
@@ -285,6 +484,26 @@ class TestSpectralUtils(unittest.TestCase):
         assert np.allclose(signal, calculated_signal)
         return
 
+    @staticmethod
+    def e_stft_loop(signal, win_length, hop_length, win_type, n_fft_bins=None, remove_reflection=True):
+        """
+        Reference stft that windows and transforms one hop at a time.
+        """
+        import scipy.fftpack
+
+        n_fft_bins = win_length if n_fft_bins is None else n_fft_bins
+        window = nussl.stft_utils.make_window(win_type, win_length)
+        signal, num_blocks = nussl.stft_utils._add_zero_padding(signal, win_length, hop_length)
+        stft_bins = n_fft_bins // 2 + 1 if remove_reflection else n_fft_bins
+
+        stft = np.zeros((num_blocks, stft_bins), dtype=complex)
+        for hop in range(num_blocks):
+            start = hop * hop_length
+            fft = scipy.fftpack.fft(signal[start:start + win_length] * window, n=n_fft_bins)
+            stft[hop, ] = fft[:stft_bins]
+
+        return stft.T
+
     @staticmethod
     def do_stft_istft(win_length, hop_length, win_type, signal):
         """
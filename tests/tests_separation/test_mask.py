@@ -122,6 +122,239 @@ class MaskUnitTests(unittest.TestCase):
         inverse_binary_mask = binary_mask.invert_mask()
         assert np.all(inverse_binary_mask.mask == np.zeros(shape))
 
+        # in place
+        data = soft_mask.mask
+        assert soft_mask.invert_mask(overwrite=True) is soft_mask
+        assert soft_mask.mask is data
+        assert np.all(soft_mask.mask == np.zeros(shape))
+
+        data = binary_mask.mask
+        assert binary_mask.inverse_mask(overwrite=True) is binary_mask
+        assert binary_mask.mask is data
+        assert np.all(binary_mask.mask == np.zeros(shape))
+
+    def test_arithmetic(self):
+        a = np.random.random((self.h, self.l, 2))
+        b = np.random.random((self.h, self.l, 2))
+
+        # out of place operators return new arrays
+        soft_mask = nussl.separation.SoftMask(a.copy())
+        assert np.allclose(soft_mask + nussl.separation.SoftMask(b), a + b)
+        assert np.allclose(soft_mask - b, a - b)
+        assert np.allclose(soft_mask * 0.5, a * 0.5)
+        assert np.allclose(soft_mask / 2, a / 2)
+
+        # augmented operators change the mask in place
+        data = soft_mask.mask
+        soft_mask *= 0.5
+        soft_mask += nussl.separation.SoftMask(b * 0.5)
+        soft_mask -= b * 0.25
+        soft_mask /= 0.5
+        assert isinstance(soft_mask, nussl.separation.SoftMask)
+        assert soft_mask.mask is data
+        assert np.allclose(soft_mask.mask, a + b * 0.5)
+
+        # bools can be or-ed in place, but not subtracted or scaled
+        binary_mask = nussl.separation.BinaryMask(a > 0.5)
+        data = binary_mask.mask
+        binary_mask += nussl.separation.BinaryMask(b > 0.5)
+        assert binary_mask.mask is data
+        assert np.array_equal(binary_mask.mask, (a > 0.5) | (b > 0.5))
+
+        with self.assertRaises(ValueError):
+            binary_mask -= nussl.separation.BinaryMask(b > 0.5)
+
+        with self.assertRaises(ValueError):
+            binary_mask *= 0.5
+
+    def test_validate(self):
+        # validation normalizes out of range values, unless it's skipped
+        arr = np.random.random((self.h, self.l)) * 2
+        assert nussl.separation.SoftMask(arr.copy()).mask.max() <= 1.0
+        assert np.array_equal(nussl.separation.SoftMask(arr, validate=False).get_channel(0), arr)
+
+    def test_packed_binary_mask(self):
+        h = self.h + 3  # not a multiple of 8
+        a = np.random.random((h, self.l, 2)) > 0.5
+        b = np.random.random((h, self.l, 2)) > 0.3
+
+        packed_a = nussl.separation.BinaryMask(a, packed=True)
+        packed_b = nussl.separation.BinaryMask(b).pack()
+        assert packed_a.is_packed and packed_b.is_packed
+        assert packed_a.packed_mask.shape == ((h + 7) // 8, self.l, 2)
+        assert packed_a.shape == a.shape
+        assert packed_a.height == h
+        assert packed_a.dtype == bool
+        assert np.array_equal(packed_a.mask, a)
+        assert np.array_equal(packed_a.get_channel(1), a[..., 1])
+        assert np.array_equal(packed_a.get_block(5, 30), a[5:30])
+        assert np.array_equal(packed_a.get_block(h - 2, h + 10), a[h - 2:])
+
+        # logical operators work on the packed bytes and give packed masks
+        assert (packed_a & packed_b).is_packed
+        assert np.array_equal((packed_a & packed_b).mask, a & b)
+        assert np.array_equal((packed_a | b).mask, a | b)
+        assert np.array_equal((packed_a ^ packed_b).mask, a ^ b)
+        assert np.array_equal(packed_a.invert_mask().mask, ~a)
+        assert packed_a.invert_mask().count_nonzero() == np.count_nonzero(~a)
+        assert packed_a.count_nonzero() == np.count_nonzero(a)
+
+        counts = (np.count_nonzero(a & b), np.count_nonzero(~a & b),
+                  np.count_nonzero(a & ~b), np.count_nonzero(~a & ~b))
+        assert packed_a.confusion_counts(packed_b) == counts
+        assert nussl.separation.BinaryMask(a).confusion_counts(nussl.separation.BinaryMask(b)) == counts
+
+        # in place
+        data = packed_a.packed_mask
+        packed_a ^= packed_b
+        packed_a.invert_mask(overwrite=True)
+        assert packed_a.packed_mask is data
+        assert np.array_equal(packed_a.mask, ~(a ^ b))
+
+        packed_a += packed_b
+        assert np.array_equal(packed_a.mask, ~(a ^ b) | b)
+
+        with self.assertRaises(ValueError):
+            packed_a *= 0.5
+
+        # new data stays packed
+        packed_a.mask = a
+        assert packed_a.is_packed
+        assert np.array_equal(packed_a.unpack().mask, a)
+        assert not packed_a.is_packed
+
+        from_packed = nussl.separation.BinaryMask.from_packed(np.packbits(b, axis=0), h)
+        assert from_packed == packed_b
+
+        stft = nussl.utils.complex_randn(b.shape)
+        assert np.allclose(nussl.separation.masks.apply_masks(stft, [packed_b])[0], stft * b)
+
+    def test_quantized_soft_mask(self):
+        arr = np.random.random((self.h, self.l, 2))
+        arr[0, 0, 0] = 0.0
+        arr[1, 1, 1] = 1.0
+
+        for dtype, error in [('uint8', 0.5 / 255), ('uint16', 0.5 / 65535)]:
+            soft_mask = nussl.separation.SoftMask(arr.copy(), quantize=dtype)
+            assert soft_mask.is_quantized
+            assert soft_mask.quantized_mask.dtype == np.dtype(dtype)
+            assert soft_mask.quantization_error == error
+            assert soft_mask.shape == arr.shape
+            assert soft_mask.dtype == np.float64
+
+            # values are within the error bound, and 0.0 and 1.0 are exact
+            assert np.max(np.abs(soft_mask.mask - arr)) <= error + 1e-12
+            assert soft_mask.mask[0, 0, 0] == 0.0
+            assert soft_mask.mask[1, 1, 1] == 1.0
+            assert np.array_equal(soft_mask.get_channel(1), soft_mask.mask[..., 1])
+            assert np.array_equal(soft_mask.get_block(10, 20), soft_mask.mask[10:20])
+
+            inverse = soft_mask.invert_mask()
+            assert inverse.is_quantized
+            assert np.allclose(inverse.mask, 1 - soft_mask.mask)
+
+            codes = soft_mask.quantized_mask
+            soft_mask.invert_mask(overwrite=True)
+            assert soft_mask.quantized_mask is codes
+            assert soft_mask == inverse
+
+            with self.assertRaises(ValueError):
+                soft_mask *= 0.5
+
+            stft = nussl.utils.complex_randn(arr.shape)
+            assert np.allclose(nussl.separation.masks.apply_masks(stft, [soft_mask])[0], stft * soft_mask.mask)
+
+            assert nussl.separation.SoftMask.from_quantized(codes) == soft_mask
+            assert not soft_mask.dequantize().is_quantized
+
+        with self.assertRaises(ValueError):
+            nussl.separation.SoftMask(arr, quantize='float32')
+
+    def test_profile_mask(self):
+        profile = np.zeros((self.h, 2))
+        profile[:40] = 1
+        dense = np.broadcast_to(profile[:, np.newaxis, :] > 0, (self.h, self.l, 2))
+
+        binary_mask = nussl.separation.BinaryProfileMask(profile, self.l)
+        assert isinstance(binary_mask, nussl.separation.BinaryMask)
+        assert binary_mask.shape == dense.shape
+        assert binary_mask.dtype == bool
+        assert binary_mask.profile.shape == (self.h, 1, 2)
+        assert np.array_equal(binary_mask.mask, dense)
+        assert np.array_equal(binary_mask.get_channel(1), dense[..., 1])
+        assert np.array_equal(binary_mask.get_block(30, 50), dense[30:50])
+        assert binary_mask.count_nonzero() == np.count_nonzero(dense)
+
+        inverse = binary_mask.invert_mask()
+        assert isinstance(inverse, nussl.separation.BinaryProfileMask)
+        assert np.array_equal(inverse.mask, ~dense)
+
+        # the mask is a read-only view of the profile
+        with self.assertRaises(ValueError):
+            binary_mask.mask = dense
+        with self.assertRaises(ValueError):
+            binary_mask += inverse
+
+        stft = nussl.utils.complex_randn(dense.shape)
+        sources = nussl.separation.masks.apply_masks(stft, [binary_mask, inverse])
+        assert np.allclose(sources[0], stft * dense)
+        assert np.allclose(sources[1], stft * ~dense)
+
+        soft_mask = nussl.separation.SoftProfileMask(np.random.random(self.h), self.l)
+        assert isinstance(soft_mask, nussl.separation.SoftMask)
+        assert soft_mask.shape == (self.h, self.l, 1)
+        assert np.allclose(soft_mask.invert_mask().mask, 1 - soft_mask.mask)
+        assert isinstance(soft_mask.mask_to_binary(), nussl.separation.BinaryProfileMask)
+
+        dense_mask = soft_mask.to_dense()
+        assert type(dense_mask) is nussl.separation.SoftMask
+        assert dense_mask == soft_mask
+
+        for mask in [binary_mask, soft_mask]:
+            loaded = type(mask).from_bytes(mask.to_bytes())
+            assert type(loaded) is type(mask)
+            assert loaded == mask
+
+    def test_apply_masks(self):
+        stft = nussl.utils.complex_randn((self.h, self.l, 2))
+        mask_list = [nussl.separation.SoftMask(np.random.random(stft.shape)),
+                     nussl.separation.BinaryMask(np.random.random(stft.shape) > 0.5),
+                     np.random.random(stft.shape)]
+
+        sources = nussl.separation.masks.apply_masks(stft, mask_list)
+        assert sources.shape == (3,) + stft.shape
+        for source, mask in zip(sources, mask_list):
+            mask = mask.mask if isinstance(mask, nussl.separation.MaskBase) else mask
+            assert np.allclose(source, stft * mask)
+
+        # complex64 stays complex64, and out is reused
+        stft = stft.astype('complex64')
+        out = np.empty((3,) + stft.shape, dtype=stft.dtype)
+        assert nussl.separation.masks.apply_masks(stft, mask_list, out=out) is out
+
+        with self.assertRaises(ValueError):
+            nussl.separation.masks.apply_masks(stft[:-1], mask_list)
+
+    def test_apply_masks_layout(self):
+        # laid out like e_stft() output, hops of a channel are contiguous, and a C-contiguous STFT with long rows
+        for stft in [np.asfortranarray(nussl.utils.complex_randn((1025, 200, 2))),
+                     nussl.utils.complex_randn((45, 9000, 2))]:
+            dense = np.random.random(stft.shape)
+            mask_list = [nussl.separation.SoftMask(dense, quantize='uint8'),
+                         nussl.separation.BinaryMask(dense > 0.5, packed=True),
+                         nussl.separation.SoftProfileMask(dense[:, 0], stft.shape[1]),
+                         dense]
+
+            sources = nussl.separation.masks.apply_masks(stft, mask_list)
+            for source, mask in zip(sources, mask_list):
+                mask = mask.mask if isinstance(mask, nussl.separation.MaskBase) else mask
+                assert source.strides == stft.strides
+                assert np.allclose(source, stft * mask)
+
+        assert np.array_equal(mask_list[1].get_block(3, 20, slice(5, 9), slice(1, 2)), dense[3:20, 5:9, 1:] > 0.5)
+        assert np.array_equal(mask_list[2].get_block(3, 20, slice(5, 9), slice(1, 2)),
+                              mask_list[2].mask[3:20, 5:9, 1:])
+
     def _make_test_signal(self):
 
         fundamental_freq = 100  # Hz
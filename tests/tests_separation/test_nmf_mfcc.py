@@ -147,6 +147,66 @@ class NMFMFCCUnitTests(unittest.TestCase):
         for source in estimated_sources:
             assert source.is_mono
 
+    def test_restarts_and_workers(self):
+        # A single restart keeps the old result
+        single = nussl.NMF_MFCC(self.signal_stereo, num_sources=self.n_src,
+                                num_templates=6, num_iterations=15, random_seed=0)
+        single_masks = single.run()
+
+        restarted = nussl.NMF_MFCC(self.signal_stereo, num_sources=self.n_src,
+                                   num_templates=6, num_iterations=15, random_seed=0,
+                                   num_restarts=3)
+        restarted.run()
+
+        # The best restart is never worse than the first one
+        assert len(restarted.reconstruction_errors) == self.signal_stereo.num_channels
+        for ch in range(self.signal_stereo.num_channels):
+            assert restarted.reconstruction_errors[ch] <= single.reconstruction_errors[ch]
+
+        # Threads give the same result as running serially
+        threaded = nussl.NMF_MFCC(self.signal_stereo, num_sources=self.n_src,
+                                  num_templates=6, num_iterations=15, random_seed=0,
+                                  num_restarts=3, num_workers=4)
+        threaded_masks = threaded.run()
+        assert threaded.reconstruction_errors == restarted.reconstruction_errors
+        for threaded_mask, restarted_mask in zip(threaded_masks, restarted.result_masks):
+            assert np.array_equal(threaded_mask.mask, restarted_mask.mask)
+
+        threaded = nussl.NMF_MFCC(self.signal_stereo, num_sources=self.n_src,
+                                  num_templates=6, num_iterations=15, random_seed=0,
+                                  num_workers=None)
+        threaded_masks = threaded.run()
+        for threaded_mask, single_mask in zip(threaded_masks, single_masks):
+            assert np.array_equal(threaded_mask.mask, single_mask.mask)
+
+        with self.assertRaises(ValueError):
+            nussl.NMF_MFCC(self.signal_mono, num_sources=self.n_src, num_restarts=0)
+
+        with self.assertRaises(ValueError):
+            nussl.NMF_MFCC(self.signal_mono, num_sources=self.n_src, num_workers=0)
+
+    def test_extract_masks(self):
+        nmf_mfcc = nussl.NMF_MFCC(self.signal_mono, num_sources=3,
+                                  num_templates=6, num_iterations=5, random_seed=0)
+        nmf_mfcc.audio_signal.stft()
+
+        magnitude = np.abs(nmf_mfcc.audio_signal.get_stft_channel(0))
+        templates = np.random.rand(magnitude.shape[0], 6)
+        activations = np.random.rand(6, magnitude.shape[1])
+        nmf_mfcc.labeled_templates = np.array([0, 1, 0, 1, 1, 0])  # source 2 has no templates
+
+        channel_masks = nmf_mfcc._extract_masks(templates, activations, 0)
+        assert channel_masks.shape == magnitude.shape + (3,)
+
+        for source_index in range(3):
+            in_cluster = nmf_mfcc.labeled_templates == source_index
+            source_stft = np.dot(templates * in_cluster, activations)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                expected = np.nan_to_num(source_stft / np.maximum(source_stft, magnitude))
+            assert np.allclose(channel_masks[..., source_index], expected)
+
+        assert np.all(channel_masks[..., 2] == 0)
+
     def test_benchmark_nmf_mfcc(self):
 
         metadata_file = os.path.join('tests', 'nmf_mfcc_reference', 'nmf_mfcc_benchmark_files',